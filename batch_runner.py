@@ -1,8 +1,15 @@
 import subprocess
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
+from prototype3.daemon_client import DaemonError, analyze, daemon_available
+from prototype3.utils.results_store import get_results_store
+
 def run_analysis(prompt):
     # Get the path to main.py
     main_script = Path(__file__).parent / "main.py"
@@ -24,29 +31,43 @@ def run_analysis(prompt):
         print(f"Error starting process for '{prompt}': {e}")
         return None
 
+def run_on_daemon(prompts):
+    """Sends all prompts to the running daemon; it queues them and stores the results"""
+    def run(prompt):
+        try:
+            analyze(prompt)
+        except DaemonError as e:
+            print(f"Analysis failed for '{prompt}': {e}")
+
+    with ThreadPoolExecutor(max_workers=len(prompts) or 1) as executor:
+        list(executor.map(run, prompts))
+
 def main():
-    # Clear previous results
-    results_file = Path(__file__).parent / "analysis_results.txt"
-    if results_file.exists():
-        results_file.unlink()
+    # Each flow appends its result to the results database and analysis_results.txt
+    batch_started = time.time()
 
     prompts = [
         "What is the amount of men in Prague at the end of Q3 2024?",
         "What is the amount of women in Prague at the end of Q3 2024?",
     ]
 
-    # Start all processes
-    processes = []
-    for prompt in prompts:
-        process = run_analysis(prompt)
-        if process:
-            processes.append(process)
+    if daemon_available():
+        print("Using the running analysis daemon")
+        run_on_daemon(prompts)
+    else:
+        # Start all processes
+        processes = []
+        for prompt in prompts:
+            process = run_analysis(prompt)
+            if process:
+                processes.append(process)
 
-    # Wait for all processes to complete
-    for process in processes:
-        process.wait()
+        # Wait for all processes to complete
+        for process in processes:
+            process.wait()
 
-    print("All analyses completed. Check analysis_results.txt for results.")
+    count = sum(1 for _ in get_results_store().iter_results(since=batch_started))
+    print(f"All analyses completed. {count} results saved.")
 
 if __name__ == "__main__":
     main()
@@ -2,73 +2,78 @@ import subprocess
 from pathlib import Path
 import time
 import os
+import shutil
+import tempfile
+from prototype3.daemon_client import DaemonError, analyze, daemon_available
+from prototype3.utils.result_files import read_result_file
 
 def run_single_analysis(prompt):
     print(f"\n[DEBUG] ====== Analysis Start ======")
     print(f"[DEBUG] Processing prompt: {prompt}")
+
+    # A running daemon answers with warm caches and no interpreter start-up
+    if daemon_available():
+        start = time.perf_counter()
+        try:
+            record = analyze(prompt)
+            print(f"[DEBUG] Daemon answered in {time.perf_counter() - start:.2f} seconds")
+            print("[DEBUG] ====== Analysis Complete ======\n")
+            return record["result"]
+        except DaemonError as e:
+            error_msg = f"Daemon analysis failed: {str(e)}"
+            print(f"[ERROR] {error_msg}")
+            return error_msg
     
     # Get the project root directory (where safe_crewai.bat is)
     root_dir = Path(__file__).parent.parent.parent
-    results_file = root_dir / "analysis_results.txt"
-    print(f"[DEBUG] Results will be saved to: {results_file}")
     
-    # Do NOT clear existing results
-    
-    print(f"[DEBUG] Setting environment variable ANALYSIS_PROMPT")
-    os.environ["ANALYSIS_PROMPT"] = prompt
+    # Each run writes its own JSON result file, so we read exactly this run's output
+    result_dir = Path(tempfile.mkdtemp(prefix="analysis_run_"))
+    result_file = result_dir / "result.json"
+    print(f"[DEBUG] Result will be saved to: {result_file}")
     
     print("[DEBUG] Executing safe_crewai.bat...")
     
     # Use the full path to safe_crewai.bat
     bat_path = root_dir / "safe_crewai.bat"
-    process = subprocess.run(
-        [str(bat_path), "flow", "kickoff"],
-        env={**os.environ},
-        shell=True,
-        capture_output=True,
-        text=True,
-        cwd=str(root_dir)  # Run from project root
-    )
-    
-    print(f"[DEBUG] Process return code: {process.returncode}")
-    print(f"[DEBUG] Process stdout length: {len(process.stdout)}")
-    print(f"[DEBUG] Process stderr length: {len(process.stderr)}")
-    
-    if process.stderr:
-        print(f"[DEBUG] Process errors: {process.stderr[:200]}...")
-    
-    # Add delay before reading results
-    time.sleep(5)  # Increased delay to ensure file is written
-    
-    # Try to read the results
+    start = time.perf_counter()
     try:
-        if not results_file.exists():
-            error_msg = f"Results file not found at: {results_file}"
+        # subprocess.run returns as soon as the process exits; the result file is
+        # complete by then because the flow renames it into place before exiting
+        process = subprocess.run(
+            [str(bat_path), "flow", "kickoff"],
+            env={**os.environ, "ANALYSIS_PROMPT": prompt, "ANALYSIS_RESULT_FILE": str(result_file)},
+            shell=True,
+            capture_output=True,
+            text=True,
+            cwd=str(root_dir)  # Run from project root
+        )
+        
+        print(f"[DEBUG] Process return code: {process.returncode}")
+        print(f"[DEBUG] Process finished in {time.perf_counter() - start:.2f} seconds")
+        
+        if process.stderr:
+            print(f"[DEBUG] Process errors: {process.stderr[:200]}...")
+        
+        if not result_file.exists():
+            error_msg = f"Run produced no result (return code {process.returncode})"
             print(f"[ERROR] {error_msg}")
             return error_msg
-            
-        with open(results_file, "r", encoding='utf-8') as f:
-            content = f.read()
-            if not content:
-                error_msg = "Results file is empty"
-                print(f"[ERROR] {error_msg}")
-                return error_msg
-                
-            print(f"[DEBUG] Successfully read results, length: {len(content)}")
-            return content
+        
+        record = read_result_file(str(result_file))
+        print(f"[DEBUG] Successfully read result, length: {len(record['result'])}")
+        print("[DEBUG] ====== Analysis Complete ======\n")
+        return record["result"]
             
     except Exception as e:
         error_msg = f"Failed to read results: {str(e)}"
         print(f"[ERROR] {error_msg}")
         return error_msg
-    
-    print("[DEBUG] ====== Analysis Complete ======\n")
+    finally:
+        shutil.rmtree(result_dir, ignore_errors=True)
 
 def main():
     print("[DEBUG] Starting batch processor main()")
-    root_dir = Path(__file__).parent.parent.parent
-    results_file = root_dir / "analysis_results.txt"
-    
     # Only process a single prompt from environment variable
     prompt = os.environ.get("ANALYSIS_PROMPT")
     if prompt:
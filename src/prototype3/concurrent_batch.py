@@ -0,0 +1,114 @@
+"""
+In-process batch runner for DataAnalysisFlow.
+
+Runs many prompts as concurrent flows inside one interpreter, so crewai, tracing,
+the LLM client and the datasets are initialized once for the whole batch instead
+of once per prompt in a new subprocess.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from prototype3.main import DataAnalysisFlow
+
+DEFAULT_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+
+def run_flow(prompt: str, dataset: str = None, bypass_cache: bool = None) -> dict:
+    """
+    Runs one flow to completion and returns its result and timing.
+
+    Errors are captured in the returned record so one failing prompt does not
+    abort the rest of the batch.
+    """
+    start = time.perf_counter()
+    flow = DataAnalysisFlow()
+    inputs = {"prompt": prompt}
+    if dataset:
+        inputs["dataset"] = dataset
+    if bypass_cache is not None:
+        inputs["bypass_cache"] = bypass_cache
+    try:
+        flow.kickoff(inputs=inputs)
+        return {"prompt": prompt, "result": flow.state.result, "error": None,
+                "cached": flow.state.cache_hit, "planned": flow.state.planned,
+                "seconds": round(time.perf_counter() - start, 3)}
+    except Exception as e:
+        return {"prompt": prompt, "result": None, "error": f"{type(e).__name__}: {e}",
+                "seconds": round(time.perf_counter() - start, 3)}
+
+
+async def run_batch_async(prompts: list, concurrency: int = DEFAULT_CONCURRENCY, dataset: str = None,
+                          bypass_cache: bool = None) -> list:
+    """
+    Runs prompts as concurrent flows, at most `concurrency` at a time.
+
+    Flow steps are synchronous (crew kickoff blocks on the LLM), so each flow runs
+    on a worker thread of a pool sized to the concurrency limit; the event loop only
+    schedules them and collects results.
+
+    Args:
+        bypass_cache: Skip the answer cache lookup; None keeps the ANSWER_CACHE_BYPASS default
+
+    Returns:
+        list: One record per prompt, in input order
+    """
+    if concurrency < 1:
+        raise ValueError(f"Invalid concurrency: {concurrency}")
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="flow") as executor:
+        tasks = [loop.run_in_executor(executor, run_flow, prompt, dataset, bypass_cache) for prompt in prompts]
+        return await asyncio.gather(*tasks)
+
+
+def run_batch(prompts: list, concurrency: int = DEFAULT_CONCURRENCY, dataset: str = None,
+              bypass_cache: bool = None) -> list:
+    """Synchronous wrapper around run_batch_async."""
+    start = time.perf_counter()
+    results = asyncio.run(run_batch_async(prompts, concurrency=concurrency, dataset=dataset,
+                                          bypass_cache=bypass_cache))
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for record in results if record["error"])
+    print(f"\nBatch completed in {elapsed:.2f} seconds:")
+    print(f"- Prompts processed: {len(results)}")
+    print(f"- Prompts failed: {failed}")
+    print(f"- Concurrency: {concurrency}")
+    return results
+
+
+def main():
+    """Entry point: prompts come from a file (one per line) or the command line."""
+    parser = argparse.ArgumentParser(description="Run many prompts through DataAnalysisFlow in one process")
+    parser.add_argument("prompts", nargs="*", help="Prompts to analyze")
+    parser.add_argument("--file", help="Text file with one prompt per line")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--dataset", help="Catalog code of the dataset to query")
+    parser.add_argument("--bypass-cache", action="store_true", default=None,
+                        help="Skip the answer cache lookup (fresh answers are still stored)")
+    parser.add_argument("--output", help="Write per-prompt results as JSON to this file")
+    args = parser.parse_args()
+
+    prompts = list(args.prompts)
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            prompts.extend(line.strip() for line in f if line.strip())
+    if not prompts:
+        parser.error("No prompts given")
+
+    results = run_batch(prompts, concurrency=args.concurrency, dataset=args.dataset, bypass_cache=args.bypass_cache)
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Results saved to: {args.output}")
+    else:
+        print(output)
+    return 0 if all(record["error"] is None for record in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
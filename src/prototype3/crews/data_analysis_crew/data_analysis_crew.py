@@ -1,33 +1,86 @@
 import glob
+import hashlib
 import os
+import threading
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai.knowledge.source.json_knowledge_source import JSONKnowledgeSource
-from crewai.knowledge.source.csv_knowledge_source import CSVKnowledgeSource
-import json
-from crewai.project import CrewBase, agent, crew, task, before_kickoff, after_kickoff
 
 
 from dotenv import load_dotenv
 from .tools.pandas_query_tool import PandasQueryTool
-from langchain_openai import AzureChatOpenAI
-import litellm
+from .tools.duckdb_query_tool import DuckDBQueryTool
+from .tools.cube_lookup_tool import CubeLookupTool
+from prototype3.utils.dataset_catalog import DEFAULT_DATASET, get_catalog
+from prototype3.utils.path_utils import ensure_knowledge_dirs
+from prototype3.utils.offline_llm import OFFLINE_MODE, install_offline_llm
 
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure litellm explicitly for Azure OpenAI
-litellm.drop_params = True
-litellm.api_type = "azure"
-litellm.api_version = "2024-05-01-preview"
-litellm.api_base = os.getenv('AZURE_OPENAI_ENDPOINT')
-litellm.api_key = os.getenv('AZURE_OPENAI_API_KEY')
+# Query engine used by the agent: "pandas" (default) or "duckdb"
+QUERY_ENGINE = os.getenv("QUERY_ENGINE", "pandas").lower()
 
-# Explicitly map your model name to your Azure deployment name with provider prefix
-litellm.model_alias_map = {
-    "gpt-4o": "azure/gpt-4o__test1"
-}
+# Azure OpenAI deployment; the client itself is only built when a crew first needs it
+LLM_DEPLOYMENT = "gpt-4o__test1"
+LLM_MODEL = "gpt-4o"
+LLM_API_VERSION = "2024-05-01-preview"
+LLM_TEMPERATURE = 0.7
+OFFLINE_ENDPOINT = "https://offline.invalid"
+
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def configure_litellm():
+    """Configures litellm explicitly for Azure OpenAI"""
+    import litellm
+
+    litellm.drop_params = True
+    litellm.api_type = "azure"
+    litellm.api_version = LLM_API_VERSION
+    litellm.api_base = os.getenv('AZURE_OPENAI_ENDPOINT')
+    litellm.api_key = os.getenv('AZURE_OPENAI_API_KEY')
+
+    # Explicitly map your model name to your Azure deployment name with provider prefix
+    litellm.model_alias_map = {
+        LLM_MODEL: f"azure/{LLM_DEPLOYMENT}"
+    }
+
+    # LLM_OFFLINE_MODE routes the model to the local stand-in instead of Azure
+    install_offline_llm(dict(litellm.model_alias_map))
+
+
+def get_llm():
+    """Returns the shared Azure OpenAI client, configuring litellm and building the client on first call"""
+    global _llm
+    with _llm_lock:
+        if _llm is None:
+            from langchain_openai import AzureChatOpenAI
+
+            configure_litellm()
+            # Offline runs need no credentials; the client only supplies its model settings then
+            offline_placeholder = OFFLINE_ENDPOINT if OFFLINE_MODE != "off" else None
+            _llm = AzureChatOpenAI(
+                deployment_name=LLM_DEPLOYMENT,
+                model_name=LLM_MODEL,
+                openai_api_version=LLM_API_VERSION,
+                temperature=LLM_TEMPERATURE,
+                azure_endpoint=os.getenv('AZURE_OPENAI_ENDPOINT') or offline_placeholder,
+                api_key=os.getenv('AZURE_OPENAI_API_KEY') or offline_placeholder
+            )
+        return _llm
+
+
+def crew_config_hash() -> str:
+    """Hash of everything that shapes the crew's answers: agent/task config, engine and model settings"""
+    digest = hashlib.sha256()
+    config_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
+    for path in sorted(glob.glob(os.path.join(config_dir, "*.yaml"))):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    digest.update(f"{QUERY_ENGINE}|{LLM_DEPLOYMENT}|{LLM_TEMPERATURE}|{OFFLINE_MODE}".encode())
+    return digest.hexdigest()
 
 
 @CrewBase
@@ -36,22 +89,32 @@ class DataAnalysisCrew:
 
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
-    
-    llm = AzureChatOpenAI(
-        deployment_name="gpt-4o__test1",
-        model_name="gpt-4o",
-        openai_api_version="2024-05-01-preview",
-        temperature=0.7,
-        azure_endpoint=os.getenv('AZURE_OPENAI_ENDPOINT'),
-        api_key=os.getenv('AZURE_OPENAI_API_KEY')
-    )
+
+    # Catalog code of the dataset the tools query; set on the instance before crew()
+    dataset_code = DEFAULT_DATASET
+
+    @property
+    def llm(self):
+        return get_llm()
+
+    def query_tool(self):
+        """Returns the query tool for the configured QUERY_ENGINE"""
+        if QUERY_ENGINE == "duckdb":
+            return DuckDBQueryTool(dataset_code=self.dataset_code)
+        if QUERY_ENGINE != "pandas":
+            raise ValueError(f"Unknown QUERY_ENGINE: {QUERY_ENGINE}")
+        return PandasQueryTool(dataset_code=self.dataset_code)
 
     @agent
     def data_query_agent(self) -> Agent:
+        tools = [self.query_tool()]
+        # The lookup tool needs the dimensions declared in the dataset's metadata
+        if get_catalog().get(self.dataset_code).metadata_path:
+            tools.insert(0, CubeLookupTool(dataset_code=self.dataset_code))
         return Agent(
             config=self.agents_config["data_query_agent"],
             verbose=False,
-            tools=[PandasQueryTool()],
+            tools=tools,
             llm=self.llm
         )
 
@@ -64,6 +127,7 @@ class DataAnalysisCrew:
     @crew
     def crew(self) -> Crew:
         """Creates the Data Analysis Crew"""
+        ensure_knowledge_dirs()
         return Crew(
             agents=self.agents,
             tasks=self.tasks,
@@ -0,0 +1,37 @@
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from prototype3.utils.dataset_catalog import get_catalog
+from prototype3.utils.cube_index import get_cube_index
+from prototype3.utils.tool_calls import tool_calls
+
+class CubeLookupInput(BaseModel):
+    dimensions: dict[str, str] = Field(
+        description="Mapping of dimension column name to its exact value from the schema, "
+                    "e.g. {\"ČR, kraje\": \"Hlavní město Praha\", \"Ukazatel\": \"...\"}"
+    )
+
+class CubeLookupTool(BaseTool):
+    name: str = "Lookup Value"
+    description: str = (
+        "Return the single value for one combination of dimension values. "
+        "Use it instead of a query when the question asks for one number; "
+        "dimensions with only one value in the schema can be omitted"
+    )
+    args_schema: type[BaseModel] = CubeLookupInput
+    dataset_code: str = Field(default=None)
+    data_path: str = Field(default=None)
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        self.data_path = self.data_path or get_catalog().get(self.dataset_code).data_path
+        # Build the index together with the dataset so the first lookup is already O(1)
+        get_cube_index(self.data_path)
+
+    def _run(self, dimensions: dict) -> str:
+        tool_calls.record(self.name)
+        try:
+            return str(get_cube_index(self.data_path).lookup(dimensions))
+        except KeyError as e:
+            return f"Lookup error: {e.args[0]}"
+        except Exception as e:
+            return f"Lookup error: {str(e)}"
@@ -0,0 +1,45 @@
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from prototype3.utils.dataset_catalog import get_catalog
+from prototype3.utils.duckdb_engine import DuckDBEngine, format_arrow_table
+from prototype3.utils.result_serializer import DEFAULT_MAX_ROWS, truncate_text
+from prototype3.utils.tool_calls import tool_calls
+
+# One engine per dataset, shared by every tool instance in the process
+_engines = {}
+
+def get_engine(data_path: str, view_name: str = "data") -> DuckDBEngine:
+    if data_path not in _engines:
+        engine = DuckDBEngine()
+        engine.register_dataset(view_name, data_path)
+        # Agent SQL may read the dataset and nothing else on disk
+        engine.lock_down()
+        _engines[data_path] = engine
+    return _engines[data_path]
+
+class SQLQueryInput(BaseModel):
+    query: str = Field(description="DuckDB SQL query to execute against the table named 'data'")
+
+class DuckDBQueryTool(BaseTool):
+    name: str = "Execute SQL Query"
+    description: str = (
+        "Execute a DuckDB SQL query against the table named 'data'. "
+        "Quote column names with double quotes, e.g. SELECT value FROM data WHERE \"ČR, kraje\" = 'Česko'"
+    )
+    args_schema: type[BaseModel] = SQLQueryInput
+    view_name: str = Field(default="data")
+    dataset_code: str = Field(default=None)
+    data_path: str = Field(default=None)
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        self.data_path = self.data_path or get_catalog().get(self.dataset_code).data_path
+        get_engine(self.data_path, self.view_name)
+
+    def _run(self, query: str) -> str:
+        tool_calls.record(self.name)
+        try:
+            table = get_engine(self.data_path, self.view_name).query_arrow(query)
+            return truncate_text(format_arrow_table(table, max_rows=DEFAULT_MAX_ROWS))
+        except Exception as e:
+            return f"Query error: {str(e)}"
@@ -1,7 +1,13 @@
 import pandas as pd
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
-from prototype3.utils.path_utils import get_data_file
+from prototype3.utils.dataset_catalog import get_catalog
+from prototype3.utils.dataset_cache import dataset_cache, get_dataset
+from prototype3.utils.dataset_loader import load_typed_dataset
+from prototype3.utils.query_cache import query_cache
+from prototype3.utils.query_executor import execute_query
+from prototype3.utils.result_serializer import serialize_result
+from prototype3.utils.tool_calls import tool_calls
 
 class QueryInput(BaseModel):
     query: str = Field(description="Pandas query string to execute")
@@ -11,16 +17,34 @@ class PandasQueryTool(BaseTool):
     description: str = "Execute pandas query on the dataframe named 'df'"
     args_schema: type[BaseModel] = QueryInput
     df: pd.DataFrame = Field(default=None)
+    dataset_code: str = Field(default=None)
+    data_path: str = Field(default=None)
 
     model_config = {"arbitrary_types_allowed": True}
     
     def __init__(self, **data):
         super().__init__(**data)
-        self.df = pd.read_csv(get_data_file('OBY01PDT01.csv'))
+        self.data_path = self.data_path or get_catalog().get(self.dataset_code).data_path
+        # Shared process-wide frame with Categorical dimensions; only re-read when the CSV changes on disk
+        self.df = get_dataset(self.data_path, loader=load_typed_dataset)
 
     def _run(self, query: str) -> str:
+        tool_calls.record(self.name)
         try:
-            result = eval(query, {'df': self.df, 'pd': pd}, {})
-            return str(result)
+            # Pick up a reloaded frame if the file changed since the last call
+            self.df = get_dataset(self.data_path, loader=load_typed_dataset)
+            version = dataset_cache.version(self.data_path, loader=load_typed_dataset)
+            key = query_cache.make_key(self.data_path, version, query)
+
+            output = query_cache.get(key)
+            status = "hit"
+            if output is None:
+                status = "miss"
+                # Validated against the allowlist, compiled once, run with time and size limits
+                output = serialize_result(execute_query(query, self.df))
+                query_cache.put(key, output)
+
+            stats = query_cache.stats()
+            return f"{output}\n[query cache: {status}, hits={stats['hits']}, misses={stats['misses']}]"
         except Exception as e:
             return f"Query error: {str(e)}"
@@ -0,0 +1,200 @@
+"""
+Long-running analysis daemon with a local HTTP API.
+
+Keeps crewai, the tracer, the LLM client, the dataset catalog and all caches
+warm in one process, so a request only pays for its own query work. Requests
+go through a bounded queue served by a fixed number of worker threads; when
+the queue is full the daemon answers 503 instead of piling up work.
+
+    python -m prototype3.daemon --port 8765 --workers 4 --queue-size 32
+
+API (localhost only by default):
+    GET  /health   {"status": "ok", "workers", "queued", "processed", "uptime_seconds"}
+    POST /analyze  {"prompt": ..., "dataset": optional, "bypass_cache": optional}
+                   -> the run_flow record: prompt, result, error, cached, planned, seconds
+"""
+import argparse
+import json
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from prototype3.concurrent_batch import run_flow
+from prototype3.crews.data_analysis_crew.data_analysis_crew import get_llm
+from prototype3.daemon_protocol import parse_analyze_request
+from prototype3.utils.dataset_catalog import DEFAULT_DATASET, get_catalog
+from prototype3.utils.query_planner import get_query_planner
+from prototype3.utils.tracing import get_tracer
+
+# Defaults can be overridden through environment variables
+DEFAULT_HOST = os.getenv("ANALYSIS_DAEMON_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.getenv("ANALYSIS_DAEMON_PORT", "8765"))
+DEFAULT_WORKERS = int(os.getenv("ANALYSIS_DAEMON_WORKERS", "4"))
+DEFAULT_QUEUE_SIZE = int(os.getenv("ANALYSIS_DAEMON_QUEUE_SIZE", "32"))
+MAX_REQUEST_BYTES = 64 * 1024
+
+
+class AnalysisDaemon:
+    """Bounded request queue in front of a pool of flow worker threads."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE):
+        if workers < 1:
+            raise ValueError(f"Invalid worker count: {workers}")
+        self.workers = workers
+        self.requests = queue.Queue(maxsize=queue_size)
+        self.started_at = time.time()
+        self.processed = 0
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"daemon-worker-{i}", daemon=True) for i in range(workers)
+        ]
+
+    def warm_up(self, datasets: list = None):
+        """Loads everything a first request would otherwise pay for."""
+        start = time.perf_counter()
+        get_tracer()
+        get_llm()
+        catalog = get_catalog()
+        for code in datasets or [DEFAULT_DATASET]:
+            catalog.frame(code)
+            if catalog.get(code).metadata_path:
+                get_query_planner(code)
+        print(f"Daemon warmed up in {time.perf_counter() - start:.2f} seconds")
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        # Workers are daemon threads; the sentinels only let idle ones exit early
+        for _ in self._threads:
+            try:
+                self.requests.put_nowait(None)
+            except queue.Full:
+                break
+
+    def submit(self, prompt: str, dataset: str = None, bypass_cache: bool = None) -> Future:
+        """
+        Queues a prompt.
+
+        Raises:
+            queue.Full: If the request queue is at capacity
+        """
+        future = Future()
+        self.requests.put_nowait((future, prompt, dataset, bypass_cache))
+        return future
+
+    def _work(self):
+        while True:
+            job = self.requests.get()
+            if job is None:
+                return
+            future, prompt, dataset, bypass_cache = job
+            if future.set_running_or_notify_cancel():
+                future.set_result(run_flow(prompt, dataset, bypass_cache))
+            with self._lock:
+                self.processed += 1
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "queued": self.requests.qsize(),
+            "queue_size": self.requests.maxsize,
+            "processed": self.processed,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+        }
+
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    daemon: AnalysisDaemon = None  # Set by serve()
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, self.daemon.health())
+        else:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/analyze":
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self._send(400, {"error": "Invalid Content-Length"})
+            return
+        if length > MAX_REQUEST_BYTES:
+            self._send(413, {"error": f"Request larger than {MAX_REQUEST_BYTES} bytes"})
+            return
+        try:
+            prompt, dataset, bypass_cache = parse_analyze_request(self.rfile.read(length), datasets=get_catalog().codes())
+        except ValueError as e:  # Includes malformed JSON and UTF-8
+            self._send(400, {"error": f"Invalid request: {e}"})
+            return
+
+        try:
+            future = self.daemon.submit(prompt, dataset, bypass_cache)
+        except queue.Full:
+            self._send(503, {"error": "Request queue is full, retry later"})
+            return
+        record = future.result()
+        self._send(500 if record["error"] else 200, record)
+
+    def log_message(self, format, *args):
+        print(f"[daemon] {self.address_string()} {format % args}")
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS,
+          queue_size: int = DEFAULT_QUEUE_SIZE, datasets: list = None):
+    """Warms up, then serves requests until interrupted."""
+    daemon = AnalysisDaemon(workers=workers, queue_size=queue_size)
+    daemon.warm_up(datasets)
+    daemon.start()
+
+    DaemonRequestHandler.daemon = daemon
+    server = ThreadingHTTPServer((host, port), DaemonRequestHandler)
+    server.daemon_threads = True
+    if threading.current_thread() is threading.main_thread():
+        # SIGTERM stops the daemon like Ctrl+C does
+        signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    print(f"Analysis daemon listening on http://{host}:{port} ({workers} workers, queue {queue_size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.stop()
+        print("Analysis daemon stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve DataAnalysisFlow over a local HTTP API")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Flows run concurrently")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Requests waiting at most")
+    parser.add_argument("--dataset", action="append", dest="datasets", help="Dataset to preload (repeatable)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.queue_size, args.datasets)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
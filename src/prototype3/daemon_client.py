@@ -0,0 +1,81 @@
+"""
+Thin client of the analysis daemon (see prototype3.daemon).
+
+Only uses the standard library, so callers such as batch_processor and
+batch_runner.py do not import crewai or the datasets themselves.
+"""
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+DEFAULT_DAEMON_URL = os.getenv("ANALYSIS_DAEMON_URL", "http://127.0.0.1:8765")
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("ANALYSIS_DAEMON_TIMEOUT_SECONDS", "600"))
+# Set ANALYSIS_DAEMON=0 to never use a running daemon
+DAEMON_ENABLED = os.getenv("ANALYSIS_DAEMON", "1") != "0"
+# How often a request rejected with a full queue (503) is retried
+DEFAULT_RETRIES = int(os.getenv("ANALYSIS_DAEMON_RETRIES", "60"))
+
+
+class DaemonError(RuntimeError):
+    """Raised when the daemon rejects a request or the analysis fails."""
+
+    def __init__(self, message: str, status: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _request(url: str, payload: dict = None, timeout: float = DEFAULT_TIMEOUT_SECONDS) -> dict:
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.loads(e.read().decode("utf-8")).get("error", e.reason)
+        except ValueError:
+            message = e.reason
+        retry_after = float(e.headers.get("Retry-After") or 1) if e.code == 503 else None
+        raise DaemonError(f"Daemon returned {e.code}: {message}", e.code, retry_after) from e
+    except OSError as e:  # Connection refused, timeouts
+        raise DaemonError(f"Daemon not reachable at {url}: {getattr(e, 'reason', e)}") from e
+
+
+def daemon_available(url: str = DEFAULT_DAEMON_URL, timeout: float = 1.0) -> bool:
+    """True when daemon use is enabled and a daemon answers its health check."""
+    if not DAEMON_ENABLED:
+        return False
+    try:
+        return _request(f"{url}/health", timeout=timeout).get("status") == "ok"
+    except (ValueError, DaemonError):
+        return False
+
+
+def analyze(prompt: str, dataset: str = None, bypass_cache: bool = False, url: str = DEFAULT_DAEMON_URL,
+            timeout: float = DEFAULT_TIMEOUT_SECONDS, retries: int = DEFAULT_RETRIES) -> dict:
+    """
+    Runs one prompt on the daemon, waiting and retrying while its queue is full.
+
+    Returns:
+        dict: The flow record with prompt, result, cached, planned and seconds
+
+    Raises:
+        DaemonError: If the daemon is unreachable, the queue is full, the request is invalid or the flow failed
+    """
+    payload = {"prompt": prompt, "bypass_cache": bypass_cache}
+    if dataset:
+        payload["dataset"] = dataset
+    for attempt in range(retries + 1):
+        try:
+            record = _request(f"{url}/analyze", payload, timeout=timeout)
+            break
+        except DaemonError as e:
+            if e.status != 503 or attempt == retries:
+                raise
+            time.sleep(e.retry_after)
+    if record.get("error"):
+        raise DaemonError(record["error"])
+    return record
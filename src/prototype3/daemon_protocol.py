@@ -0,0 +1,37 @@
+"""
+Request parsing of the analysis daemon's HTTP API (see prototype3.daemon).
+
+Only uses the standard library, so requests can be validated and tested
+without importing crewai.
+"""
+import json
+
+
+def parse_analyze_request(body: bytes, datasets: list = None) -> tuple:
+    """
+    Returns (prompt, dataset, bypass_cache) of an /analyze request body.
+
+    Args:
+        body: Raw request body
+        datasets: Known dataset codes; None accepts any dataset name
+
+    Raises:
+        ValueError: If the body is not a JSON object with a non-empty string prompt,
+            an optional known dataset and an optional boolean bypass_cache
+    """
+    payload = json.loads(body.decode("utf-8"))
+    if not isinstance(payload, dict):
+        raise ValueError("Body must be a JSON object")
+    prompt = payload.get("prompt")
+    if not isinstance(prompt, str) or not prompt.strip():
+        raise ValueError("'prompt' must be a non-empty string")
+    dataset = payload.get("dataset")
+    if dataset is not None:
+        if not isinstance(dataset, str):
+            raise ValueError("'dataset' must be a string")
+        if datasets is not None and dataset not in datasets:
+            raise ValueError(f"Unknown dataset '{dataset}'. Available: {sorted(datasets)}")
+    bypass_cache = payload.get("bypass_cache")
+    if bypass_cache is not None and not isinstance(bypass_cache, bool):
+        raise ValueError("'bypass_cache' must be true, false or null")
+    return prompt.strip(), dataset, bypass_cache
@@ -1,55 +1,129 @@
 import os
-import json
+import time
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from phoenix.otel import register
 
 # Load environment variables
 load_dotenv()
 
-# Configure Phoenix tracer using the successful approach
-print("Initializing Phoenix tracing...")
-tracer_provider = register(
-    project_name="CrewAI_Prototype3",  # Project name that will appear in the UI
-    auto_instrument=True               # Auto-instrument supported libraries
-)
-tracer = tracer_provider.get_tracer(__name__)
-
-print("✅ Phoenix tracing initialized")
-
 from crewai.flow import Flow, listen, start
-from prototype3.crews.data_analysis_crew.data_analysis_crew import DataAnalysisCrew
+from prototype3.crews.data_analysis_crew.data_analysis_crew import DataAnalysisCrew, crew_config_hash
 from prototype3.tools.path_debug import debug_paths
-from prototype3.utils.path_utils import get_metadata_file
+from prototype3.utils.dataset_catalog import DEFAULT_DATASET, get_catalog
+from prototype3.utils.schema_slicer import SCHEMA_SLICING_ENABLED, get_schema_slicer
+from prototype3.utils.query_planner import QUERY_PLANNER_ENABLED, get_query_planner
+from prototype3.utils.result_files import write_result_file
+from prototype3.utils.results_store import append_text_result, get_results_store
+from prototype3.utils.tracing import tracer
+from prototype3.utils.answer_cache import ANSWER_CACHE_BYPASS, answer_key, answer_scope, get_answer_cache
+from prototype3.utils.similarity_index import NEAR_DUPLICATE_CHECK_DIMENSIONS, NEAR_DUPLICATE_ENABLED
 
 class DataAnalysisState(BaseModel):
     prompt: str = ""  # Changed from user_query
+    dataset: str = ""  # Catalog code of the dataset to query
     schema: dict = {}
+    schema_report: dict = {}  # What schema slicing kept and the tokens it saved
     result: str = ""
+    result_file: str = ""  # Per-run JSON result file for the caller, from ANALYSIS_RESULT_FILE
+    bypass_cache: bool = ANSWER_CACHE_BYPASS  # Skip the answer cache lookup (the fresh answer is still stored)
+    cache_key: str = ""
+    cache_scope: str = ""
+    cache_hit: bool = False
+    similar_prompt: str = ""  # Stored prompt whose answer was reused for a near-duplicate
+    dimensions: dict = {}  # Dimension values the prompt resolves to
+    planned: bool = False  # Answered by the deterministic query planner without the crew
+    query_plan: dict = {}
+    started_at: float = 0.0
+    timings: dict = {}  # Seconds spent in each flow step
 
 class DataAnalysisFlow(Flow[DataAnalysisState]):
     @tracer.chain
     @start()
     def process_prompt(self):  # Changed from process_query
+        self.state.started_at = time.time()
+        self.state.dataset = self.state.dataset or DEFAULT_DATASET
+        self.state.result_file = self.state.result_file or os.getenv("ANALYSIS_RESULT_FILE", "")
+
         # Debug paths before starting
-        paths_info = debug_paths()
+        paths_info = debug_paths(self.state.dataset)
         print(f"Path check results: {paths_info}")
         
-        # Load schema
-        schema_path = get_metadata_file('OBY01PDT01_metadata.json')
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            self.state.schema = json.load(f)
+        # Load schema from the catalog (parsed once per process)
+        self.state.schema = get_catalog().metadata(self.state.dataset)
         
-        # Use environment variable if available, otherwise use default
-        self.state.prompt = os.getenv("ANALYSIS_PROMPT", "What is the amount of men in Prague at the end of Q3 2024?")
+        # Prompt passed through kickoff inputs wins; then the environment variable, then the default
+        self.state.prompt = self.state.prompt or os.getenv("ANALYSIS_PROMPT", "What is the amount of men in Prague at the end of Q3 2024?")
 
     @tracer.chain
     @listen(process_prompt)
+    def check_answer_cache(self):
+        """Serve a stored answer for the same prompt, data and crew config without running the crew"""
+        start = time.perf_counter()
+        dataset_version, config_hash = get_catalog().version(self.state.dataset), crew_config_hash()
+        self.state.cache_key = answer_key(self.state.prompt, dataset_version, config_hash)
+        self.state.cache_scope = answer_scope(dataset_version, config_hash)
+        if NEAR_DUPLICATE_ENABLED:
+            self.state.dimensions = get_schema_slicer(self.state.dataset).resolve(self.state.prompt)
+        if self.state.bypass_cache:
+            return
+        cache = get_answer_cache()
+        cached = cache.get(self.state.cache_key)
+        if cached is None and NEAR_DUPLICATE_ENABLED:
+            # Paraphrases of an answered prompt, e.g. 'males in Praha' for 'men in Prague'
+            match = cache.find_similar(
+                self.state.prompt, self.state.cache_scope,
+                dimensions=self.state.dimensions if NEAR_DUPLICATE_CHECK_DIMENSIONS else None,
+            )
+            if match is not None:
+                score, self.state.similar_prompt, cached = match
+                print(f"Near-duplicate of '{self.state.similar_prompt}' (similarity {score:.2f})")
+        if cached is not None:
+            self.state.result = cached
+            self.state.cache_hit = True
+            self.state.timings["check_answer_cache"] = round(time.perf_counter() - start, 4)
+            print(f"Answer cache hit, served in {self.state.timings['check_answer_cache'] * 1000:.1f} ms")
+
+    @tracer.chain
+    @listen(check_answer_cache)
+    def plan_query(self):
+        """Answer prompts of the common shapes straight from the data, without the LLM"""
+        if not QUERY_PLANNER_ENABLED or self.state.cache_hit:
+            return
+        start = time.perf_counter()
+        answer = get_query_planner(self.state.dataset).answer(self.state.prompt)
+        self.state.timings["plan_query"] = round(time.perf_counter() - start, 4)
+        if answer is None:
+            print("Query planner: no confident plan, using the crew")
+            return
+        self.state.result, self.state.query_plan = answer
+        self.state.planned = True
+        print(f"Query planner answered in {self.state.timings['plan_query'] * 1000:.1f} ms: {self.state.query_plan['query']}")
+
+    @tracer.chain
+    @listen(plan_query)
+    def slice_schema(self):
+        """Keep only the dimension values relevant to the prompt to shrink the LLM context"""
+        if not SCHEMA_SLICING_ENABLED or self.state.cache_hit or self.state.planned:
+            return
+        start = time.perf_counter()
+        slicer = get_schema_slicer(self.state.dataset)
+        self.state.schema, self.state.schema_report = slicer.slice(self.state.prompt)
+        self.state.timings["slice_schema"] = round(time.perf_counter() - start, 4)
+        report = self.state.schema_report
+        print(f"Schema slicing: {report['full_tokens']} -> {report['sliced_tokens']} tokens "
+              f"({report['tokens_saved']} saved), dimensions: {report['dimensions']}")
+
+    @tracer.chain
+    @listen(slice_schema)
     def analyze_data(self):
+        if self.state.cache_hit or self.state.planned:
+            return
         print("[DEBUG] Starting analyze_data method")
         print(f"[DEBUG] Current prompt: {self.state.prompt}") 
         crew = DataAnalysisCrew()
+        crew.dataset_code = self.state.dataset
         print("[DEBUG] DataAnalysisCrew instance created")
+        start = time.perf_counter()
         try:
             print("[DEBUG] Attempting to kickoff crew")
             # Fix: Pass inputs to the crew's kickoff method
@@ -60,6 +134,7 @@ class DataAnalysisFlow(Flow[DataAnalysisState]):
             print("[DEBUG] Crew kickoff successful")
             print(f"[DEBUG] Result type: {type(result)}")
             self.state.result = result.raw
+            self.state.timings["analyze_data"] = round(time.perf_counter() - start, 4)
         except Exception as e:
             print(f"[DEBUG] Error during crew execution: {str(e)}")
             print(f"[DEBUG] Error type: {type(e)}")
@@ -69,11 +144,32 @@ class DataAnalysisFlow(Flow[DataAnalysisState]):
     @listen(analyze_data)
     def save_result(self):
         print("Saving analysis result")
-        # Changed to append mode - 'a' instead of 'w'
-        with open("analysis_results.txt", "a", encoding='utf-8') as f:
-            f.write(f"\nPrompt: {self.state.prompt}\n")
-            f.write(f"Result: {self.state.result}\n")
-            f.write("-" * 50 + "\n")
+        # Indexed, concurrency-safe store; analysis_results.txt is still appended for the notebook
+        get_results_store().add(
+            prompt=self.state.prompt,
+            result=self.state.result,
+            dataset=self.state.dataset,
+            dataset_version=get_catalog().version(self.state.dataset),
+            started_at=self.state.started_at,
+            timings=self.state.timings,
+        )
+        append_text_result(self.state.prompt, self.state.result)
+
+        if not self.state.cache_hit:
+            get_answer_cache().put(self.state.cache_key, self.state.prompt, self.state.result,
+                                   dataset=self.state.dataset, scope=self.state.cache_scope,
+                                   dimensions=self.state.dimensions if NEAR_DUPLICATE_ENABLED else None)
+
+        # Hand this run's result to the caller directly instead of via the shared text file
+        if self.state.result_file:
+            write_result_file(self.state.result_file, {
+                "prompt": self.state.prompt,
+                "dataset": self.state.dataset,
+                "result": self.state.result,
+                "cached": self.state.cache_hit,
+                "similar_prompt": self.state.similar_prompt,
+                "planned": self.state.planned,
+            })
 
 def kickoff():
     # Add a trace for the whole flow execution
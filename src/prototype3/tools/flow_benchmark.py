@@ -0,0 +1,241 @@
+"""
+End-to-end benchmark of DataAnalysisFlow and process_dataframe_parallel, fully offline.
+
+The LLM is replaced by the offline stand-in (prototype3.utils.offline_llm) in
+stub or replay mode, tracing is off, and results and answers go to temporary
+databases, so runs need no network and leave the project's stores untouched.
+Each suite runs at several concurrency levels and reports latency, throughput,
+LLM calls, tokens and tool calls; the run fails when a level misses the
+regression thresholds in benchmarks/thresholds.json.
+
+The query planner is off by default, so the flow suite measures the crew.
+With --planner, prompts the planner answers run as a separate "planner" suite.
+Replay needs responses recorded with LLM_OFFLINE_MODE=record and fails on
+requests without one instead of silently answering with the stub.
+
+    python -m prototype3.tools.flow_benchmark --profile realistic --concurrency 1 4 8
+    python -m prototype3.tools.flow_benchmark --suite processor --rows 50
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from prototype3.utils.path_utils import get_project_root
+
+BENCHMARK_DIR = os.path.join(get_project_root(), "benchmarks")
+PROCESSOR_PATH = os.path.join(get_project_root(), "utilities", "dynamic_parallel_dataframe_llm_processor.py")
+
+# Simulated API behavior of the offline stand-in
+PROFILES = {
+    "fast": {"LLM_OFFLINE_LATENCY_MS": "50"},
+    "realistic": {"LLM_OFFLINE_LATENCY_MS": "800", "LLM_OFFLINE_JITTER_MS": "300", "LLM_OFFLINE_MS_PER_TOKEN": "5"},
+    "throttled": {"LLM_OFFLINE_LATENCY_MS": "800", "LLM_OFFLINE_JITTER_MS": "300",
+                  "LLM_OFFLINE_RATE_LIMIT_RATE": "0.1"},
+    "flaky": {"LLM_OFFLINE_LATENCY_MS": "800", "LLM_OFFLINE_JITTER_MS": "300", "LLM_OFFLINE_ERROR_RATE": "0.05"},
+}
+
+
+def configure_environment(profile: str, mode: str, planner: bool):
+    """Sets the offline environment; must run before the flow modules are imported. Explicit settings win."""
+    scratch = tempfile.mkdtemp(prefix="flow_benchmark_")
+    defaults = {
+        "LLM_OFFLINE_MODE": mode,
+        "TRACING_MODE": "off",
+        "ANSWER_CACHE_BYPASS": "1",
+        "QUERY_PLANNER": "1" if planner else "0",
+        "LLM_OFFLINE_STRICT": "1" if mode == "replay" else "0",
+        "PROCESSOR_CACHE": "off",
+        "RESULTS_DB": os.path.join(scratch, "results.db"),
+        "RESULTS_TXT": os.path.join(scratch, "results.txt"),
+        "ANSWER_CACHE_DB": os.path.join(scratch, "answers.db"),
+        **PROFILES[profile],
+    }
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+
+
+def percentile(values: list, share: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))]
+
+
+def _offline_stats() -> dict:
+    from prototype3.utils.offline_llm import get_offline_responder
+
+    responder = get_offline_responder()
+    return responder.stats_dict() if responder else {}
+
+
+def _delta(before: dict, after: dict) -> dict:
+    return {name: after[name] - before.get(name, 0) for name in after}
+
+
+def split_planned(prompts: list) -> tuple:
+    """Returns (prompts the query planner answers, prompts that go to the crew)."""
+    from prototype3.utils.query_planner import get_query_planner
+
+    planner = get_query_planner()
+    planned = [prompt for prompt in prompts if planner.plan(prompt) is not None]
+    return planned, [prompt for prompt in prompts if prompt not in planned]
+
+
+def benchmark_flow(prompts: list, levels: list, suite: str = "flow") -> list:
+    """Runs the prompts through concurrent flows at each concurrency level."""
+    import asyncio
+
+    from prototype3.concurrent_batch import run_batch_async
+    from prototype3.crews.data_analysis_crew.data_analysis_crew import get_llm
+    from prototype3.utils.tool_calls import tool_calls
+
+    get_llm()  # Installs the offline stand-in before the first flow
+    rows = []
+    for concurrency in levels:
+        llm_before, tools_before = _offline_stats(), tool_calls.stats()
+        start = time.perf_counter()
+        records = asyncio.run(run_batch_async(prompts, concurrency=concurrency))
+        elapsed = time.perf_counter() - start
+        llm = _delta(llm_before, _offline_stats())
+        tools = _delta(tools_before, tool_calls.stats())
+        latencies = [record["seconds"] for record in records]
+        rows.append({
+            "suite": suite,
+            "concurrency": concurrency,
+            "items": len(records),
+            "seconds": round(elapsed, 3),
+            "throughput_per_second": round(len(records) / elapsed, 3),
+            "p50_seconds": round(statistics.median(latencies), 3),
+            "p95_seconds": round(percentile(latencies, 0.95), 3),
+            "error_rate": round(sum(1 for record in records if record["error"]) / len(records), 3),
+            "planned": sum(1 for record in records if record.get("planned")),
+            "llm_calls": llm.get("calls", 0),
+            "prompt_tokens": llm.get("prompt_tokens", 0),
+            "completion_tokens": llm.get("completion_tokens", 0),
+            "tool_calls": tools.pop("total"),
+            "tool_calls_by_tool": {name: calls for name, calls in tools.items() if calls},
+        })
+    return rows
+
+
+def _load_processor():
+    spec = importlib.util.spec_from_file_location("dynamic_parallel_dataframe_llm_processor", PROCESSOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def benchmark_processor(row_count: int, levels: list) -> list:
+    """Runs process_dataframe_parallel over synthetic rows at each worker count."""
+    import pandas as pd
+
+    processor = _load_processor()
+    processor.PROMPT_TEMPLATE = "Topic: {topic}\nTask: {task}"
+    frame = pd.DataFrame({
+        "topic": [f"topic {i}" for i in range(row_count)],
+        "task": [f"summarize item {i}" for i in range(row_count)],
+    })
+    rows = []
+    for workers in levels:
+        llm_before = _offline_stats()
+        start = time.perf_counter()
+        result = processor.process_dataframe_parallel(
+            frame.copy(), output_column="response", max_workers=workers,
+            requests_per_minute=processor.CONFIG['REQUESTS_PER_MINUTE']['MAX'],
+        )
+        elapsed = time.perf_counter() - start
+        llm = _delta(llm_before, _offline_stats())
+        failed = int(result["response"].isna().sum())
+        rows.append({
+            "suite": "processor",
+            "concurrency": workers,
+            "items": row_count,
+            "seconds": round(elapsed, 3),
+            "throughput_per_second": round(row_count / elapsed, 3),
+            "seconds_per_row": round(elapsed / row_count, 4),
+            "error_rate": round(failed / row_count, 3),
+            "llm_calls": llm.get("calls", 0),
+            "rate_limited": llm.get("rate_limited", 0),
+            "prompt_tokens": llm.get("prompt_tokens", 0),
+            "completion_tokens": llm.get("completion_tokens", 0),
+        })
+    return rows
+
+
+def check_thresholds(rows: list, thresholds: dict) -> list:
+    """Returns a message for every row that misses a threshold of its suite."""
+    checks = {
+        "max_p95_seconds": ("p95_seconds", lambda value, limit: value <= limit),
+        "min_throughput_per_second": ("throughput_per_second", lambda value, limit: value >= limit),
+        "max_error_rate": ("error_rate", lambda value, limit: value <= limit),
+        "max_seconds_per_row": ("seconds_per_row", lambda value, limit: value <= limit),
+    }
+    failures = []
+    for row in rows:
+        for name, limit in thresholds.get(row["suite"], {}).items():
+            metric, passes = checks[name]
+            if metric in row and not passes(row[metric], limit):
+                failures.append(f"{row['suite']} @ concurrency {row['concurrency']}: "
+                                f"{metric}={row[metric]} violates {name}={limit}")
+    return failures
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the flow and the dataframe processor")
+    parser.add_argument("--suite", choices=["flow", "processor", "all"], default="all")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast", help="Simulated API behavior")
+    parser.add_argument("--mode", choices=["stub", "replay"], default="stub",
+                        help="Stub answers, or responses recorded with LLM_OFFLINE_MODE=record")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--prompts", default=os.path.join(BENCHMARK_DIR, "prompts.txt"))
+    parser.add_argument("--rows", type=int, default=20, help="Rows of the processor suite")
+    parser.add_argument("--planner", action="store_true",
+                        help="Answer prompts with the query planner where it can, reported as the 'planner' suite")
+    parser.add_argument("--thresholds", default=os.path.join(BENCHMARK_DIR, "thresholds.json"))
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    configure_environment(args.profile, args.mode, planner=args.planner)
+    from prototype3.utils.offline_llm import DEFAULT_FIXTURES_PATH
+
+    if args.mode == "replay" and not os.path.exists(DEFAULT_FIXTURES_PATH):
+        parser.error(f"No recorded responses at {DEFAULT_FIXTURES_PATH}; record them with LLM_OFFLINE_MODE=record")
+
+    rows = []
+    if args.suite in ("flow", "all"):
+        with open(args.prompts, "r", encoding="utf-8") as f:
+            prompts = [line.strip() for line in f if line.strip()]
+        planned = []
+        if args.planner:
+            planned, prompts = split_planned(prompts)
+        if prompts:
+            rows += benchmark_flow(prompts, args.concurrency)
+        if planned:
+            rows += benchmark_flow(planned, args.concurrency, suite="planner")
+    if args.suite in ("processor", "all"):
+        rows += benchmark_processor(args.rows, args.concurrency)
+
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+    thresholds = {}
+    if args.thresholds and os.path.exists(args.thresholds):
+        with open(args.thresholds, "r", encoding="utf-8") as f:
+            thresholds = json.load(f)
+    failures = check_thresholds(rows, thresholds)
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"profile": args.profile, "mode": args.mode, "results": rows, "failures": failures},
+                      f, ensure_ascii=False, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
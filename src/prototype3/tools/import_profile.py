@@ -0,0 +1,83 @@
+"""
+Import-time profile of the project's entry modules with a cold-start budget.
+
+Each module is imported in a fresh interpreter with `python -X importtime`, so
+the numbers are what a CLI call or batch subprocess pays before doing any work.
+The command fails when an import exceeds the budget or pulls in a module that
+must only be loaded on first use (tracing, the LLM client).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["prototype3.main", "prototype3.tools.path_debug", "prototype3.concurrent_batch"]
+# Modules that must stay unimported until a flow actually traces or calls the LLM
+DEFERRED_MODULES = ["phoenix.otel", "langchain_openai", "openinference.instrumentation"]
+DEFAULT_BUDGET_MS = float(os.getenv("COLD_START_BUDGET_MS", "3000"))
+
+_PROBE = (
+    "import importlib, json, sys\n"
+    "importlib.import_module(sys.argv[1])\n"
+    "print(json.dumps([name for name in json.loads(sys.argv[2]) if name in sys.modules]))\n"
+)
+
+
+def profile_import(module: str, deferred: list = DEFERRED_MODULES) -> dict:
+    """
+    Imports a module in a fresh interpreter and collects its import timings.
+
+    Returns:
+        dict: total_ms, the slowest imports as [(module, cumulative_ms)], and the
+            deferred modules that were loaded anyway
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE, module, json.dumps(deferred)],
+        capture_output=True, text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{process.stderr[-2000:]}")
+
+    timings = []
+    for line in process.stderr.splitlines():
+        # Format: "import time: <self us> | <cumulative us> | <indented module>"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings.append((name[1:].rstrip(), int(cumulative) / 1000))
+
+    # Top-level imports are not indented, their cumulative times add up to the total
+    top_level = [ms for name, ms in timings if not name.startswith(" ")]
+    return {
+        "module": module,
+        "total_ms": round(sum(top_level), 1),
+        "slowest": [(name.strip(), ms) for name, ms in sorted(timings, key=lambda item: -item[1])[:15]],
+        "eager": json.loads(process.stdout.strip().splitlines()[-1]),
+    }
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile import time of the project's entry modules")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Fail when a module takes longer than this to import (default: COLD_START_BUDGET_MS)")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        report = profile_import(module)
+        over_budget = report["total_ms"] > args.budget_ms
+        status = "OVER BUDGET" if over_budget else "ok"
+        print(f"{module}: {report['total_ms']:.0f} ms (budget {args.budget_ms:.0f} ms) {status}")
+        for name, ms in report["slowest"][:args.top]:
+            print(f"  {ms:8.1f} ms  {name}")
+        if report["eager"]:
+            print(f"  imported eagerly, should be deferred: {', '.join(report['eager'])}")
+        failed = failed or over_budget or bool(report["eager"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
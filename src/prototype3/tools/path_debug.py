@@ -1,34 +1,42 @@
 import os
-from prototype3.utils.path_utils import get_project_root, get_data_file, get_metadata_file
+from prototype3.utils.path_utils import get_project_root, get_knowledge_dir
+from prototype3.utils.dataset_catalog import DEFAULT_DATASET, get_catalog
 
-def debug_paths():
+def debug_paths(dataset_code: str = DEFAULT_DATASET):
     """
     Debug function to print and check paths to important project files.
     
+    Args:
+        dataset_code: Catalog code of the dataset to check
+    
     Returns:
         dict: Dictionary containing path information and existence checks
     """
     cwd = os.getcwd()
     project_root = get_project_root()
+    catalog = get_catalog()
     
-    # Check standard paths
-    metadata_path = get_metadata_file('OBY01PDT01_metadata.json')
-    csv_path = get_data_file('OBY01PDT01.csv')
+    # Check catalog paths
+    entry = catalog.entries.get(dataset_code)
+    metadata_path = entry.metadata_path if entry else None
+    csv_path = entry.data_path if entry else None
     
     # Check additional knowledge paths
-    knowledge_root = os.path.join(project_root, 'knowledge')
-    alt_metadata_path = os.path.join(knowledge_root, 'metadata_about_tables', 'OBY01PDT01_metadata.json')
-    alt_csv_path = os.path.join(knowledge_root, 'csvs_with_data', 'OBY01PDT01.csv')
+    knowledge_root = get_knowledge_dir()
+    alt_metadata_path = os.path.join(knowledge_root, 'metadata_about_tables', f'{dataset_code}_metadata.json')
+    alt_csv_path = os.path.join(knowledge_root, 'csvs_with_data', f'{dataset_code}.csv')
     
     # Collect and print path information
     path_info = {
         "current_directory": cwd,
         "project_root": project_root,
+        "dataset": dataset_code,
+        "catalog_datasets": len(catalog.entries),
         "standard_paths": {
             "metadata_path": metadata_path,
-            "metadata_exists": os.path.exists(metadata_path),
+            "metadata_exists": bool(metadata_path) and os.path.exists(metadata_path),
             "csv_path": csv_path,
-            "csv_exists": os.path.exists(csv_path)
+            "csv_exists": bool(csv_path) and os.path.exists(csv_path)
         },
         "alternate_paths": {
             "knowledge_root": knowledge_root,
@@ -43,6 +51,7 @@ def debug_paths():
     # Print summary for quick debugging
     print(f"Current working directory: {cwd}")
     print(f"Project root: {project_root}")
+    print(f"Datasets in catalog: {path_info['catalog_datasets']}")
     print(f"Standard metadata path exists: {path_info['standard_paths']['metadata_exists']}")
     print(f"Standard CSV path exists: {path_info['standard_paths']['csv_exists']}")
     
@@ -0,0 +1,105 @@
+"""
+Micro-benchmark of tracing overhead per flow in each TRACING_MODE.
+
+A synthetic flow of the same shape as DataAnalysisFlow (a root span around five
+chained steps that do a little work) is run many times per mode. Spans go to an
+exporter that discards them behind the usual batch processor, so the numbers
+are the in-process cost of tracing, not network time.
+
+    python -m prototype3.tools.tracing_benchmark --flows 2000 --ratio 0.1
+"""
+import argparse
+import time
+
+from prototype3.utils.tracing import SAMPLE_RATIO, TRACING_MODES, build_tracer_provider, traced
+
+FLOW_STEPS = 5
+
+
+def _null_exporter():
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class NullExporter(SpanExporter):
+        def __init__(self):
+            self.exported = 0
+
+        def export(self, spans):
+            self.exported += len(spans)
+            return SpanExportResult.SUCCESS
+
+    return NullExporter()
+
+
+def _step(value: int) -> int:
+    # Stands in for the cheap bookkeeping of a flow step
+    return sum(range(value % 50))
+
+
+def _flow_runner(mode: str, ratio: float):
+    """Returns (run one flow, provider, exporter) for a mode; provider and exporter are None when tracing is off."""
+    exporter = None if mode == "off" else _null_exporter()
+    provider = build_tracer_provider(mode, ratio=ratio, exporter=exporter, auto_instrument=False, set_global=False)
+    if provider is None:
+        steps = [_step] * FLOW_STEPS
+
+        def run_flow(i: int):
+            for step in steps:
+                step(i)
+
+        return run_flow, None, None
+
+    tracer = provider.get_tracer("tracing_benchmark")
+    steps = [traced(tracer, _step) for _ in range(FLOW_STEPS)]
+
+    def run_flow(i: int):
+        with tracer.start_as_current_span("crewai_flow_execution"):
+            for step in steps:
+                step(i)
+
+    return run_flow, provider, exporter
+
+
+def benchmark(flows: int = 2000, ratio: float = SAMPLE_RATIO) -> list:
+    """
+    Runs `flows` synthetic flows per mode.
+
+    Returns:
+        list: One dict per mode with the mean microseconds per flow, the overhead
+            over mode "off" and the number of spans exported
+    """
+    results = []
+    baseline = None
+    for mode in TRACING_MODES:
+        run_flow, provider, exporter = _flow_runner(mode, ratio)
+        for i in range(min(100, flows)):  # Warm up
+            run_flow(i)
+        start = time.perf_counter()
+        for i in range(flows):
+            run_flow(i)
+        per_flow_us = (time.perf_counter() - start) / flows * 1e6
+        if provider is not None:
+            provider.force_flush()
+            provider.shutdown()
+        baseline = per_flow_us if baseline is None else baseline
+        results.append({
+            "mode": mode,
+            "per_flow_us": round(per_flow_us, 1),
+            "overhead_us": round(per_flow_us - baseline, 1),
+            "spans_exported": exporter.exported if exporter is not None else 0,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure tracing overhead per flow in each tracing mode")
+    parser.add_argument("--flows", type=int, default=2000, help="Flows to run per mode")
+    parser.add_argument("--ratio", type=float, default=SAMPLE_RATIO, help="Sample ratio of the sampled mode")
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'us/flow':>10} {'overhead':>10} {'spans':>8}")
+    for row in benchmark(args.flows, args.ratio):
+        print(f"{row['mode']:<8} {row['per_flow_us']:>10.1f} {row['overhead_us']:>10.1f} {row['spans_exported']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from prototype3.utils.path_utils import get_project_root
+from prototype3.utils.results_store import normalize_prompt
+from prototype3.utils.similarity_index import NEAR_DUPLICATE_THRESHOLD, SimilarityIndex, numbers
+
+# Defaults can be overridden through environment variables
+DEFAULT_ANSWER_CACHE_DB = os.getenv("ANSWER_CACHE_DB", os.path.join(get_project_root(), "answer_cache.db"))
+DEFAULT_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "10000"))
+ANSWER_CACHE_BYPASS = os.getenv("ANSWER_CACHE_BYPASS", "0") == "1"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    dataset TEXT,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    scope TEXT,
+    dimensions TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_answers_last_used ON answers (last_used_at);
+CREATE INDEX IF NOT EXISTS idx_answers_created ON answers (created_at);
+"""
+# Columns added after the first release; older databases get them through ALTER TABLE
+MIGRATIONS = {
+    "scope": "ALTER TABLE answers ADD COLUMN scope TEXT",
+    "dimensions": "ALTER TABLE answers ADD COLUMN dimensions TEXT",
+}
+SCOPE_INDEX = "CREATE INDEX IF NOT EXISTS idx_answers_scope ON answers (scope, created_at)"
+
+
+def answer_key(prompt: str, dataset_version: str, config_hash: str) -> str:
+    """
+    Builds the cache key of a whole flow run.
+
+    The normalized prompt is combined with the content hash of the dataset and
+    metadata and a hash of the agent/task configuration, so editing the data or
+    the prompts of the crew never serves an answer produced under the old ones.
+    """
+    material = "\0".join([normalize_prompt(prompt), dataset_version, config_hash])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def answer_scope(dataset_version: str, config_hash: str) -> str:
+    """Groups the answers produced for the same data and crew config; near-duplicates never cross scopes."""
+    return hashlib.sha256(f"{dataset_version}\0{config_hash}".encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """
+    Persistent exact-match cache of flow answers, stored in SQLite.
+
+    Entries expire after `ttl_seconds`; when the cache grows past `max_entries`
+    the least recently used entries are dropped.
+
+    Besides exact lookups, `find_similar` serves paraphrased prompts from an
+    in-process n-gram similarity index per scope, built from the stored prompts
+    on first use and topped up with entries written since.
+    """
+
+    def __init__(self, path: str = DEFAULT_ANSWER_CACHE_DB, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._indexes = {}  # scope -> (SimilarityIndex, created_at of the newest indexed entry)
+        self._indexes_lock = threading.Lock()
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+            columns = {row["name"] for row in connection.execute("PRAGMA table_info(answers)")}
+            for column, statement in MIGRATIONS.items():
+                if column not in columns:
+                    connection.execute(statement)
+            connection.execute(SCOPE_INDEX)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str):
+        """Returns the cached answer, or None if missing or expired."""
+        now = time.time()
+        with self._connection() as connection:
+            row = connection.execute("SELECT result, created_at FROM answers WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row["created_at"] > self.ttl_seconds:
+                connection.execute("DELETE FROM answers WHERE key = ?", (key,))
+                self._forget([key])
+                return None
+            connection.execute("UPDATE answers SET last_used_at = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            return row["result"]
+
+    def put(self, key: str, prompt: str, result: str, dataset: str = None, scope: str = None,
+            dimensions: dict = None):
+        """
+        Stores an answer, then applies TTL and size eviction.
+
+        Args:
+            scope: answer_scope() of the run; only scoped entries are offered as near-duplicates
+            dimensions: Dimension values the prompt resolved to, compared by find_similar
+        """
+        now = time.time()
+        encoded_dimensions = json.dumps(dimensions, ensure_ascii=False, sort_keys=True) if dimensions is not None else None
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO answers (key, prompt, dataset, result, created_at, last_used_at, hits, scope, dimensions) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)",
+                (key, prompt, dataset, result, now, now, scope, encoded_dimensions),
+            )
+            expired = connection.execute(
+                "DELETE FROM answers WHERE created_at < ? RETURNING key", (now - self.ttl_seconds,)
+            ).fetchall()
+            evicted = connection.execute(
+                "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY last_used_at DESC LIMIT -1 OFFSET ?) "
+                "RETURNING key",
+                (self.max_entries,),
+            ).fetchall()
+        # The stored key is indexed again from its new row on the next lookup of its scope
+        self._forget([key, *(row["key"] for row in expired + evicted)])
+
+    def entries(self, scope: str, since: float = 0.0) -> list:
+        """Returns the live entries of a scope created after `since`, oldest first."""
+        return self._connection().execute(
+            "SELECT key, prompt, dimensions, created_at FROM answers "
+            "WHERE scope = ? AND created_at > ? AND created_at >= ? ORDER BY created_at",
+            (scope, since, time.time() - self.ttl_seconds),
+        ).fetchall()
+
+    def _live_count(self, scope: str) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM answers WHERE scope = ? AND created_at >= ?", (scope, time.time() - self.ttl_seconds),
+        ).fetchone()[0]
+
+    def _live_keys(self, scope: str) -> set:
+        return {row["key"] for row in self._connection().execute(
+            "SELECT key FROM answers WHERE scope = ? AND created_at >= ?", (scope, time.time() - self.ttl_seconds),
+        )}
+
+    def _similarity_index(self, scope: str) -> SimilarityIndex:
+        with self._indexes_lock:
+            index, newest = self._indexes.get(scope, (None, 0.0))
+            if index is None:
+                index = SimilarityIndex()
+            # Entries written by other processes since the last lookup are picked up here
+            for row in self.entries(scope, since=newest):
+                index.add(row["prompt"], (row["key"], row["dimensions"]), key=row["key"])
+                newest = row["created_at"]
+            # Entries that expired or that other processes evicted are dropped here
+            if index and len(index) > self._live_count(scope):
+                for key in set(index.keys) - self._live_keys(scope):
+                    index.remove(key)
+            self._indexes[scope] = (index, newest)
+            return index
+
+    def _forget(self, keys: list):
+        """Drops deleted entries from the similarity indexes so they stop being offered."""
+        with self._indexes_lock:
+            for index, _ in self._indexes.values():
+                for key in keys:
+                    index.remove(key)
+
+    def find_similar(self, prompt: str, scope: str, dimensions: dict = None,
+                     threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        """
+        Returns the answer to the most similar stored prompt of the same scope.
+
+        A candidate is only reused when its similarity reaches `threshold`, it
+        mentions exactly the same numbers (so 'Q3 2024' never answers 'Q2 2024')
+        and, when `dimensions` is given, it resolved to the same dimension values.
+
+        Returns:
+            tuple: (score, matched prompt, answer), or None
+        """
+        expected_numbers = numbers(prompt)
+        expected_dimensions = json.dumps(dimensions, ensure_ascii=False, sort_keys=True) if dimensions is not None else None
+        for score, text, (key, stored_dimensions) in self._similarity_index(scope).search(prompt):
+            if score < threshold:
+                break
+            if numbers(text) != expected_numbers:
+                continue
+            if expected_dimensions is not None and stored_dimensions != expected_dimensions:
+                continue
+            # get() also rejects entries that expired or were evicted since they were indexed
+            result = self.get(key)
+            if result is not None:
+                return score, text, result
+            self._forget([key])
+        return None
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM answers")
+        with self._indexes_lock:
+            self._indexes.clear()
+
+    def stats(self) -> dict:
+        row = self._connection().execute("SELECT COUNT(*) AS entries, COALESCE(SUM(hits), 0) AS hits FROM answers").fetchone()
+        return dict(row)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_answer_cache(path: str = DEFAULT_ANSWER_CACHE_DB) -> AnswerCache:
+    """Returns the process-wide answer cache for a database file."""
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = AnswerCache(path)
+        return _caches[path]
@@ -0,0 +1,134 @@
+import glob
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from prototype3.utils.dataset_cache import file_signature
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # Columnar cache is optional; callers fall back to CSV parsing
+    pa = None
+
+# Set COLUMNAR_CACHE=0 to always parse the CSV
+COLUMNAR_CACHE_ENABLED = os.getenv("COLUMNAR_CACHE", "1") != "0"
+CACHE_DIR_NAME = ".columnar"
+
+_hashes = {}  # (path, mtime_ns, size) -> sha256, so unchanged files are hashed once per process
+_hash_lock = threading.Lock()
+
+
+def is_available() -> bool:
+    """True when pyarrow is installed and the cache is not disabled."""
+    return pa is not None and COLUMNAR_CACHE_ENABLED
+
+
+def content_hash(*paths: str) -> str:
+    """Returns a sha256 over the contents of the given files."""
+    digest = hashlib.sha256()
+    for path in paths:
+        key = (os.path.abspath(path), *file_signature(path))
+        with _hash_lock:
+            file_hash = _hashes.get(key)
+        if file_hash is None:
+            file_digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    file_digest.update(chunk)
+            file_hash = file_digest.hexdigest()
+            with _hash_lock:
+                _hashes[key] = file_hash
+        digest.update(file_hash.encode())
+    return digest.hexdigest()
+
+
+def cache_path_for(csv_path: str, digest: str) -> str:
+    """Returns data/.columnar/<code>-<hash>.arrow for a data file."""
+    code = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIR_NAME, f"{code}-{digest[:16]}.arrow")
+
+
+def write_arrow(df: pd.DataFrame, path: str):
+    """
+    Writes a frame as an uncompressed Arrow IPC file.
+
+    Categorical columns become dictionary-encoded arrays. The file is written to a
+    temporary name and renamed, so concurrent readers never see a partial file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def read_arrow(path: str) -> pd.DataFrame:
+    """
+    Memory-maps an Arrow IPC file and returns it as a DataFrame.
+
+    Buffers come straight from the OS page cache, so processes reading the same
+    file share its pages; split_blocks lets pandas reuse them without consolidation.
+    """
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def _remove_stale(csv_path: str, keep: str):
+    code = os.path.splitext(os.path.basename(csv_path))[0]
+    for stale in glob.glob(os.path.join(os.path.dirname(keep), f"{code}-*.arrow")):
+        if stale != keep:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass  # Still mapped by another process (Windows); removed on a later run
+
+
+def load_columnar(csv_path: str, build_frame, extra_paths: tuple = ()) -> pd.DataFrame:
+    """
+    Loads a dataset from its columnar copy, creating the copy on first use.
+
+    Args:
+        csv_path: Source CSV file
+        build_frame: Callable returning the typed frame parsed from the CSV
+        extra_paths: Other files whose content shapes the frame (e.g. metadata)
+
+    Returns:
+        pd.DataFrame: The typed frame
+    """
+    digest = content_hash(csv_path, *extra_paths)
+    arrow_path = cache_path_for(csv_path, digest)
+    if os.path.exists(arrow_path):
+        return read_arrow(arrow_path)
+
+    df = build_frame()
+    try:
+        write_arrow(df, arrow_path)
+        _remove_stale(csv_path, arrow_path)
+    except OSError as e:
+        print(f"⚠️ Could not write columnar cache {arrow_path}: {e}")
+        return df
+    return read_arrow(arrow_path)
+
+
+def convert_all():
+    """Writes the columnar copy of every dataset in the catalog ahead of time."""
+    from prototype3.utils.dataset_catalog import get_catalog
+    from prototype3.utils.dataset_loader import load_typed_dataset
+
+    catalog = get_catalog()
+    for code in catalog.codes():
+        entry = catalog.get(code)
+        load_typed_dataset(entry.data_path, entry.metadata_path)
+        print(f"✅ {code}: columnar copy up to date")
+
+
+if __name__ == "__main__":
+    if not is_available():
+        raise SystemExit("pyarrow is not installed or COLUMNAR_CACHE=0")
+    convert_all()
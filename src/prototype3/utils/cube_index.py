@@ -0,0 +1,113 @@
+import difflib
+import os
+import threading
+
+import pandas as pd
+
+from prototype3.utils.dataset_cache import dataset_cache, get_dataset
+from prototype3.utils.dataset_loader import load_metadata, load_typed_dataset, metadata_path_for
+
+
+class CubeIndex:
+    """
+    Hash index over the dimension columns of a dataset.
+
+    Every row is stored under the tuple of its dimension category codes, so a
+    point lookup of one (period, region, indicator, ...) cell is a dict access
+    instead of a boolean-mask scan over the frame.
+    """
+
+    def __init__(self, df: pd.DataFrame, dimensions: list, value_column: str = "value"):
+        self.dimensions = [d for d in dimensions if d in df.columns]
+        self.value_column = value_column
+        self.categories = {}  # dimension -> list of values, position = code
+        self.codes = {}       # dimension -> {value: code}
+
+        code_columns = []
+        for dimension in self.dimensions:
+            column = df[dimension]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                codes, categories = column.cat.codes.to_numpy(), list(column.cat.categories)
+            else:
+                codes, categories = pd.factorize(column)
+                categories = list(categories)
+            self.categories[dimension] = [str(value) for value in categories]
+            self.codes[dimension] = {value: code for code, value in enumerate(self.categories[dimension])}
+            code_columns.append(codes.tolist())
+
+        self.cells = {}
+        self.duplicates = 0
+        for key, value in zip(zip(*code_columns), df[value_column].tolist()):
+            if key in self.cells:
+                self.duplicates += 1
+            self.cells[key] = value
+        if self.duplicates:
+            print(f"⚠️ Cube index: {self.duplicates} duplicate dimension combinations, last value kept")
+
+    @classmethod
+    def from_metadata(cls, df: pd.DataFrame, metadata: dict) -> "CubeIndex":
+        value_column = metadata.get("value_column", {}).get("name", "value")
+        return cls(df, list(metadata.get("dimensions", {})), value_column)
+
+    def _code(self, dimension: str, value: str) -> int:
+        codes = self.codes[dimension]
+        if value in codes:
+            return codes[value]
+        suggestions = difflib.get_close_matches(str(value), list(codes), n=3, cutoff=0.4)
+        raise KeyError(f"Unknown value '{value}' for '{dimension}'. Closest matches: {suggestions}")
+
+    def lookup(self, dimension_values: dict):
+        """
+        Returns the value of one cell.
+
+        Dimensions that have a single value in the dataset may be omitted.
+
+        Raises:
+            KeyError: For unknown dimensions or values, missing dimensions or empty cells
+        """
+        unknown = [d for d in dimension_values if d not in self.codes]
+        if unknown:
+            raise KeyError(f"Unknown dimension(s) {unknown}. Available: {self.dimensions}")
+
+        key = []
+        for dimension in self.dimensions:
+            if dimension in dimension_values:
+                key.append(self._code(dimension, dimension_values[dimension]))
+            elif len(self.categories[dimension]) == 1:
+                key.append(0)
+            else:
+                raise KeyError(f"Missing value for dimension '{dimension}'")
+
+        key = tuple(key)
+        if key not in self.cells:
+            raise KeyError(f"No data for {dimension_values}")
+        return self.cells[key]
+
+
+_indexes = {}  # absolute csv path -> (dataset version, CubeIndex)
+_lock = threading.Lock()
+
+
+def get_cube_index(csv_path: str, metadata_path: str = None) -> CubeIndex:
+    """Returns the cube index of a dataset, rebuilt only when the dataset is reloaded."""
+    df = get_dataset(csv_path, loader=load_typed_dataset)
+    version = dataset_cache.version(csv_path, loader=load_typed_dataset)
+    key = os.path.abspath(csv_path)
+    with _lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    metadata = load_metadata(metadata_path or metadata_path_for(csv_path))
+    index = CubeIndex.from_metadata(df, metadata)
+    with _lock:
+        _indexes[key] = (version, index)
+    return index
+
+
+def _drop_index(path: str):
+    with _lock:
+        _indexes.pop(os.path.abspath(path), None)
+
+
+# Drop indexes of datasets that are reloaded or invalidated
+dataset_cache.add_reload_listener(_drop_index)
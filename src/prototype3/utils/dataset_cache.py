@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+# Defaults can be overridden through environment variables
+DEFAULT_MAX_ENTRIES = int(os.getenv("DATASET_CACHE_MAX_ENTRIES", "32"))
+DEFAULT_MEMORY_BUDGET_MB = float(os.getenv("DATASET_CACHE_MAX_MB", "1024"))
+
+# Cached frames are handed out as shallow copies, which only isolate callers under
+# Copy-on-Write. It is the default since pandas 3.0 and switched on here for older
+# versions, so a hit never copies the data.
+if int(pd.__version__.split(".")[0]) < 3 and pd.get_option("mode.copy_on_write") is not True:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def file_signature(path: str) -> tuple:
+    """Returns (mtime_ns, size) of a file, used to detect changes on disk."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DatasetCache:
+    """
+    Process-wide cache of loaded DataFrames.
+
+    Entries are keyed by absolute file path and loader, and validated against the
+    file's mtime and size on every access, so a frame is only re-read when the file
+    actually changes. Least recently used entries are evicted when either the entry
+    count or the memory budget is exceeded.
+
+    Callers get their own shallow copy of the cached frame: the data is shared,
+    and Copy-on-Write copies it only when a caller writes, so changes made by one
+    caller are never seen by another.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB):
+        self.max_entries = max_entries
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self._entries = OrderedDict()  # key -> (signature, frame, nbytes)
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._reload_listeners = []
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+        self.loads = 0
+        self.load_time = 0.0
+
+    @staticmethod
+    def _key(path: str, loader) -> tuple:
+        loader_name = getattr(loader, "__qualname__", repr(loader))
+        return os.path.abspath(path), f"{getattr(loader, '__module__', '')}.{loader_name}"
+
+    def get(self, path: str, loader=pd.read_csv) -> pd.DataFrame:
+        """
+        Return the frame for `path`, loading it with `loader(path)` on a miss.
+
+        Args:
+            path: Path to the dataset file
+            loader: Callable taking the path and returning a DataFrame
+
+        Returns:
+            pd.DataFrame: A private copy of the cached frame
+        """
+        key = self._key(path, loader)
+        signature = file_signature(key[0])
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(entry[1])
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the global lock so other datasets stay available;
+        # the per-key lock stops concurrent callers loading the same file twice
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == signature:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._copy(entry[1])
+                self.misses += 1
+                if entry is not None:
+                    self.reloads += 1
+
+            start = time.perf_counter()
+            frame = loader(key[0])
+            elapsed = time.perf_counter() - start
+            nbytes = int(frame.memory_usage(deep=True).sum())
+
+            with self._lock:
+                self.loads += 1
+                self.load_time += elapsed
+                self._entries[key] = (signature, frame, nbytes)
+                self._entries.move_to_end(key)
+                self._evict(keep=key)
+            if entry is not None:
+                self._notify_reload(key[0])
+        return self._copy(frame)
+
+    @staticmethod
+    def _copy(frame: pd.DataFrame) -> pd.DataFrame:
+        return frame.copy(deep=False)
+
+    def version(self, path: str, loader=pd.read_csv):
+        """Returns the signature of the currently cached frame, or None if not loaded."""
+        with self._lock:
+            entry = self._entries.get(self._key(path, loader))
+        return entry[0] if entry is not None else None
+
+    def add_reload_listener(self, callback):
+        """Registers callback(path), called when a dataset is reloaded or invalidated."""
+        self._reload_listeners.append(callback)
+
+    def _notify_reload(self, path: str):
+        for callback in self._reload_listeners:
+            callback(path)
+
+    def _evict(self, keep=None):
+        """Drop least recently used entries until both limits are met."""
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries
+            or self.memory_bytes() > self.memory_budget_bytes
+        ):
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            del self._entries[oldest]
+            self._load_locks.pop(oldest, None)
+            self.evictions += 1
+
+    def memory_bytes(self) -> int:
+        """Total memory held by cached frames."""
+        return sum(entry[2] for entry in self._entries.values())
+
+    def invalidate(self, path: str = None):
+        """Drop one dataset (all loaders) or, without a path, the whole cache."""
+        with self._lock:
+            if path is None:
+                paths = {key[0] for key in self._entries}
+                self._entries.clear()
+                self._load_locks.clear()
+            else:
+                paths = {os.path.abspath(path)}
+                for key in [k for k in self._entries if k[0] in paths]:
+                    del self._entries[key]
+                for key in [k for k in self._load_locks if k[0] in paths]:
+                    del self._load_locks[key]
+        for invalidated in paths:
+            self._notify_reload(invalidated)
+
+    def stats(self) -> dict:
+        """Cache counters for logging and debugging."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "memory_mb": round(self.memory_bytes() / (1024 * 1024), 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "evictions": self.evictions,
+                "loads": self.loads,
+                "load_time_s": round(self.load_time, 4),
+            }
+
+
+# Shared by every tool instance in the process
+dataset_cache = DatasetCache()
+
+
+def get_dataset(path: str, loader=pd.read_csv) -> pd.DataFrame:
+    """Returns the process-wide cached DataFrame for a dataset file."""
+    return dataset_cache.get(path, loader)
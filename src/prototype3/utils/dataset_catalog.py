@@ -0,0 +1,120 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pandas as pd
+
+from prototype3.utils.columnar_store import content_hash
+from prototype3.utils.dataset_cache import get_dataset
+from prototype3.utils.dataset_loader import load_metadata, load_typed_dataset
+from prototype3.utils.path_utils import get_data_dirs, get_metadata_dirs
+
+# Dataset used when a prompt does not name one
+DEFAULT_DATASET = os.getenv("ANALYSIS_DATASET", "OBY01PDT01")
+METADATA_SUFFIX = "_metadata.json"
+MAX_CACHED_METADATA = int(os.getenv("CATALOG_MAX_METADATA", "256"))
+
+
+@dataclass
+class DatasetEntry:
+    """Location of one dataset's files."""
+    code: str
+    data_path: str
+    metadata_path: str = None
+
+
+class DatasetCatalog:
+    """
+    Registry of datasets found in the data/metadata folders and their knowledge/ mirrors.
+
+    Folders are scanned once; frames and metadata are only read when a dataset is
+    first used. Frames live in the shared dataset cache, which evicts them under
+    its memory budget, and parsed metadata is kept in a bounded LRU.
+    """
+
+    def __init__(self, data_dirs: list = None, metadata_dirs: list = None):
+        self.data_dirs = data_dirs or get_data_dirs()
+        self.metadata_dirs = metadata_dirs or get_metadata_dirs()
+        self.entries = {}
+        self._metadata = OrderedDict()
+        self._lock = threading.Lock()
+
+    def scan(self) -> "DatasetCatalog":
+        """Registers every <code>.csv with its <code>_metadata.json; earlier folders win."""
+        data_files, metadata_files = {}, {}
+        for directory in self.data_dirs:
+            for filename in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+                code, extension = os.path.splitext(filename)
+                if extension.lower() == ".csv":
+                    data_files.setdefault(code, os.path.join(directory, filename))
+        for directory in self.metadata_dirs:
+            for filename in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+                if filename.endswith(METADATA_SUFFIX):
+                    code = filename[:-len(METADATA_SUFFIX)]
+                    metadata_files.setdefault(code, os.path.join(directory, filename))
+
+        with self._lock:
+            self.entries = {
+                code: DatasetEntry(code, path, metadata_files.get(code))
+                for code, path in data_files.items()
+            }
+            self._metadata.clear()
+        return self
+
+    def codes(self) -> list:
+        return sorted(self.entries)
+
+    def get(self, code: str = None) -> DatasetEntry:
+        """
+        Returns the entry of a dataset.
+
+        Raises:
+            KeyError: If the dataset is not in the catalog
+        """
+        code = code or DEFAULT_DATASET
+        if code not in self.entries:
+            raise KeyError(f"Unknown dataset '{code}'. Available: {self.codes()}")
+        return self.entries[code]
+
+    def version(self, code: str = None) -> str:
+        """Returns a content hash of the dataset's data and metadata files."""
+        entry = self.get(code)
+        paths = [entry.data_path] + ([entry.metadata_path] if entry.metadata_path else [])
+        return content_hash(*paths)
+
+    def frame(self, code: str = None) -> pd.DataFrame:
+        """Returns the dataset as a shared DataFrame, loading it on first use."""
+        entry = self.get(code)
+        if entry.metadata_path is None:
+            return get_dataset(entry.data_path)
+        return get_dataset(entry.data_path, loader=load_typed_dataset)
+
+    def metadata(self, code: str = None) -> dict:
+        """Returns the parsed metadata of a dataset, loading it on first use."""
+        entry = self.get(code)
+        if entry.metadata_path is None:
+            raise KeyError(f"Dataset '{entry.code}' has no metadata file")
+        with self._lock:
+            if entry.code in self._metadata:
+                self._metadata.move_to_end(entry.code)
+                return self._metadata[entry.code]
+        metadata = load_metadata(entry.metadata_path)
+        with self._lock:
+            self._metadata[entry.code] = metadata
+            while len(self._metadata) > MAX_CACHED_METADATA:
+                self._metadata.popitem(last=False)
+        return metadata
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> DatasetCatalog:
+    """Returns the process-wide catalog, scanning the folders on first call."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = DatasetCatalog().scan()
+        return _catalog
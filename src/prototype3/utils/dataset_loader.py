@@ -0,0 +1,135 @@
+import json
+import os
+
+import pandas as pd
+
+from prototype3.utils import columnar_store
+from prototype3.utils.path_utils import get_metadata_dirs, get_metadata_file
+
+
+def load_metadata(metadata_path: str) -> dict:
+    """Loads a dataset metadata JSON file."""
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def metadata_path_for(csv_path: str) -> str:
+    """Returns the metadata file matching a data file, e.g. OBY01PDT01.csv -> OBY01PDT01_metadata.json."""
+    code = os.path.splitext(os.path.basename(csv_path))[0]
+    filename = f"{code}_metadata.json"
+    for directory in get_metadata_dirs():
+        candidate = os.path.join(directory, filename)
+        if os.path.exists(candidate):
+            return candidate
+    return get_metadata_file(filename)
+
+
+def _format_bytes(nbytes: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if nbytes < 1024 or unit == "GB":
+            return f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+
+
+def _downcast_values(series: pd.Series, decimals: int) -> pd.Series:
+    """Converts the value column to the smallest numeric dtype that holds it."""
+    numeric = pd.to_numeric(series, errors="coerce")
+    invalid = numeric.isna() & series.notna()
+    if invalid.any():
+        samples = series[invalid].astype(str).unique()[:5].tolist()
+        print(f"⚠️ Value column has {int(invalid.sum())} non-numeric entries, e.g. {samples}")
+    if decimals == 0 and not numeric.isna().any() and (numeric % 1 == 0).all():
+        return pd.to_numeric(numeric, downcast="integer")
+    return pd.to_numeric(numeric, downcast="float")
+
+
+def apply_dimension_types(df: pd.DataFrame, metadata: dict, strict: bool = False) -> dict:
+    """
+    Converts dimension columns to Categorical using the value sets declared in metadata.
+
+    Values found in the data but missing from the metadata are appended to the
+    categories (never turned into NaN) and reported back to the caller.
+
+    Args:
+        df: Frame to convert in place
+        metadata: Parsed metadata JSON
+        strict: Raise ValueError instead of reporting unknown values
+
+    Returns:
+        dict: Column name -> list of values not declared in metadata
+    """
+    unknown_values = {}
+    for column, dimension in metadata.get("dimensions", {}).items():
+        if column not in df.columns:
+            print(f"⚠️ Dimension '{column}' from metadata not found in data")
+            continue
+        declared = list(dict.fromkeys(dimension.get("values", [])))
+        declared_set = set(declared)
+        present = df[column].dropna().astype(str).unique().tolist()
+        unknown = [value for value in present if value not in declared_set]
+        if unknown:
+            if strict:
+                raise ValueError(f"Column '{column}' contains values not in metadata: {unknown[:10]}")
+            unknown_values[column] = unknown
+        df[column] = pd.Categorical(df[column].astype(str).where(df[column].notna()),
+                                    categories=declared + unknown)
+    return unknown_values
+
+
+def _parse_typed_csv(csv_path: str, metadata: dict, strict: bool, report: bool) -> pd.DataFrame:
+    """Parses the CSV and applies dimension and value types."""
+    dimensions = list(metadata.get("dimensions", {}))
+    value_column = metadata.get("value_column", {}).get("name", "value")
+
+    df = pd.read_csv(csv_path, dtype={column: object for column in dimensions})
+    before = int(df.memory_usage(deep=True).sum())
+
+    unknown_values = apply_dimension_types(df, metadata, strict=strict)
+    for column, values in unknown_values.items():
+        print(f"⚠️ Column '{column}' has {len(values)} value(s) not in metadata: {values[:10]}")
+
+    if value_column in df.columns:
+        decimals = metadata.get("value_column", {}).get("unit", {}).get("decimals", 0)
+        df[value_column] = _downcast_values(df[value_column], decimals)
+
+    if report:
+        after = int(df.memory_usage(deep=True).sum())
+        saved = 100 * (1 - after / before) if before else 0
+        print(f"Loaded {os.path.basename(csv_path)}: {len(df)} rows, "
+              f"memory {_format_bytes(before)} -> {_format_bytes(after)} ({saved:.0f}% saved)")
+    return df
+
+
+def load_typed_dataset(csv_path: str, metadata_path: str = None, strict: bool = False,
+                       report: bool = True) -> pd.DataFrame:
+    """
+    Loads a dataset with Categorical dimension columns and a downcast value column.
+
+    Equality and isin filters on Categorical columns compare integer codes instead
+    of Python strings, and the frame takes a fraction of the object-dtype memory.
+    When pyarrow is available the typed frame is cached as a memory-mapped Arrow
+    file keyed by the content hash of the CSV and metadata, so only the first load
+    of a given file version parses the CSV.
+
+    Args:
+        csv_path: Path to the CSV file
+        metadata_path: Path to the metadata JSON (defaults to <code>_metadata.json)
+        strict: Raise on values not declared in metadata instead of reporting them
+        report: Print a before/after memory report
+
+    Returns:
+        pd.DataFrame: The typed frame
+    """
+    metadata_path = metadata_path or metadata_path_for(csv_path)
+    if not os.path.exists(metadata_path):
+        print(f"⚠️ No metadata for {os.path.basename(csv_path)}, loading without dimension types")
+        return pd.read_csv(csv_path)
+    metadata = load_metadata(metadata_path)
+
+    def build_frame():
+        return _parse_typed_csv(csv_path, metadata, strict, report)
+
+    # Strict loads always re-validate the CSV instead of trusting a cached copy
+    if columnar_store.is_available() and not strict:
+        return columnar_store.load_columnar(csv_path, build_frame, extra_paths=(metadata_path,))
+    return build_frame()
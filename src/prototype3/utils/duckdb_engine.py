@@ -0,0 +1,120 @@
+import os
+import threading
+
+# Defaults can be overridden through environment variables
+DEFAULT_SOURCE_FORMAT = os.getenv("DUCKDB_SOURCE_FORMAT", "csv")  # csv | parquet
+DEFAULT_THREADS = os.getenv("DUCKDB_THREADS")  # None = DuckDB default (all cores)
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class DuckDBEngine:
+    """
+    SQL execution engine over dataset files registered as DuckDB views.
+
+    Views read the CSV (or a Parquet copy of it) directly, so DuckDB scans and
+    aggregates with its own vectorized, multi-threaded executor and the data is
+    never materialized as a pandas frame. Results are returned as Arrow tables.
+
+    Once the datasets are registered, `lock_down` confines the connection to
+    their files: agent SQL can then only run single SELECT statements and cannot
+    read, write or attach any other file, install extensions or change settings.
+    """
+
+    def __init__(self, database: str = ":memory:", threads: str = DEFAULT_THREADS):
+        import duckdb  # Imported on first engine so the pandas engine never pays for it
+
+        self.connection = duckdb.connect(database)
+        if threads:
+            self.connection.execute(f"SET threads TO {int(threads)}")
+        self._lock = threading.Lock()
+        self.views = {}
+        self.locked = False
+
+    def register_dataset(self, view_name: str, csv_path: str,
+                         source_format: str = DEFAULT_SOURCE_FORMAT) -> str:
+        """
+        Registers a dataset file as a view.
+
+        Args:
+            view_name: Name the SQL will refer to
+            csv_path: Path to the source CSV file
+            source_format: "csv" to scan the CSV, "parquet" to scan a Parquet copy
+                next to it (rewritten whenever the CSV is newer)
+
+        Returns:
+            str: Path of the file backing the view
+        """
+        if self.locked:
+            raise RuntimeError("Cannot register datasets after lock_down()")
+        if source_format not in ("csv", "parquet"):
+            raise ValueError(f"Unsupported source format: {source_format}")
+
+        source_path = os.path.abspath(csv_path)
+        scan = f"read_csv_auto({_quote_literal(source_path)}, header=true)"
+        if source_format == "parquet":
+            parquet_path = os.path.splitext(source_path)[0] + ".parquet"
+            if (not os.path.exists(parquet_path)
+                    or os.path.getmtime(parquet_path) < os.path.getmtime(source_path)):
+                with self._lock:
+                    self.connection.execute(
+                        f"COPY (SELECT * FROM {scan}) TO {_quote_literal(parquet_path)} (FORMAT parquet)"
+                    )
+            source_path = parquet_path
+            scan = f"read_parquet({_quote_literal(parquet_path)})"
+
+        with self._lock:
+            self.connection.execute(f"CREATE OR REPLACE VIEW {_quote_identifier(view_name)} AS SELECT * FROM {scan}")
+        self.views[view_name] = source_path
+        return source_path
+
+    def lock_down(self):
+        """Restricts file access to the registered datasets and freezes the configuration."""
+        paths = ", ".join(_quote_literal(path) for path in self.views.values())
+        with self._lock:
+            self.connection.execute(f"SET allowed_paths = [{paths}]")
+            self.connection.execute("SET enable_external_access = false")
+            self.connection.execute("SET lock_configuration = true")
+            self.locked = True
+
+    def query_arrow(self, sql: str):
+        """
+        Executes SQL and returns the result as a pyarrow.Table.
+
+        Raises:
+            ValueError: On a locked engine, if the SQL is not a single SELECT statement
+        """
+        import duckdb
+
+        if self.locked:
+            statements = self.connection.extract_statements(sql)
+            if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+                raise ValueError("Only a single SELECT statement is allowed")
+        # A cursor per query lets several threads share one database safely
+        cursor = self.connection.cursor()
+        try:
+            result = cursor.execute(sql)
+            to_arrow = getattr(result, "to_arrow_table", None) or result.fetch_arrow_table
+            return to_arrow()
+        finally:
+            cursor.close()
+
+
+def format_arrow_table(table, max_rows: int = 50) -> str:
+    """Renders an Arrow table as plain text without converting it to pandas."""
+    if table.num_rows == 1 and table.num_columns == 1:
+        return str(table.column(0)[0].as_py())
+
+    columns = table.column_names
+    lines = [" | ".join(columns)]
+    for row in table.slice(0, max_rows).to_pylist():
+        lines.append(" | ".join(str(row[column]) for column in columns))
+    if table.num_rows > max_rows:
+        lines.append(f"... ({table.num_rows} rows total, showing first {max_rows})")
+    return "\n".join(lines)
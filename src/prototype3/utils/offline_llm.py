@@ -0,0 +1,268 @@
+"""
+Offline stand-in for the Azure OpenAI model, for benchmarks and tests without network.
+
+The stand-in is a litellm custom provider. `install_offline_llm` points the
+model alias used everywhere ("gpt-4o") at it, so the crew (crewai hands the
+model name of the AzureChatOpenAI client to litellm) and the dataframe
+processor (litellm.completion) both use it without code changes.
+
+LLM_OFFLINE_MODE selects what it answers with:
+    off     the real Azure deployment (default)
+    stub    a canned final answer for every call
+    replay  responses recorded earlier, keyed by model and messages; unknown
+            requests get the stub answer, or fail with LLM_OFFLINE_STRICT=1
+    record  calls Azure and appends every response to the fixtures file
+
+Latency, error and rate-limit behavior of the stand-in is configurable, so
+benchmarks can reproduce slow or throttled APIs.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from prototype3.utils.path_utils import get_project_root
+from prototype3.utils.result_serializer import estimate_tokens
+
+# Defaults can be overridden through environment variables
+OFFLINE_MODES = ("off", "stub", "replay", "record")
+OFFLINE_MODE = os.getenv("LLM_OFFLINE_MODE", "off").lower()
+DEFAULT_FIXTURES_PATH = os.getenv(
+    "LLM_FIXTURES_PATH", os.path.join(get_project_root(), "benchmarks", "fixtures", "llm_responses.jsonl")
+)
+STRICT_REPLAY = os.getenv("LLM_OFFLINE_STRICT", "0") == "1"
+PROVIDER = "offline"
+# Parses as a final answer for crewai agents and is plain text for everything else
+STUB_RESPONSE = "Thought: I now know the final answer\nFinal Answer: offline stub response"
+
+
+@dataclass
+class LatencyProfile:
+    """Simulated API behavior: latency per call and share of failing calls."""
+    latency_ms: float = float(os.getenv("LLM_OFFLINE_LATENCY_MS", "0"))
+    jitter_ms: float = float(os.getenv("LLM_OFFLINE_JITTER_MS", "0"))
+    ms_per_output_token: float = float(os.getenv("LLM_OFFLINE_MS_PER_TOKEN", "0"))
+    error_rate: float = float(os.getenv("LLM_OFFLINE_ERROR_RATE", "0"))
+    rate_limit_rate: float = float(os.getenv("LLM_OFFLINE_RATE_LIMIT_RATE", "0"))
+    seed: int = None
+
+
+@dataclass
+class OfflineStats:
+    calls: int = 0
+    replayed: int = 0
+    stubbed: int = 0
+    recorded: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+def request_key(model: str, messages: list) -> str:
+    """Fixture key of a request: the model name without provider prefix plus the messages."""
+    material = json.dumps(
+        {"model": model.split("/")[-1], "messages": [(m.get("role"), m.get("content")) for m in messages]},
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    """Recorded responses in a JSON-lines file, one {"key", "model", "response"} object per line."""
+
+    def __init__(self, path: str = DEFAULT_FIXTURES_PATH):
+        self.path = path
+        self._responses = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._responses[record["key"]] = record["response"]
+
+    def __len__(self):
+        return len(self._responses)
+
+    def get(self, key: str):
+        return self._responses.get(key)
+
+    def add(self, key: str, model: str, response: str):
+        with self._lock:
+            self._responses[key] = response
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "model": model, "response": response}, ensure_ascii=False) + "\n")
+
+
+class OfflineResponder:
+    """
+    Produces the text of a response and applies the latency profile.
+
+    Kept free of litellm so the behavior can be driven directly; the litellm
+    handler built by `make_handler` only wraps it.
+    """
+
+    def __init__(self, mode: str = OFFLINE_MODE, fixtures: FixtureStore = None, profile: LatencyProfile = None,
+                 live_completion=None):
+        if mode not in OFFLINE_MODES:
+            raise ValueError(f"Unknown LLM_OFFLINE_MODE '{mode}', expected one of {OFFLINE_MODES}")
+        self.mode = mode
+        self.fixtures = fixtures if fixtures is not None else FixtureStore()
+        self.profile = profile or LatencyProfile()
+        self.live_completion = live_completion  # (model, messages, params) -> str, used by record mode
+        self.stats = OfflineStats()
+        self._random = random.Random(self.profile.seed)
+        self._lock = threading.Lock()
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    def failure(self):
+        """Returns "rate_limit", "error" or None for the next call according to the profile."""
+        with self._lock:
+            draw = self._random.random()
+        if draw < self.profile.rate_limit_rate:
+            self._count(rate_limited=1)
+            return "rate_limit"
+        if draw < self.profile.rate_limit_rate + self.profile.error_rate:
+            self._count(errors=1)
+            return "error"
+        return None
+
+    def respond(self, model: str, messages: list, params: dict = None) -> tuple:
+        """
+        Returns (text, prompt_tokens, completion_tokens) after the simulated latency.
+
+        Raises:
+            KeyError: In strict replay mode, for requests without a fixture
+        """
+        key = request_key(model, messages)
+        text = self.fixtures.get(key)
+        if text is not None:
+            self._count(replayed=1)
+        elif self.mode == "record":
+            text = self.live_completion(model, messages, params or {})
+            self.fixtures.add(key, model, text)
+            self._count(recorded=1)
+        elif self.mode == "replay" and STRICT_REPLAY:
+            raise KeyError(f"No recorded response for request {key[:12]} in {self.fixtures.path}")
+        else:
+            text = STUB_RESPONSE
+            self._count(stubbed=1)
+
+        prompt_tokens = sum(estimate_tokens(str(m.get("content") or "")) for m in messages)
+        completion_tokens = estimate_tokens(text)
+        if self.mode != "record":
+            delay_ms = self.profile.latency_ms + completion_tokens * self.profile.ms_per_output_token
+            with self._lock:
+                delay_ms += self._random.uniform(-1, 1) * self.profile.jitter_ms
+            time.sleep(max(0.0, delay_ms) / 1000)
+        self._count(calls=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        return text, prompt_tokens, completion_tokens
+
+    def stats_dict(self) -> dict:
+        with self._lock:
+            return asdict(self.stats)
+
+
+def _azure_completion(deployment: str):
+    """Live Azure call used by record mode."""
+    def complete(model: str, messages: list, params: dict) -> str:
+        import litellm
+
+        response = litellm.completion(
+            model=f"azure/{deployment}",
+            messages=messages,
+            api_base=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-05-01-preview"),
+            **{k: v for k, v in params.items() if k in ("temperature", "max_tokens", "stop")},
+        )
+        return response.choices[0].message.content
+    return complete
+
+
+def make_handler(responder: OfflineResponder):
+    """Wraps a responder as a litellm CustomLLM handler."""
+    import litellm
+    from litellm import CustomLLM
+
+    class OfflineLLM(CustomLLM):
+        def _response(self, model: str, messages: list, optional_params: dict = None, **kwargs):
+            failure = responder.failure()
+            if failure == "rate_limit":
+                raise litellm.RateLimitError(message="Offline stand-in: simulated 429", llm_provider=PROVIDER,
+                                             model=model)
+            if failure == "error":
+                raise litellm.InternalServerError(message="Offline stand-in: simulated 500",
+                                                  llm_provider=PROVIDER, model=model)
+            text, prompt_tokens, completion_tokens = responder.respond(model, messages, optional_params)
+            return litellm.ModelResponse(
+                model=model,
+                choices=[litellm.Choices(message=litellm.Message(role="assistant", content=text),
+                                         finish_reason="stop", index=0)],
+                usage=litellm.Usage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                    total_tokens=prompt_tokens + completion_tokens),
+            )
+
+        def completion(self, model: str, messages: list, *args, optional_params: dict = None, **kwargs):
+            return self._response(model, messages, optional_params)
+
+        async def acompletion(self, model: str, messages: list, *args, optional_params: dict = None, **kwargs):
+            import asyncio
+
+            return await asyncio.to_thread(self._response, model, messages, optional_params)
+
+    return OfflineLLM()
+
+
+_responder = None
+_lock = threading.Lock()
+
+
+def offline_model(alias: str) -> str:
+    """Provider-scoped model name the offline stand-in serves an alias under."""
+    return f"{PROVIDER}/offline-{alias}"
+
+
+def install_offline_llm(aliases: dict, mode: str = OFFLINE_MODE, profile: LatencyProfile = None):
+    """
+    Routes the given model aliases to the offline stand-in.
+
+    Args:
+        aliases: litellm.model_alias_map entries to redirect, e.g. {"gpt-4o": "azure/gpt-4o__test1"};
+            the Azure deployment is what record mode calls
+
+    Returns:
+        The process-wide OfflineResponder, or None when mode is "off"
+    """
+    global _responder
+    if mode == "off":
+        return None
+    import litellm
+
+    with _lock:
+        if _responder is None:
+            deployment = next(iter(aliases.values()), "").split("/")[-1]
+            _responder = OfflineResponder(mode, profile=profile, live_completion=_azure_completion(deployment))
+            litellm.custom_provider_map = [
+                entry for entry in litellm.custom_provider_map if entry.get("provider") != PROVIDER
+            ] + [{"provider": PROVIDER, "custom_handler": make_handler(_responder)}]
+        # litellm routes well-known names such as 'gpt-4o' to OpenAI before it looks at
+        # custom providers, so the target must be a model name it does not know
+        litellm.model_alias_map = {
+            **litellm.model_alias_map, **{alias: offline_model(alias) for alias in aliases},
+        }
+        return _responder
+
+
+def get_offline_responder():
+    """Returns the installed responder (None unless install_offline_llm ran in an offline mode)."""
+    return _responder
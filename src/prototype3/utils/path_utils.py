@@ -11,3 +11,26 @@ def get_data_file(filename: str) -> str:
 def get_metadata_file(filename: str) -> str:
     """Returns path to a file in the metadata folder."""
     return os.path.join(get_project_root(), 'metadata', filename)
+
+def get_knowledge_dir() -> str:
+    """Returns path to the knowledge folder mirroring data and metadata."""
+    return os.path.join(get_project_root(), 'knowledge')
+
+def get_data_dirs() -> list:
+    """Returns folders searched for data files, in priority order."""
+    return [os.path.join(get_project_root(), 'data'),
+            os.path.join(get_knowledge_dir(), 'csvs_with_data')]
+
+def get_metadata_dirs() -> list:
+    """Returns folders searched for metadata files, in priority order."""
+    return [os.path.join(get_project_root(), 'metadata'),
+            os.path.join(get_knowledge_dir(), 'metadata_about_tables')]
+
+def ensure_knowledge_dirs() -> str:
+    """Creates the knowledge folder and its subfolders if missing; returns the knowledge folder."""
+    knowledge_root = get_knowledge_dir()
+    for directory in [knowledge_root,
+                      os.path.join(knowledge_root, 'metadata_about_tables'),
+                      os.path.join(knowledge_root, 'csvs_with_data')]:
+        os.makedirs(directory, exist_ok=True)
+    return knowledge_root
@@ -0,0 +1,88 @@
+import ast
+import os
+import threading
+from collections import OrderedDict
+
+from prototype3.utils.dataset_cache import dataset_cache
+
+# Defaults can be overridden through environment variables
+DEFAULT_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "256"))
+
+
+def normalize_query(query: str) -> str:
+    """
+    Returns a canonical form of a Python expression.
+
+    The AST dump ignores whitespace, quote style and redundant parentheses, so
+    equivalent spellings of the same pandas expression share one cache key.
+
+    Raises:
+        SyntaxError: If the query is not a valid expression
+    """
+    return ast.dump(ast.parse(query.strip(), mode="eval"))
+
+
+class QueryResultCache:
+    """
+    Bounded LRU cache of query results.
+
+    Keys combine the dataset path, the dataset version (file signature) and the
+    normalized query, so a reloaded dataset never serves stale results. Entries of
+    a dataset can also be dropped explicitly with invalidate().
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(dataset_path: str, version, query: str) -> tuple:
+        return os.path.abspath(dataset_path), version, normalize_query(query)
+
+    def get(self, key: tuple):
+        """Returns the cached result or None, updating hit/miss counters."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, result):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, dataset_path: str = None):
+        """Drops cached results of one dataset or, without a path, everything."""
+        with self._lock:
+            if dataset_path is None:
+                self._entries.clear()
+                return
+            abs_path = os.path.abspath(dataset_path)
+            for key in [k for k in self._entries if k[0] == abs_path]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Shared by every tool instance in the process
+query_cache = QueryResultCache()
+
+# Drop cached results whenever a dataset is reloaded or invalidated
+dataset_cache.add_reload_listener(query_cache.invalidate)
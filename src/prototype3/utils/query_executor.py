@@ -0,0 +1,269 @@
+import ast
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+
+import pandas as pd
+
+# Defaults can be overridden through environment variables
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("QUERY_TIMEOUT_SECONDS", "10"))
+DEFAULT_MAX_RESULT_ROWS = int(os.getenv("QUERY_MAX_RESULT_ROWS", "100000"))
+DEFAULT_MAX_RESULT_MB = float(os.getenv("QUERY_MAX_RESULT_MB", "64"))
+QUERY_WORKERS = int(os.getenv("QUERY_WORKERS", "4"))
+# Most items a query may build by repeating literals ("a" * 10000000000 would exhaust
+# memory); nested lists count every item, so [[0] * 1000] * 1000 is a million
+MAX_LITERAL_LENGTH = 1_000_000
+# Calls producing Python sequences of data-dependent size, which may not be repeated
+SEQUENCE_CALLS = {"list", "sorted", "str", "tolist", "to_list"}
+# Timed-out queries still running in the background; beyond this new queries are refused
+MAX_STUCK_QUERIES = int(os.getenv("QUERY_MAX_STUCK", str(4 * QUERY_WORKERS)))
+
+
+class QueryValidationError(ValueError):
+    """Raised when a query uses syntax or operations outside the allowlist."""
+    pass
+
+
+class QueryLimitError(RuntimeError):
+    """Raised when a query exceeds its time or result-size limit."""
+    pass
+
+
+ALLOWED_NODES = (
+    ast.Expression, ast.Load, ast.Name, ast.Constant, ast.Attribute, ast.Subscript,
+    ast.Slice, ast.Call, ast.keyword, ast.List, ast.Tuple, ast.Dict,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.BoolOp, ast.And, ast.Or,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.BitAnd, ast.BitOr, ast.BitXor,
+    ast.UnaryOp, ast.USub, ast.UAdd, ast.Not, ast.Invert,
+)
+
+# Vectorized DataFrame/Series/GroupBy operations. Row-wise callbacks (apply, map,
+# iterrows), joins and anything that writes or reads files are deliberately absent.
+ALLOWED_ATTRIBUTES = {
+    # selection
+    "loc", "iloc", "at", "iat", "columns", "index", "values", "shape", "size", "dtypes",
+    "head", "tail", "isin", "between", "isna", "notna", "dropna", "fillna", "where",
+    "unique", "nunique", "value_counts", "drop_duplicates", "nlargest", "nsmallest",
+    "sort_values", "sort_index", "reset_index", "set_index", "rename", "astype", "filter",
+    "item", "squeeze", "tolist", "to_list", "to_dict", "cat", "categories", "codes",
+    # aggregation
+    "sum", "mean", "median", "min", "max", "count", "std", "var", "prod", "agg",
+    "aggregate", "describe", "idxmax", "idxmin", "first", "last", "quantile",
+    "groupby", "pivot_table", "unstack", "stack",
+    # arithmetic
+    "round", "abs", "add", "sub", "mul", "div", "truediv", "pct_change", "diff",
+    "cumsum", "rank", "clip",
+    # strings
+    "str", "contains", "startswith", "endswith", "lower", "upper", "strip", "replace", "len",
+    # pandas module
+    "to_numeric", "concat", "Series", "DataFrame",
+}
+
+SAFE_BUILTINS = {
+    "len": len, "round": round, "abs": abs, "min": min, "max": max, "sum": sum,
+    "int": int, "float": float, "str": str, "bool": bool, "list": list, "sorted": sorted,
+}
+
+ALLOWED_NAMES = {"df", "pd", *SAFE_BUILTINS}
+
+FORBIDDEN_KEYWORDS = {"inplace", "engine", "local_dict", "global_dict", "out"}
+
+# agg/aggregate/aggfunc look string arguments up as methods ('to_csv', 'pop',
+# '__class__'), so only these names may be passed as strings
+AGGREGATION_METHODS = {"agg", "aggregate"}
+AGGREGATION_FUNCTIONS = {"sum", "mean", "min", "max", "count", "median", "std", "var", "first", "last", "nunique"}
+# pivot_table(values, index, columns, aggfunc): aggfunc must be given by keyword
+MAX_PIVOT_POSITIONAL_ARGS = 3
+
+
+def _check_aggregation(node: ast.AST):
+    """Rejects aggregation functions named by strings outside AGGREGATION_FUNCTIONS."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        if node.value not in AGGREGATION_FUNCTIONS:
+            raise QueryValidationError(f"Aggregation function not allowed: {node.value!r}")
+    elif isinstance(node, (ast.List, ast.Tuple)):
+        for element in node.elts:
+            _check_aggregation(element)
+    elif isinstance(node, ast.Dict):
+        # Keys are column names, values are functions
+        for value in node.values:
+            _check_aggregation(value)
+
+
+def _is_sequence(node: ast.AST) -> bool:
+    """Whether `*` on the node repeats a Python sequence rather than multiplying numbers or frames."""
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, (str, bytes))
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return True
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Mult)):
+        return _is_sequence(node.left) or _is_sequence(node.right)
+    if isinstance(node, ast.Call):
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+        return name in SEQUENCE_CALLS
+    return False
+
+
+def _literal_length(node: ast.AST):
+    """
+    Items in a value built only from literals, counting nested lists in full, or None if it is not one.
+
+    Raises:
+        QueryValidationError: If a sequence that is not built from literals ([df] * n,
+            list(df.index) * n) or by a non-literal count is repeated
+    """
+    if isinstance(node, ast.Constant):
+        return len(node.value) if isinstance(node.value, (str, bytes)) else 1
+    if isinstance(node, ast.UnaryOp) and isinstance(node.operand, ast.Constant):
+        return 1
+    if isinstance(node, (ast.List, ast.Tuple)):
+        lengths = [_literal_length(element) for element in node.elts]
+        return None if None in lengths else max(len(lengths), sum(lengths))
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add) and _is_sequence(node):
+        left, right = _literal_length(node.left), _literal_length(node.right)
+        if left is not None and right is not None:
+            return left + right
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult):
+        for sequence, count in ((node.left, node.right), (node.right, node.left)):
+            if not _is_sequence(sequence):
+                continue
+            if not (isinstance(count, ast.Constant) and isinstance(count.value, int)):
+                raise QueryValidationError("Repetition count of a sequence must be a literal number")
+            length = _literal_length(sequence)
+            if length is None:
+                raise QueryValidationError("Only sequences of literals may be repeated")
+            return length * max(0, count.value)
+    return None
+
+
+def _check_call(node: ast.Call):
+    method = node.func.attr if isinstance(node.func, ast.Attribute) else None
+    if method in AGGREGATION_METHODS:
+        for argument in node.args:
+            _check_aggregation(argument)
+        for keyword in node.keywords:
+            value = keyword.value
+            # Named aggregation: total=("column", "sum")
+            if keyword.arg != "func" and isinstance(value, ast.Tuple) and len(value.elts) == 2:
+                value = value.elts[1]
+            _check_aggregation(value)
+    elif method == "pivot_table" and len(node.args) > MAX_PIVOT_POSITIONAL_ARGS:
+        raise QueryValidationError("pivot_table aggfunc must be passed as a keyword")
+    for keyword in node.keywords:
+        if keyword.arg == "aggfunc":
+            _check_aggregation(keyword.value)
+
+
+def validate_query(tree: ast.AST):
+    """
+    Checks a parsed expression against the allowlist.
+
+    Raises:
+        QueryValidationError: On the first disallowed node, name or attribute
+    """
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise QueryValidationError(f"Operation not allowed: {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id not in ALLOWED_NAMES:
+            raise QueryValidationError(f"Name not allowed: {node.id}")
+        if isinstance(node, ast.Attribute) and node.attr not in ALLOWED_ATTRIBUTES:
+            raise QueryValidationError(f"Attribute not allowed: {node.attr}")
+        if isinstance(node, ast.keyword) and (node.arg is None or node.arg in FORBIDDEN_KEYWORDS):
+            raise QueryValidationError(f"Keyword argument not allowed: {node.arg or '**'}")
+        if isinstance(node, ast.Call):
+            _check_call(node)
+        if isinstance(node, ast.BinOp) and (_literal_length(node) or 0) > MAX_LITERAL_LENGTH:
+            raise QueryValidationError(f"Literal longer than {MAX_LITERAL_LENGTH} items")
+
+
+@lru_cache(maxsize=512)
+def compile_query(query: str):
+    """Parses, validates and compiles a query; repeated queries reuse the code object."""
+    try:
+        tree = ast.parse(query.strip(), mode="eval")
+    except SyntaxError as e:
+        raise QueryValidationError(f"Invalid query syntax: {e.msg}")
+    validate_query(tree)
+    return compile(tree, "<query>", "eval")
+
+
+def check_result_size(result, max_rows: int = DEFAULT_MAX_RESULT_ROWS,
+                      max_mb: float = DEFAULT_MAX_RESULT_MB):
+    """Raises QueryLimitError if a DataFrame/Series result is larger than allowed."""
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        if len(result) > max_rows:
+            raise QueryLimitError(f"Result has {len(result)} rows, limit is {max_rows}")
+        nbytes = result.memory_usage(deep=True)
+        nbytes = int(nbytes.sum()) if isinstance(nbytes, pd.Series) else int(nbytes)
+        if nbytes > max_mb * 1024 * 1024:
+            raise QueryLimitError(f"Result uses {nbytes / (1024 * 1024):.1f} MB, limit is {max_mb} MB")
+
+
+# Queries run on a small shared pool so a wall-clock limit can be enforced
+_pool = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="query")
+_pool_lock = threading.Lock()
+_stuck = set()  # Futures of timed-out queries that are still running
+
+
+def _abandon(future):
+    """
+    Gives up on a timed-out query.
+
+    Its thread cannot be interrupted and keeps a worker busy, so new queries go
+    to a fresh pool; the old one lets queued queries finish and then shuts down.
+    """
+    global _pool
+    with _pool_lock:
+        if future.done():
+            return
+        _stuck.add(future)
+        future.add_done_callback(_stuck.discard)
+        _pool.shutdown(wait=False)
+        _pool = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="query")
+
+
+def _submit(code, scope: dict):
+    with _pool_lock:
+        if len(_stuck) >= MAX_STUCK_QUERIES:
+            raise QueryLimitError(f"{len(_stuck)} timed-out queries are still running, try again later")
+        return _pool.submit(eval, code, scope, {})
+
+
+def execute_query(query: str, df: pd.DataFrame, timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                  max_rows: int = DEFAULT_MAX_RESULT_ROWS, max_mb: float = DEFAULT_MAX_RESULT_MB):
+    """
+    Executes a validated pandas expression against `df`.
+
+    Args:
+        query: Python expression using `df` and `pd`
+        df: Frame bound to the name `df`
+        timeout: Wall-clock limit in seconds
+        max_rows: Maximum rows of a DataFrame/Series result
+        max_mb: Maximum memory of a DataFrame/Series result
+
+    Returns:
+        The expression result
+
+    Raises:
+        QueryValidationError: If the query is not allowed
+        QueryLimitError: If the query times out or its result is too large
+
+    Note: a timed-out query is abandoned rather than interrupted; its thread
+    finishes in the background while later queries run on a fresh pool.
+    """
+    code = compile_query(query)
+    # A shallow copy shares the data but not the column set, so a query can never
+    # change the frame other callers see
+    scope = {"__builtins__": SAFE_BUILTINS, "df": df.copy(deep=False), "pd": pd}
+    future = _submit(code, scope)
+    try:
+        result = future.result(timeout=timeout)
+    except FutureTimeoutError:
+        _abandon(future)
+        raise QueryLimitError(f"Query exceeded the {timeout:g} s time limit")
+    check_result_size(result, max_rows=max_rows, max_mb=max_mb)
+    return result
@@ -0,0 +1,302 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+
+from prototype3.utils.dataset_catalog import get_catalog
+from prototype3.utils.query_executor import execute_query
+from prototype3.utils.schema_slicer import fold, get_schema_slicer, words
+from prototype3.utils.similarity_index import numbers
+
+# Defaults can be overridden through environment variables
+QUERY_PLANNER_ENABLED = os.getenv("QUERY_PLANNER", "1") != "0"
+MIN_CONFIDENCE = float(os.getenv("QUERY_PLANNER_MIN_CONFIDENCE", "0.7"))
+# Share of a value word's n-grams a prompt word must contain to count as naming it;
+# stricter than the slicer's floor since 'český' must not name 'Česko' here
+WORD_MATCH = 0.75
+
+# Aggregations over the regions; only applied when the prompt also says it is about regions
+AGGREGATION_WORDS = {
+    "sum": {"sum", "total", "combined", "altogether", "soucet", "celkem", "dohromady"},
+    "mean": {"average", "mean", "prumer", "prumerny", "prumerna", "prumerne"},
+    "max": {"highest", "largest", "most", "maximum", "max", "nejvice", "nejvyssi", "nejvetsi"},
+    "min": {"lowest", "smallest", "fewest", "least", "minimum", "min", "nejmene", "nejnizsi", "nejmensi"},
+}
+ACROSS_WORDS = {"regions", "across", "which", "kraje", "kraju", "krajich", "krajech", "ktery", "kterem", "kde"}
+# Words of the aggregation that must not steer value resolution ('average' is also 'Střední stav')
+OPERATION_ONLY_WORDS = AGGREGATION_WORDS["mean"] | AGGREGATION_WORDS["max"] | AGGREGATION_WORDS["min"]
+# Questions the planner cannot answer with a filter and one aggregation
+UNSUPPORTED_WORDS = {
+    "compare", "comparison", "difference", "change", "growth", "grew", "increase", "decrease", "ratio",
+    "percent", "percentage", "share", "trend", "per", "versus", "vs", "why", "between",
+    "porovnej", "porovnani", "rozdil", "zmena", "rust", "narust", "pokles", "podil", "procento", "procent", "proc",
+    # negation and exclusion: 'men outside Prague' is not Prague's value
+    "outside", "except", "excluding", "exclude", "excludes", "without", "not", "other", "others", "besides",
+    "minus", "mimo", "krome", "bez", "ne", "ostatni", "ostatnich", "neni",
+    # ranks other than the first and top-N lists
+    "second", "third", "fourth", "fifth", "top", "bottom", "rank", "ranking", "ranked", "order", "sorted",
+    "druhy", "druha", "druhe", "druhem", "treti", "tretim", "ctvrty", "poradi", "serad", "seradit",
+    # units and scaling
+    "thousand", "thousands", "million", "millions", "tisic", "tisice", "tisicich", "milion", "milionu", "milionech",
+}
+# Geographic values that are totals of the others
+TOTAL_VALUES = {"cesko", "ceska republika", "cr", "czechia", "czech republic", "celkem", "total"}
+
+# Period mentions, matched on lowercase accent-free text; ranges before single quarters
+QUARTER_RANGE_PATTERNS = [
+    r"\bq([1-4])\s*(?:-|–|—|to|until|az)\s*q([1-4])\b",
+    r"\b([1-4])\.\s*(?:-|–|—|az)\s*([1-4])\.\s*ctvrtlet\w*",
+]
+QUARTER_PATTERNS = [
+    r"\bq([1-4])\b", r"\b([1-4])q\b", r"\b([1-4])\.\s*ctvrtlet\w*",
+    r"\b(first|second|third|fourth)\s+quarter\b",
+]
+ORDINAL_QUARTERS = {"first": "1", "second": "2", "third": "3", "fourth": "4"}
+YEAR_PATTERN = r"\b(?:19|20)\d{2}\b"
+
+
+@dataclass
+class QueryPlan:
+    """A filter on every dimension plus one operation, with how sure the planner is."""
+    operation: str                                # value | sum | mean | max | min
+    filters: dict = field(default_factory=dict)   # dimension -> list of values
+    confidence: float = 1.0
+    query: str = ""
+
+
+def split_periods(text: str) -> tuple:
+    """
+    Extracts the periods a text names.
+
+    Returns:
+        tuple: (period tokens such as {'q1-q3', '2024'}, the text without them);
+            'Q1-Q3 2024' and 'Q3 2024' give different tokens, so one never stands in for the other
+    """
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    rest = "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+    tokens = set()
+
+    def take(pattern: str, token):
+        nonlocal rest
+        for match in re.finditer(pattern, rest):
+            tokens.add(token(match))
+        rest = re.sub(pattern, " ", rest)
+
+    for pattern in QUARTER_RANGE_PATTERNS:
+        take(pattern, lambda match: f"q{match.group(1)}-q{match.group(2)}")
+    for pattern in QUARTER_PATTERNS:
+        take(pattern, lambda match: f"q{ORDINAL_QUARTERS.get(match.group(1), match.group(1))}")
+    take(YEAR_PATTERN, lambda match: match.group(0))
+    return tokens, rest
+
+
+def _literal(text: str) -> str:
+    return json.dumps(text, ensure_ascii=False)
+
+
+def _plain(value):
+    """Converts numpy scalars to Python numbers and drops a zero fraction."""
+    value = value.item() if hasattr(value, "item") else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class QueryPlanner:
+    """
+    Rule-based planner for prompts of a few common shapes.
+
+    Handles "value of <indicator> for <region> in <period>" and sums, means,
+    maxima and minima of an indicator over the regions. Prompt terms (Czech or
+    English) are matched against dimension values through the schema slicer's
+    n-gram index. A value's confidence is 1 when the prompt names a word only
+    that value has ('Praha'), otherwise the share of its distinctive words
+    (those in at most half of the dimension's values, e.g. 'konci' and 'muži'
+    but not 'obyvatel') the prompt mentions. The most confident value wins;
+    ties mean the prompt is ambiguous, so 'men in Prague' does not guess which
+    population indicator is meant.
+
+    A plan is only returned when every dimension resolves to exactly one value
+    with enough confidence and the numbers in the prompt match the chosen
+    values. Anything else is left to the crew.
+    """
+
+    def __init__(self, dataset_code: str, metadata: dict):
+        self.dataset_code = dataset_code
+        self.metadata = metadata
+        self.slicer = get_schema_slicer(dataset_code)
+        self.value_column = metadata.get("value_column", {}).get("name", "value")
+        self.geo_dimension = next(
+            (name for name, spec in metadata.get("dimensions", {}).items()
+             if spec.get("is_geographical") or spec.get("type") == "geo"),
+            None,
+        )
+
+        self.distinctive = {}  # (dimension, value_idx) -> word indexes of its distinctive words
+        self.unique = {}       # (dimension, value_idx) -> word indexes of words no other value has
+        for dimension, values in self.slicer.values.items():
+            value_words = [words(value) for value in values]
+            frequency = Counter(word for vw in value_words for word in set(vw))
+            for value_idx, vw in enumerate(value_words):
+                self.distinctive[(dimension, value_idx)] = [
+                    word_idx for word_idx, word in enumerate(vw) if frequency[word] <= len(values) / 2
+                ]
+                self.unique[(dimension, value_idx)] = [
+                    word_idx for word_idx, word in enumerate(vw) if frequency[word] == 1
+                ]
+
+    def _confidence(self, dimension: str, value_idx: int, word_scores: dict) -> float:
+        matches = word_scores.get((dimension, value_idx), {})
+        matched = {word_idx for word_idx, score in matches.items() if score >= WORD_MATCH}
+        # A word only this value has names it on its own ('Praha', 'Jihomoravský')
+        if matched & set(self.unique[(dimension, value_idx)]):
+            return 1.0
+        distinctive = self.distinctive[(dimension, value_idx)]
+        if not distinctive:
+            return 0.0
+        return len(matched & set(distinctive)) / len(distinctive)
+
+    def _choose(self, dimension: str, word_scores: dict):
+        """Returns (value, confidence) of the value the prompt names most completely, or None on a tie."""
+        ranked = sorted(
+            ((self._confidence(dimension, value_idx, word_scores), value_idx)
+             for value_idx in range(len(self.slicer.values[dimension]))
+             if (dimension, value_idx) in word_scores),
+            reverse=True,
+        )
+        if not ranked or (len(ranked) > 1 and ranked[0][0] == ranked[1][0]):
+            return None
+        confidence, value_idx = ranked[0]
+        return self.slicer.values[dimension][value_idx], confidence
+
+    def _operation(self, prompt_words: set):
+        if not prompt_words & ACROSS_WORDS:
+            return "value"
+        for operation, operation_words in AGGREGATION_WORDS.items():
+            if prompt_words & operation_words:
+                return operation
+        return None
+
+    def plan(self, prompt: str):
+        """Returns the QueryPlan of a prompt, or None when the planner is not confident."""
+        prompt_periods, rest = split_periods(prompt)
+        # Period phrases are set aside so 'second quarter' does not read as a rank
+        prompt_words = set(words(rest))
+        if prompt_words & UNSUPPORTED_WORDS:
+            return None
+        operation = self._operation(prompt_words)
+        if operation is None or (operation != "value" and self.geo_dimension is None):
+            return None
+
+        resolvable = " ".join(word for word in words(prompt) if word not in OPERATION_ONLY_WORDS)
+        word_scores = self.slicer.word_scores(resolvable)
+
+        filters, confidences = {}, []
+        for dimension, values in self.slicer.values.items():
+            if dimension == self.geo_dimension and operation != "value":
+                filters[dimension] = [value for value in values if fold(value) not in TOTAL_VALUES]
+            elif len(values) == 1:
+                filters[dimension] = values
+            else:
+                chosen = self._choose(dimension, word_scores)
+                if chosen is None:
+                    return None
+                filters[dimension] = [chosen[0]]
+                confidences.append(chosen[1])
+
+        confidence = min(confidences, default=1.0)
+        if confidence < MIN_CONFIDENCE:
+            return None
+        # A named period must be exactly the chosen one: 'Q1 2024', 'Q3 2024' and '2024'
+        # are all different from the cumulative 'Q1-Q3 2024'
+        chosen_values = [value for values in filters.values() for value in values]
+        if prompt_periods and prompt_periods != set().union(*(split_periods(value)[0] for value in chosen_values)):
+            return None
+        # Any other number ('3 largest regions') must come from a chosen value
+        chosen_numbers = set().union(*(numbers(split_periods(value)[1]) for value in chosen_values))
+        if not numbers(rest) <= chosen_numbers:
+            return None
+
+        plan = QueryPlan(operation, filters, round(confidence, 3))
+        plan.query = self.build_query(plan)
+        return plan
+
+    def build_query(self, plan: QueryPlan) -> str:
+        """Renders a plan as a pandas query over the frame 'df', as the crew's query tool runs it."""
+        conditions = []
+        for dimension, values in plan.filters.items():
+            if len(values) == len(self.slicer.values[dimension]):
+                continue
+            column = f"df[{_literal(dimension)}]"
+            if len(values) == 1:
+                conditions.append(f"({column} == {_literal(values[0])})")
+            else:
+                conditions.append(f"{column}.isin([{', '.join(_literal(value) for value in values)}])")
+        selection = f"df[{' & '.join(conditions)}]" if conditions else "df"
+        value = _literal(self.value_column)
+
+        if plan.operation == "value":
+            return f"{selection}[{value}].item()"
+        if plan.operation in ("sum", "mean"):
+            return f"{selection}[{value}].{plan.operation}()"
+        method = "nlargest" if plan.operation == "max" else "nsmallest"
+        return f"{selection}.set_index({_literal(self.geo_dimension)})[{value}].{method}(1)"
+
+    def execute(self, plan: QueryPlan) -> str:
+        """Runs the plan's query and formats the answer like the crew's YAML output."""
+        result = execute_query(plan.query, get_catalog().frame(self.dataset_code))
+        if plan.operation in ("max", "min"):
+            region, value = result.index[0], result.iloc[0]
+            description = f"{plan.operation} of {len(plan.filters[self.geo_dimension])} regions: {region}"
+        else:
+            value = result
+            description = ", ".join(
+                values[0] if len(values) == 1 else f"{plan.operation} of {len(values)} values"
+                for values in plan.filters.values()
+            )
+        decimals = self.metadata.get("value_column", {}).get("unit", {}).get("decimals")
+        value = _plain(value)
+        if isinstance(value, float) and decimals is not None:
+            value = round(value, decimals)
+        return (
+            f"query: {plan.query}\n"
+            f"result:\n"
+            f"  value: {value}\n"
+            f"  description: {_literal(description)}"
+        )
+
+    def answer(self, prompt: str):
+        """
+        Returns (answer text, plan as dict) for prompts the planner handles, otherwise None.
+
+        Execution errors (e.g. a filter matching no row) also return None so the
+        crew gets a chance instead.
+        """
+        plan = self.plan(prompt)
+        if plan is None:
+            return None
+        try:
+            return self.execute(plan), asdict(plan)
+        except Exception as e:
+            print(f"Query planner: plan failed ({e}), falling back to the crew")
+            return None
+
+
+_planners = {}  # dataset code -> QueryPlanner
+_lock = threading.Lock()
+
+
+def get_query_planner(dataset_code: str = None) -> QueryPlanner:
+    """Returns the planner of a catalog dataset, rebuilt when its metadata is reloaded."""
+    metadata = get_catalog().metadata(dataset_code)
+    with _lock:
+        cached = _planners.get(dataset_code)
+        if cached is not None and cached.metadata is metadata:
+            return cached
+    planner = QueryPlanner(dataset_code, metadata)
+    with _lock:
+        _planners[dataset_code] = planner
+    return planner
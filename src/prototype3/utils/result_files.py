@@ -0,0 +1,23 @@
+import json
+import os
+
+
+def write_result_file(path: str, record: dict):
+    """
+    Writes one run's result as JSON.
+
+    The file is written under a temporary name and renamed, so a reader never
+    sees a partially written result.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_result_file(path: str) -> dict:
+    """Reads a result written by write_result_file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Defaults can be overridden through environment variables
+DEFAULT_MAX_ROWS = int(os.getenv("RESULT_MAX_ROWS", "20"))
+DEFAULT_MAX_CHARS = int(os.getenv("RESULT_MAX_CHARS", "4000"))
+DEFAULT_MAX_TOKENS = int(os.getenv("RESULT_MAX_TOKENS", "1000"))
+CHARS_PER_TOKEN = 4  # Rough estimate for GPT tokenizers on mixed Czech/English text
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_text(text: str, max_chars: int = DEFAULT_MAX_CHARS,
+                  max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
+    """Cuts text to the character and token budget, saying so when it does."""
+    limit = min(max_chars, max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= limit:
+        return text
+    notice = f"\n[output truncated: showing {{shown}} of {len(text)} characters; narrow the query for full detail]"
+    shown = max(0, limit - len(notice.format(shown=limit)))
+    return text[:shown] + notice.format(shown=shown)
+
+
+def _numeric_summary(frame: pd.DataFrame) -> str:
+    numeric = frame.select_dtypes(include="number")
+    if numeric.empty:
+        return ""
+    summary = numeric.agg(["count", "sum", "min", "max", "mean"]).T
+    return "Numeric summary:\n" + summary.to_string()
+
+
+def _serialize_frame(result, max_rows: int) -> str:
+    frame = result.to_frame() if isinstance(result, pd.Series) else result
+    kind = "Series" if isinstance(result, pd.Series) else "DataFrame"
+    rows, columns = frame.shape
+    if rows <= max_rows:
+        return result.to_string()
+
+    half = max(1, max_rows // 2)
+    parts = [
+        f"{kind}: {rows} rows x {columns} columns (truncated, showing first {half} and last {half} rows)",
+        result.head(half).to_string(),
+        "...",
+        result.tail(half).to_string(),
+    ]
+    summary = _numeric_summary(frame)
+    if summary:
+        parts.append(summary)
+    return "\n".join(parts)
+
+
+def serialize_result(result, max_rows: int = DEFAULT_MAX_ROWS, max_chars: int = DEFAULT_MAX_CHARS,
+                     max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
+    """
+    Renders a query result for the LLM within a row, character and token budget.
+
+    Scalars are returned exactly. Frames and Series within `max_rows` are shown in
+    full; larger ones are shown as row/column counts, head and tail samples and a
+    numeric summary, so the cost of formatting and of the observation stays flat
+    regardless of the result size.
+
+    Args:
+        result: Query result of any type
+        max_rows: Rows shown before a frame is sampled
+        max_chars: Character budget of the output
+        max_tokens: Token budget of the output
+
+    Returns:
+        str: The rendered result
+    """
+    if isinstance(result, np.generic):
+        result = result.item()
+    elif isinstance(result, pd.api.extensions.ExtensionArray):
+        result = result.tolist()  # e.g. Categorical from .unique()
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        text = _serialize_frame(result, max_rows)
+    elif isinstance(result, (pd.Index, np.ndarray, list, tuple)) and len(result) > max_rows:
+        items = list(result[:max_rows])
+        text = f"{type(result).__name__} of {len(result)} items (truncated, showing first {max_rows}): {items}"
+    else:
+        text = str(result)
+    return truncate_text(text, max_chars=max_chars, max_tokens=max_tokens)
@@ -0,0 +1,188 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from prototype3.utils.path_utils import get_project_root
+
+DEFAULT_RESULTS_DB = os.getenv("RESULTS_DB", os.path.join(get_project_root(), "analysis_results.db"))
+# Plain-text log read by evaluate_agent_output.ipynb, kept alongside the database
+DEFAULT_RESULTS_TXT = os.getenv("RESULTS_TXT", os.path.join(get_project_root(), "analysis_results.txt"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    prompt TEXT NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    dataset TEXT,
+    dataset_version TEXT,
+    result TEXT,
+    started_at REAL,
+    finished_at REAL,
+    duration_s REAL,
+    timings TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_prompt_hash ON results (prompt_hash, finished_at);
+CREATE INDEX IF NOT EXISTS idx_results_dataset ON results (dataset, dataset_version);
+CREATE INDEX IF NOT EXISTS idx_results_finished_at ON results (finished_at);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Casefolds and collapses whitespace so trivially different prompts share a hash."""
+    return re.sub(r"\s+", " ", prompt.strip()).casefold()
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+
+
+def format_text_record(prompt: str, result: str) -> str:
+    """One result in the analysis_results.txt layout."""
+    return f"\nPrompt: {prompt}\nResult: {result}\n" + "-" * 50 + "\n"
+
+
+_text_lock = threading.Lock()
+
+
+def append_text_result(prompt: str, result: str, path: str = DEFAULT_RESULTS_TXT):
+    """
+    Appends one result to the text log.
+
+    The record goes out in a single append-mode write under a lock, so flows in
+    one process never interleave and processes only ever add whole records.
+    """
+    with _text_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(format_text_record(prompt, result))
+
+
+class ResultsStore:
+    """
+    SQLite store of analysis results, safe for concurrent writers.
+
+    The database runs in WAL mode, so readers never block the writer and each
+    result is appended in its own transaction: several flows or batch processes
+    can write at once without interleaving. Lookups by prompt go through an index
+    instead of scanning a text file.
+    """
+
+    def __init__(self, path: str = DEFAULT_RESULTS_DB):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def add(self, prompt: str, result: str, dataset: str = None, dataset_version: str = None,
+            started_at: float = None, finished_at: float = None, timings: dict = None) -> int:
+        """Appends one result atomically and returns its id."""
+        finished_at = finished_at or time.time()
+        duration = finished_at - started_at if started_at else None
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "INSERT INTO results (prompt, prompt_hash, dataset, dataset_version, result, "
+                "started_at, finished_at, duration_s, timings) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (prompt, prompt_hash(prompt), dataset, dataset_version, result,
+                 started_at, finished_at, duration, json.dumps(timings or {})),
+            )
+            return cursor.lastrowid
+
+    def find(self, prompt: str, dataset: str = None, dataset_version: str = None, limit: int = 10) -> list:
+        """Returns the latest results for a prompt, newest first."""
+        sql = "SELECT * FROM results WHERE prompt_hash = ?"
+        params = [prompt_hash(prompt)]
+        if dataset is not None:
+            sql += " AND dataset = ?"
+            params.append(dataset)
+        if dataset_version is not None:
+            sql += " AND dataset_version = ?"
+            params.append(dataset_version)
+        sql += " ORDER BY finished_at DESC LIMIT ?"
+        params.append(limit)
+        rows = self._connection().execute(sql, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def iter_results(self, since: float = None):
+        """Yields all results in insertion order, optionally only those finished after `since`."""
+        sql, params = "SELECT * FROM results", []
+        if since is not None:
+            sql += " WHERE finished_at >= ?"
+            params.append(since)
+        for row in self._connection().execute(sql + " ORDER BY id", params):
+            yield self._to_dict(row)
+
+    def export(self, path: str, fmt: str = "jsonl", since: float = None) -> int:
+        """
+        Writes results to a file and returns how many were written.
+
+        Args:
+            path: Output file
+            fmt: "jsonl" for one JSON record per line, "txt" for the old analysis_results.txt layout
+            since: Only export results finished after this timestamp
+        """
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in self.iter_results(since=since):
+                if fmt == "txt":
+                    f.write(format_text_record(record["prompt"], record["result"]))
+                else:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        record = dict(row)
+        record["timings"] = json.loads(record["timings"] or "{}")
+        return record
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_results_store(path: str = DEFAULT_RESULTS_DB) -> ResultsStore:
+    """Returns the process-wide store for a database file."""
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = ResultsStore(path)
+        return _stores[path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query and export stored analysis results")
+    parser.add_argument("--db", default=DEFAULT_RESULTS_DB)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    find_parser = subparsers.add_parser("find", help="Show stored results for a prompt")
+    find_parser.add_argument("prompt")
+    find_parser.add_argument("--dataset")
+    export_parser = subparsers.add_parser("export", help="Export results to a file")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--format", choices=["jsonl", "txt"], default="jsonl")
+    args = parser.parse_args()
+
+    store = get_results_store(args.db)
+    if args.command == "find":
+        print(json.dumps(store.find(args.prompt, dataset=args.dataset), ensure_ascii=False, indent=2))
+    else:
+        count = store.export(args.path, fmt=args.format)
+        print(f"Exported {count} results to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
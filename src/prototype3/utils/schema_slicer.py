@@ -0,0 +1,182 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from prototype3.utils.dataset_catalog import get_catalog
+from prototype3.utils.result_serializer import estimate_tokens
+from prototype3.utils.term_aliases import expand_terms
+
+# Defaults can be overridden through environment variables
+SCHEMA_SLICING_ENABLED = os.getenv("SCHEMA_SLICING", "1") != "0"
+FULL_LIST_LIMIT = int(os.getenv("SCHEMA_SLICE_FULL_LIMIT", "5"))
+MAX_CANDIDATES = int(os.getenv("SCHEMA_SLICE_MAX_CANDIDATES", "25"))
+FALLBACK_VALUES = int(os.getenv("SCHEMA_SLICE_FALLBACK_VALUES", "20"))
+MIN_SCORE = float(os.getenv("SCHEMA_SLICE_MIN_SCORE", "0.5"))
+NGRAM_SIZE = 3
+# When more than this share of a dimension's values match (a generic word such as
+# 'region' matches every 'kraj'), only the top-scoring band is kept
+MAX_MATCHED_SHARE = 0.5
+SCORE_BAND = 1e-9
+WORD_MATCH_FLOOR = 0.6  # 'start' shares half its grams with 'stav' but means 'počátku'
+
+
+def fold(text: str) -> str:
+    """Lowercases, strips diacritics and collapses punctuation, e.g. 'Hlavní město' -> 'hlavni mesto'."""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return re.sub(r"[\W_]+", " ", stripped.lower()).strip()
+
+
+def words(text: str) -> list:
+    return [word for word in fold(text).split() if len(word) >= 2]
+
+
+def ngrams(word: str, size: int = NGRAM_SIZE) -> set:
+    """Character n-grams of a word padded with spaces, so short words still produce grams."""
+    padded = f" {word} "
+    return {padded[i:i + size] for i in range(max(1, len(padded) - size + 1))}
+
+
+class SchemaSlicer:
+    """
+    Cuts dataset metadata down to the dimension values relevant to a prompt.
+
+    Every word of every dimension value is indexed by its accent-folded character
+    n-grams once. For a prompt (expanded with English->Czech term aliases), the
+    index yields per-value scores without scanning all values: the best-matching
+    word (so 'Praha' finds 'Hlavní město Praha') averaged with the mean score of
+    the value's words, ignoring weak partial matches below WORD_MATCH_FLOOR.
+    """
+
+    def __init__(self, metadata: dict):
+        self.metadata = metadata
+        self.values = {}                # dimension -> list of values
+        self.word_grams = {}            # (dimension, value_idx, word_idx) -> gram count
+        self.value_words = {}           # (dimension, value_idx) -> word count
+        self.index = defaultdict(list)  # gram -> [(dimension, value_idx, word_idx)]
+
+        for dimension, spec in metadata.get("dimensions", {}).items():
+            values = list(spec.get("values", []))
+            self.values[dimension] = values
+            for value_idx, value in enumerate(values):
+                value_words = words(value)
+                self.value_words[(dimension, value_idx)] = len(value_words)
+                for word_idx, word in enumerate(value_words):
+                    grams = ngrams(word)
+                    self.word_grams[(dimension, value_idx, word_idx)] = len(grams)
+                    for gram in grams:
+                        self.index[gram].append((dimension, value_idx, word_idx))
+
+    def word_scores(self, prompt: str) -> dict:
+        """
+        Returns {(dimension, value_idx): {word_idx: score}} for value words sharing n-grams with the prompt.
+
+        A word's score is the largest share of its n-grams found in any single
+        prompt word, so fragments of different prompt words never add up to a match.
+        """
+        word_scores = defaultdict(dict)
+        # English words also contribute their Czech aliases, e.g. 'men' -> 'muzi'
+        for word in set(expand_terms(words(prompt))):
+            hits = defaultdict(int)
+            for gram in ngrams(word):
+                for posting in self.index.get(gram, ()):
+                    hits[posting] += 1
+            for (dimension, value_idx, word_idx), count in hits.items():
+                score = count / self.word_grams[(dimension, value_idx, word_idx)]
+                matches = word_scores[(dimension, value_idx)]
+                matches[word_idx] = max(score, matches.get(word_idx, 0.0))
+        return word_scores
+
+    def score(self, prompt: str) -> dict:
+        """Returns {dimension: {value_idx: score}} for values sharing n-grams with the prompt."""
+        scores = defaultdict(dict)
+        for (dimension, value_idx), matches in self.word_scores(prompt).items():
+            best = max(matches.values())
+            coverage = sum(m for m in matches.values() if m >= WORD_MATCH_FLOOR) / max(1, self.value_words[(dimension, value_idx)])
+            scores[dimension][value_idx] = (best + coverage) / 2
+        return scores
+
+    def resolve(self, prompt: str) -> dict:
+        """
+        Returns the values a prompt most likely refers to.
+
+        Returns:
+            dict: Dimension -> sorted list of its top-scoring values, for dimensions
+                with at least one value scoring MIN_SCORE or more
+        """
+        resolved = {}
+        for dimension, value_scores in self.score(prompt).items():
+            best = max(value_scores.values())
+            if best >= MIN_SCORE:
+                values = self.values[dimension]
+                resolved[dimension] = sorted(values[idx] for idx, score in value_scores.items() if score >= best - 1e-9)
+        return resolved
+
+    def slice(self, prompt: str) -> tuple:
+        """
+        Returns the sliced metadata and a report of what was cut.
+
+        Dimensions with at most FULL_LIST_LIMIT values are kept whole. Larger ones
+        keep their best-scoring values above MIN_SCORE; when more than
+        MAX_MATCHED_SHARE of them match, only those within SCORE_BAND of the best
+        are kept, unless that band is as unselective. When nothing matches (e.g. 'which
+        region ...'), a dimension of at most FALLBACK_VALUES values is kept
+        whole; a longer one keeps its first FALLBACK_VALUES values (totals usually
+        come first). Cut dimensions are marked so the agent knows the list is partial.
+        """
+        scores = self.score(prompt)
+        sliced = {key: value for key, value in self.metadata.items() if key != "dimensions"}
+        sliced["dimensions"] = {}
+        report = {"dimensions": {}}
+
+        for dimension, spec in self.metadata.get("dimensions", {}).items():
+            values = self.values[dimension]
+            spec = dict(spec)
+            ranked = sorted(scores.get(dimension, {}).items(), key=lambda item: -item[1])
+            matched = [idx for idx, score in ranked if score >= MIN_SCORE][:MAX_CANDIDATES]
+            if len(matched) > MAX_MATCHED_SHARE * len(values):
+                best = ranked[0][1]
+                matched = [idx for idx in matched if scores[dimension][idx] >= best - SCORE_BAND]
+                if len(matched) > MAX_MATCHED_SHARE * len(values):
+                    matched = []  # e.g. 'which region', where every region ties
+            if len(values) <= FULL_LIST_LIMIT or (not matched and len(values) <= FALLBACK_VALUES):
+                report["dimensions"][dimension] = "full"
+            else:
+                if matched:
+                    spec["values"] = [values[idx] for idx in sorted(matched)]
+                    report["dimensions"][dimension] = f"{len(matched)} of {len(values)} matched"
+                else:
+                    spec["values"] = values[:FALLBACK_VALUES]
+                    report["dimensions"][dimension] = f"no match, first {len(spec['values'])} of {len(values)}"
+                spec["values_total"] = len(values)
+                spec["values_partial"] = True
+            sliced["dimensions"][dimension] = spec
+
+        full_tokens = estimate_tokens(json.dumps(self.metadata, ensure_ascii=False))
+        sliced_tokens = estimate_tokens(json.dumps(sliced, ensure_ascii=False))
+        report.update({
+            "full_tokens": full_tokens,
+            "sliced_tokens": sliced_tokens,
+            "tokens_saved": full_tokens - sliced_tokens,
+        })
+        return sliced, report
+
+
+_slicers = {}  # dataset code -> SchemaSlicer
+_lock = threading.Lock()
+
+
+def get_schema_slicer(dataset_code: str = None) -> SchemaSlicer:
+    """Returns the slicer of a catalog dataset, building its index once per metadata load."""
+    metadata = get_catalog().metadata(dataset_code)
+    with _lock:
+        cached = _slicers.get(dataset_code)
+        if cached is not None and cached.metadata is metadata:
+            return cached
+    slicer = SchemaSlicer(metadata)
+    with _lock:
+        _slicers[dataset_code] = slicer
+    return slicer
@@ -0,0 +1,148 @@
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+
+from prototype3.utils.schema_slicer import words
+from prototype3.utils.term_aliases import TERM_ALIASES
+
+# Defaults can be overridden through environment variables
+NEAR_DUPLICATE_ENABLED = os.getenv("NEAR_DUPLICATE_CACHE", "1") != "0"
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.85"))
+NEAR_DUPLICATE_CHECK_DIMENSIONS = os.getenv("NEAR_DUPLICATE_CHECK_DIMENSIONS", "1") != "0"
+NGRAM_SIZES = (3, 4)
+# Words that change the phrasing of a question but not what it asks for
+STOPWORDS = {
+    "what", "is", "was", "the", "of", "in", "at", "on", "for", "to", "a", "an", "and", "how", "many", "much",
+    "number", "amount", "count", "there", "were", "are", "did", "does", "live", "living", "please", "tell", "me",
+    "jaky", "jaka", "je", "byl", "bylo", "kolik", "pocet", "na", "ve", "v", "za",
+}
+
+
+def canonical_words(text: str) -> list:
+    """Folded words with stopwords dropped and English terms replaced by their Czech aliases."""
+    canonical = []
+    for word in words(text):
+        if word not in STOPWORDS:
+            canonical.extend(TERM_ALIASES.get(word, [word]))
+    return canonical
+
+
+def char_ngrams(text: str) -> Counter:
+    """Counts character n-grams of every canonical word, padded so word starts and ends count."""
+    grams = Counter()
+    for word in canonical_words(text):
+        padded = f" {word} "
+        for size in NGRAM_SIZES:
+            for i in range(max(1, len(padded) - size + 1)):
+                grams[padded[i:i + size]] += 1
+    return grams
+
+
+def numbers(text: str) -> set:
+    """Numeric tokens of a prompt, e.g. {'3', '2024'} for 'Q3 2024'."""
+    return set(re.findall(r"\d+", text))
+
+
+class SimilarityIndex:
+    """
+    TF-IDF index of prompts over character n-grams of their canonical words.
+
+    Runs fully in-process: no embedding service, only n-gram counts. Documents are
+    added incrementally under a key; adding the same key again replaces the old
+    document and remove() drops it. IDF weights and document norms are recomputed
+    lazily on the first query after a change. Candidates are found through an
+    inverted index, so only documents sharing n-grams with the query are scored.
+    """
+
+    def __init__(self):
+        self.documents = {}             # doc_id -> (text, payload)
+        self.term_counts = {}           # doc_id -> Counter of n-grams
+        self.postings = defaultdict(set)  # n-gram -> {doc_id}
+        self.document_frequency = Counter()
+        self.keys = {}                  # key -> doc_id
+        self._next_id = 0
+        self._norms = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def add(self, text: str, payload=None, key=None):
+        """
+        Indexes a prompt together with an arbitrary payload returned on match.
+
+        A document already indexed under the same key is replaced.
+        """
+        grams = char_ngrams(text)
+        with self._lock:
+            if key is not None and key in self.keys:
+                self._remove(self.keys.pop(key))
+            doc_id = self._next_id
+            self._next_id += 1
+            self.documents[doc_id] = (text, payload)
+            self.term_counts[doc_id] = grams
+            for gram in grams:
+                self.postings[gram].add(doc_id)
+                self.document_frequency[gram] += 1
+            if key is not None:
+                self.keys[key] = doc_id
+            self._dirty = True
+
+    def remove(self, key) -> bool:
+        """Drops the document indexed under the key. Returns False if there was none."""
+        with self._lock:
+            doc_id = self.keys.pop(key, None)
+            if doc_id is None:
+                return False
+            self._remove(doc_id)
+            return True
+
+    def _remove(self, doc_id: int):
+        del self.documents[doc_id]
+        for gram in self.term_counts.pop(doc_id):
+            postings = self.postings[gram]
+            postings.discard(doc_id)
+            if not postings:
+                del self.postings[gram]
+            self.document_frequency[gram] -= 1
+            if not self.document_frequency[gram]:
+                del self.document_frequency[gram]
+        self._dirty = True
+
+    def _idf(self, gram: str) -> float:
+        return math.log((1 + len(self.documents)) / (1 + self.document_frequency.get(gram, 0))) + 1
+
+    def _refresh(self):
+        if not self._dirty:
+            return
+        self._norms = {
+            doc_id: math.sqrt(sum((count * self._idf(gram)) ** 2 for gram, count in grams.items())) or 1.0
+            for doc_id, grams in self.term_counts.items()
+        }
+        self._dirty = False
+
+    def search(self, text: str, limit: int = 5) -> list:
+        """Returns [(score, text, payload)] of the most similar prompts, best first."""
+        query = char_ngrams(text)
+        with self._lock:
+            if not self.documents or not query:
+                return []
+            self._refresh()
+            weights = {gram: count * self._idf(gram) for gram, count in query.items()}
+            query_norm = math.sqrt(sum(weight ** 2 for weight in weights.values())) or 1.0
+
+            dots = defaultdict(float)
+            for gram, weight in weights.items():
+                idf = self._idf(gram)
+                for doc_id in self.postings.get(gram, ()):
+                    dots[doc_id] += weight * self.term_counts[doc_id][gram] * idf
+
+            scores = [(dot / (query_norm * self._norms[doc_id]), doc_id) for doc_id, dot in dots.items()]
+            scores.sort(key=lambda item: -item[0])
+            return [(score, *self.documents[doc_id]) for score, doc_id in scores[:limit]]
@@ -0,0 +1,60 @@
+"""
+English to Czech aliases for words that appear in CSO dimension values.
+
+Keys and values are accent-folded and lowercase (see schema_slicer.fold). Prompt
+words are expanded with their aliases before they are matched against dimension
+values, so English prompts resolve to the Czech values in the metadata.
+
+TERM_ALIASES canonicalizes prompts for the near-duplicate answer cache, where
+each word should stay one word. SCHEMA_ALIASES extends it for matching prompts
+against dimension values (schema slicer and query planner), where a word may
+stand for the whole value, e.g. 'prague' for 'Hlavní město Praha'.
+"""
+
+TERM_ALIASES = {
+    # sex
+    "men": ["muzi"], "man": ["muzi"], "male": ["muzi"], "males": ["muzi"],
+    "women": ["zeny"], "woman": ["zeny"], "female": ["zeny"], "females": ["zeny"],
+    "muzu": ["muzi"], "zen": ["zeny"],
+    "total": ["celkem"], "overall": ["celkem"], "together": ["celkem"],
+    # population indicators
+    "population": ["obyvatel"], "inhabitants": ["obyvatel"], "residents": ["obyvatel"], "people": ["obyvatel"],
+    "end": ["konci"], "beginning": ["pocatku"], "start": ["pocatku"],
+    "average": ["stredni", "stav"], "mean": ["stredni", "stav"], "midyear": ["stredni", "stav"],
+    # territory
+    "czechia": ["cesko"], "czech": ["cesko"], "country": ["cesko"],
+    "region": ["kraj"], "regions": ["kraje"],
+    "prague": ["praha"], "praze": ["praha"], "capital": ["hlavni", "mesto"],
+    "central": ["stredocesky"], "bohemia": ["cesky"], "bohemian": ["cesky"],
+    "south": ["jiho"], "southern": ["jiho"],
+    "moravia": ["moravsky"], "moravian": ["moravsky"], "silesian": ["slezsky"], "silesia": ["slezsky"],
+    "pilsen": ["plzensky"], "plzen": ["plzensky"],
+    "karlovy": ["karlovarsky"], "vary": ["karlovarsky"],
+    "usti": ["ustecky"], "liberec": ["liberecky"],
+    "hradec": ["kralovehradecky"], "kralove": ["kralovehradecky"],
+    "pardubice": ["pardubicky"], "highlands": ["vysocina"],
+    "brno": ["jihomoravsky"], "olomouc": ["olomoucky"], "zlin": ["zlinsky"], "ostrava": ["moravskoslezsky"],
+}
+
+SCHEMA_ALIASES = {
+    **TERM_ALIASES,
+    "zacatku": ["pocatku"],
+    "prague": ["hlavni", "mesto", "praha"], "praze": ["hlavni", "mesto", "praha"],
+}
+
+
+def expand_terms(words: list) -> list:
+    """
+    Returns the words followed by the aliases of any English words among them.
+
+    Adjacent words are also joined, so 'south moravian' yields 'jihomoravsky'
+    as Czech writes the region as one word.
+    """
+    expanded = list(words)
+    for word in words:
+        expanded.extend(SCHEMA_ALIASES.get(word, ()))
+    for first, second in zip(words, words[1:]):
+        for head in SCHEMA_ALIASES.get(first, [first]):
+            for tail in SCHEMA_ALIASES.get(second, [second]):
+                expanded.append(head + tail)
+    return expanded
@@ -0,0 +1,28 @@
+import threading
+from collections import Counter
+
+
+class ToolCallCounter:
+    """
+    Process-wide count of agent tool calls, per tool name.
+
+    Every crew tool records itself at the start of _run, so calls are counted
+    whether they hit a cache, fail or query pandas, DuckDB or the cube index.
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, tool_name: str):
+        with self._lock:
+            self._counts[tool_name] += 1
+
+    def stats(self) -> dict:
+        """Returns {tool name: calls} plus the 'total' over all tools."""
+        with self._lock:
+            return {**self._counts, "total": sum(self._counts.values())}
+
+
+# Shared by every tool instance in the process
+tool_calls = ToolCallCounter()
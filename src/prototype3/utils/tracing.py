@@ -0,0 +1,197 @@
+"""
+Lazily initialized Phoenix tracing with configurable capture.
+
+Registering the tracer provider and auto-instrumenting libraries is expensive, so
+it happens on the first traced call instead of when a module is imported.
+Commands that never run a flow (plot, path checks, short CLI calls) skip it.
+
+TRACING_MODE selects how much is captured:
+    off      no provider, no instrumentation; traced functions run undecorated
+    sampled  a TRACING_SAMPLE_RATIO share of traces, plus every failing step
+             (TRACING_SAMPLE_ERRORS) recorded as its own root span
+    full     every trace (the previous behavior)
+Spans are exported by a background batch processor with a bounded queue, so a
+slow or unreachable collector drops spans instead of blocking the flow.
+"""
+import contextlib
+import functools
+import os
+import threading
+
+PROJECT_NAME = "CrewAI_Prototype3"  # Project name that will appear in the UI
+TRACING_MODES = ("off", "sampled", "full")
+
+# Defaults can be overridden through environment variables
+TRACING_MODE = os.getenv("TRACING_MODE", "full").lower()
+SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", "0.1"))
+SAMPLE_ERRORS = os.getenv("TRACING_SAMPLE_ERRORS", "1") != "0"
+MAX_QUEUE_SIZE = int(os.getenv("TRACING_MAX_QUEUE_SIZE", "2048"))
+EXPORT_BATCH_SIZE = int(os.getenv("TRACING_EXPORT_BATCH_SIZE", "512"))
+EXPORT_DELAY_MS = int(os.getenv("TRACING_EXPORT_DELAY_MS", "2000"))
+
+# Spans carrying this attribute are always sampled, see _sampler
+FORCE_SAMPLE_ATTRIBUTE = "prototype3.force_sample"
+
+_tracer = None
+_lock = threading.Lock()
+
+
+def _sampler(mode: str, ratio: float):
+    """Ratio sampler (children follow their root) that always keeps forced error spans."""
+    from opentelemetry.sdk.trace.sampling import (
+        ALWAYS_ON, Decision, ParentBased, Sampler, SamplingResult, TraceIdRatioBased,
+    )
+
+    class ErrorAwareSampler(Sampler):
+        def __init__(self):
+            self._delegate = ParentBased(ALWAYS_ON if mode == "full" else TraceIdRatioBased(ratio))
+
+        def should_sample(self, parent_context, trace_id, name, kind=None, attributes=None, links=None,
+                          trace_state=None):
+            if attributes and attributes.get(FORCE_SAMPLE_ATTRIBUTE):
+                return SamplingResult(Decision.RECORD_AND_SAMPLE, attributes)
+            return self._delegate.should_sample(parent_context, trace_id, name, kind, attributes, links,
+                                                trace_state)
+
+        def get_description(self) -> str:
+            return f"ErrorAwareSampler({self._delegate.get_description()})"
+
+    return ErrorAwareSampler()
+
+
+def build_tracer_provider(mode: str = TRACING_MODE, ratio: float = SAMPLE_RATIO, exporter=None,
+                          auto_instrument: bool = True, set_global: bool = True):
+    """
+    Builds a Phoenix tracer provider for a tracing mode.
+
+    Args:
+        exporter: Span exporter to batch into; defaults to the Phoenix collector
+            configured through the PHOENIX_* environment variables
+        auto_instrument: Instrument the installed OpenInference libraries (crewai, litellm)
+        set_global: Install the provider as the global OpenTelemetry provider
+
+    Returns:
+        The provider, or None when mode is "off"
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    if mode not in TRACING_MODES:
+        raise ValueError(f"Unknown TRACING_MODE '{mode}', expected one of {TRACING_MODES}")
+    if mode == "off":
+        return None
+
+    from phoenix.otel import PROJECT_NAME as PROJECT_NAME_ATTRIBUTE, BatchSpanProcessor, Resource, TracerProvider
+
+    provider = TracerProvider(resource=Resource({PROJECT_NAME_ATTRIBUTE: PROJECT_NAME}),
+                              sampler=_sampler(mode, ratio), verbose=False)
+    batch_settings = {
+        "max_queue_size": MAX_QUEUE_SIZE,
+        "max_export_batch_size": EXPORT_BATCH_SIZE,
+        "schedule_delay_millis": EXPORT_DELAY_MS,
+    }
+    if exporter is None:
+        processor = BatchSpanProcessor(**batch_settings)
+    else:
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor as SDKBatchSpanProcessor
+
+        processor = SDKBatchSpanProcessor(exporter, **batch_settings)
+    # Replaces Phoenix's default synchronous processor
+    provider.add_span_processor(processor)
+
+    if set_global:
+        from opentelemetry import trace
+
+        trace.set_tracer_provider(provider)
+    if auto_instrument:
+        from importlib.metadata import entry_points
+
+        for entry_point in entry_points(group="openinference_instrumentor"):
+            try:
+                entry_point.load()().instrument(tracer_provider=provider)
+            except Exception as e:
+                print(f"Skipping instrumentation {entry_point.name}: {e}")
+    return provider
+
+
+def get_tracer():
+    """Returns the Phoenix tracer, registering the provider on first call; None when tracing is off."""
+    global _tracer
+    with _lock:
+        if _tracer is None and TRACING_MODE != "off":
+            print(f"Initializing Phoenix tracing ({TRACING_MODE})...")
+            _tracer = build_tracer_provider().get_tracer("prototype3")
+            print("✅ Phoenix tracing initialized")
+        return _tracer
+
+
+def traced(tracer, func, sample_errors: bool = SAMPLE_ERRORS):
+    """
+    Wraps a function in a chain span of `tracer`.
+
+    When the surrounding trace was not sampled and the function raises, the
+    error is still exported as a root span of its own, so failures are never
+    lost to sampling.
+    """
+    if not sample_errors:
+        return tracer.chain(func)
+
+    @functools.wraps(func)
+    def capture_errors(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except Exception as error:
+            from opentelemetry import context, trace
+
+            if not trace.get_current_span().is_recording():
+                with tracer.start_as_current_span(
+                    f"{func.__qualname__}.error", context=context.Context(),
+                    attributes={FORCE_SAMPLE_ATTRIBUTE: True},
+                ) as span:
+                    span.record_exception(error)
+                    span.set_status(trace.Status(trace.StatusCode.ERROR, str(error)))
+            raise
+
+    return tracer.chain(capture_errors)
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def record_exception(self, exception, **kwargs):
+        pass
+
+
+class LazyTracer:
+    """
+    Stand-in for the Phoenix tracer usable at import time.
+
+    `chain` keeps the decorated function's attributes (crewai reads its flow
+    markers from them) and only wraps it with the real tracer on the first call.
+    With TRACING_MODE=off it returns the function itself, so there is no
+    per-call overhead at all.
+    """
+
+    def chain(self, func):
+        if TRACING_MODE == "off":
+            return func
+        wrapped = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal wrapped
+            if wrapped is None:
+                wrapped = traced(get_tracer(), func)
+            return wrapped(*args, **kwargs)
+
+        return wrapper
+
+    def start_as_current_span(self, name: str, **kwargs):
+        tracer = get_tracer()
+        if tracer is None:
+            return contextlib.nullcontext(_NoopSpan())
+        return tracer.start_as_current_span(name, **kwargs)
+
+
+tracer = LazyTracer()
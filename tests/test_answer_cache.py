@@ -0,0 +1,94 @@
+import pytest
+
+from prototype3.utils.answer_cache import AnswerCache, answer_key, answer_scope
+
+PROMPT = "What is the amount of men in Prague at the end of Q3 2024?"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnswerCache(str(tmp_path / "answers.db"))
+
+
+def test_key_changes_with_dataset_version_and_config():
+    key = answer_key(PROMPT, "v1", "config")
+    assert answer_key(PROMPT, "v1", "config") == key
+    assert answer_key(PROMPT, "v2", "config") != key
+    assert answer_key(PROMPT, "v1", "other config") != key
+
+
+def test_put_then_get(cache):
+    key = answer_key(PROMPT, "v1", "config")
+    assert cache.get(key) is None
+    cache.put(key, PROMPT, "676069")
+    assert cache.get(key) == "676069"
+    assert cache.stats() == {"entries": 1, "hits": 1}
+
+
+def test_expired_answer_is_dropped(cache):
+    key = answer_key(PROMPT, "v1", "config")
+    cache.put(key, PROMPT, "676069")
+    cache.ttl_seconds = -1
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_answer_is_evicted(tmp_path):
+    cache = AnswerCache(str(tmp_path / "answers.db"), max_entries=2)
+    for name in ("a", "b"):
+        cache.put(name, name, name)
+    cache.get("a")
+    cache.put("c", "c", "c")
+    assert [cache.get(name) for name in ("a", "b", "c")] == ["a", None, "c"]
+
+
+def test_near_duplicate_is_served_within_its_scope(cache):
+    scope = answer_scope("v1", "config")
+    dimensions = {"ČR, kraje": ["Hlavní město Praha"]}
+    cache.put(answer_key(PROMPT, "v1", "config"), PROMPT, "676069", scope=scope, dimensions=dimensions)
+
+    match = cache.find_similar("Kolik mužů bylo v Praze na konci Q3 2024?", scope, dimensions=dimensions)
+    assert match is not None and match[2] == "676069"
+    assert cache.find_similar("men in Prague at the end of Q3 2024", answer_scope("v2", "config")) is None
+
+
+@pytest.mark.parametrize("prompt, dimensions", [
+    ("What is the amount of men in Prague at the end of Q2 2024?", None),
+    ("What is the amount of men in Prague at the end of Q3 2024?", {"ČR, kraje": ["Jihomoravský kraj"]}),
+])
+def test_near_duplicate_needs_same_numbers_and_dimensions(cache, prompt, dimensions):
+    scope = answer_scope("v1", "config")
+    cache.put(answer_key(PROMPT, "v1", "config"), PROMPT, "676069", scope=scope,
+              dimensions={"ČR, kraje": ["Hlavní město Praha"]})
+    assert cache.find_similar(prompt, scope, dimensions=dimensions) is None
+
+
+def test_similarity_index_follows_puts_and_deletions(tmp_path):
+    cache = AnswerCache(str(tmp_path / "answers.db"), max_entries=2)
+    scope = answer_scope("v1", "config")
+    for _ in range(3):
+        cache.put("a", PROMPT, "676069", scope=scope)
+    assert cache.find_similar(PROMPT, scope) is not None
+    assert len(cache._similarity_index(scope)) == 1
+
+    cache.put("b", "women in Brno", "1", scope=scope)
+    cache.get("b")
+    cache.put("c", "men in Zlin", "2", scope=scope)
+    assert "a" not in cache._similarity_index(scope)
+    assert cache.find_similar(PROMPT, scope) is None
+
+
+def test_similarity_index_drops_entries_deleted_elsewhere(tmp_path):
+    path = str(tmp_path / "answers.db")
+    cache, other = AnswerCache(path), AnswerCache(path)
+    scope = answer_scope("v1", "config")
+    cache.put("a", PROMPT, "676069", scope=scope)
+    assert cache.find_similar(PROMPT, scope) is not None
+
+    other.clear()
+    assert cache.find_similar(PROMPT, scope) is None
+    assert len(cache._similarity_index(scope)) == 0
+
+    cache.put("b", "women in Brno", "1", scope=scope)
+    cache.ttl_seconds = -1
+    assert len(cache._similarity_index(scope)) == 0
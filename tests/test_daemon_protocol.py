@@ -0,0 +1,31 @@
+import pytest
+
+from prototype3.daemon_protocol import parse_analyze_request
+
+
+def test_parses_prompt_dataset_and_bypass():
+    body = b'{"prompt": "  men in Prague  ", "dataset": "population", "bypass_cache": true}'
+    assert parse_analyze_request(body, datasets=["population"]) == ("men in Prague", "population", True)
+
+
+def test_optional_fields_default_to_none():
+    assert parse_analyze_request(b'{"prompt": "men", "bypass_cache": null}') == ("men", None, None)
+
+
+@pytest.mark.parametrize("body", [
+    b"[1]",
+    b'"men in Prague"',
+    b"null",
+    b"{}",
+    b'{"prompt": ""}',
+    b'{"prompt": 5}',
+    b'{"prompt": "men", "dataset": ["population"]}',
+    b'{"prompt": "men", "dataset": "unknown"}',
+    b'{"prompt": "men", "bypass_cache": "no"}',
+    b'{"prompt": "men", "bypass_cache": 1}',
+    b"{not json",
+    b"\xff\xfe",
+])
+def test_rejects_malformed_requests_with_value_error(body):
+    with pytest.raises(ValueError):
+        parse_analyze_request(body, datasets=["population"])
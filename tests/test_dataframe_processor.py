@@ -0,0 +1,262 @@
+import importlib.util
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from prototype3.utils.path_utils import get_project_root
+
+for dependency in ("dotenv", "litellm", "tenacity", "tqdm"):
+    pytest.importorskip(dependency)
+
+PROCESSOR_PATH = os.path.join(get_project_root(), "utilities", "dynamic_parallel_dataframe_llm_processor.py")
+
+
+@pytest.fixture
+def processor(monkeypatch, tmp_path):
+    monkeypatch.setenv("LLM_OFFLINE_MODE", "stub")
+    monkeypatch.setenv("LLM_OFFLINE_LATENCY_MS", "0")
+    monkeypatch.setenv("PROCESSOR_CACHE", "off")
+    spec = importlib.util.spec_from_file_location("dynamic_parallel_dataframe_llm_processor", PROCESSOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def completed_rows(checkpoint, rows: int) -> list:
+    index = pd.RangeIndex(rows)
+    return index[checkpoint.completed.mask(index)].tolist()
+
+
+def test_checkpoint_reloads_recorded_rows(processor, tmp_path):
+    path = str(tmp_path / "out.csv.checkpoint")
+    checkpoint = processor.Checkpoint(path)
+    checkpoint.record([0, 1], 20)
+    checkpoint.record([2], 30)
+
+    reloaded = processor.Checkpoint(path)
+    assert completed_rows(reloaded, 5) == [0, 1, 2]
+    assert reloaded.output_size == 30
+
+
+def test_checkpoint_truncates_torn_last_line(processor, tmp_path):
+    path = tmp_path / "out.csv.checkpoint"
+    valid = json.dumps({"rows": [0, 1], "output_size": 20}) + "\n"
+    path.write_text(valid + '{"rows": [2, 3], "outp', encoding="utf-8")
+
+    checkpoint = processor.Checkpoint(str(path))
+    assert completed_rows(checkpoint, 5) == [0, 1]
+    assert path.read_text(encoding="utf-8") == valid
+
+    # Entries recorded after the torn line are read back by the next run
+    checkpoint.record([2, 3], 40)
+    reloaded = processor.Checkpoint(str(path))
+    assert completed_rows(reloaded, 5) == [0, 1, 2, 3]
+    assert reloaded.output_size == 40
+
+
+def test_checkpoint_reads_single_row_entries(processor, tmp_path):
+    path = tmp_path / "out.csv.checkpoint"
+    path.write_text(json.dumps({"rows": [0, 1, 3], "output_size": 30}) + "\n", encoding="utf-8")
+    assert completed_rows(processor.Checkpoint(str(path)), 5) == [0, 1, 3]
+
+
+def test_row_ranges_merge_and_count(processor):
+    ranges = processor.RowRanges()
+    for start, end in [(10, 20), (0, 5), (5, 8), (30, 40), (15, 35)]:
+        ranges.add(start, end)
+    assert (ranges.starts, ranges.ends, len(ranges)) == ([0, 10], [8, 40], 38)
+    assert processor.RowRanges.runs([0, 1, 2, 5, 6, 9]) == [(0, 3), (5, 7), (9, 10)]
+    index = pd.RangeIndex(5, 12)
+    assert index[ranges.mask(index)].tolist() == [5, 6, 7, 10, 11]
+
+
+def test_resume_cost_stays_flat_with_millions_of_completed_rows(processor, tmp_path):
+    checkpoint = processor.Checkpoint(str(tmp_path / "out.csv.checkpoint"))
+    chunk_size = 10_000
+    # 2M rows done, every 1000th row failed and left for the next run
+    for start in range(0, 2_000_000, chunk_size):
+        rows = [row for row in range(start, start + chunk_size) if row % 1000]
+        checkpoint.record(rows, start)
+    assert len(checkpoint.completed) == 1_998_000
+    assert len(checkpoint.completed.starts) == 2000
+
+    index = pd.RangeIndex(1_990_000, 2_000_000)
+    started = processor.time.perf_counter()
+    pending = index[~checkpoint.completed.mask(index)]
+    assert processor.time.perf_counter() - started < 0.05
+    assert pending.tolist() == list(range(1_990_000, 2_000_000, 1000))
+
+    reloaded = processor.Checkpoint(checkpoint.path)
+    assert len(reloaded.completed) == 1_998_000
+
+
+def test_checkpoint_ignores_complete_entry_without_newline(processor, tmp_path):
+    path = tmp_path / "out.csv.checkpoint"
+    path.write_text(json.dumps({"rows": [0], "output_size": 10}), encoding="utf-8")
+
+    checkpoint = processor.Checkpoint(str(path))
+    assert len(checkpoint.completed) == 0
+    assert path.read_text(encoding="utf-8") == ""
+
+
+def write_input(path, rows: int):
+    lines = ["topic,task"] + [f"topic {i},task {i}" for i in range(rows)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_streaming_writes_every_row_once_and_resumes(processor, tmp_path, engine):
+    processor.PROMPT_TEMPLATE = "Topic: {topic}\nTask: {task}"
+    input_csv, output_csv = tmp_path / "input.csv", tmp_path / "output.csv"
+    write_input(input_csv, 5)
+    options = dict(chunk_size=2, engine=engine,
+                   requests_per_minute=processor.CONFIG['REQUESTS_PER_MINUTE']['MAX'])
+
+    metrics = processor.process_csv_streaming(str(input_csv), str(output_csv), "response", **options)
+    assert (metrics.processed_rows, metrics.failed_rows) == (5, 0)
+    rerun = processor.process_csv_streaming(str(input_csv), str(output_csv), "response", **options)
+    assert rerun.processed_rows == 0
+
+    output = pd.read_csv(output_csv)
+    assert list(output.columns) == ["topic", "task", "response"]
+    assert output["topic"].tolist() == [f"topic {i}" for i in range(5)]
+    assert output["response"].notna().all()
+
+
+def test_async_streaming_runs_all_chunks_on_one_event_loop(processor, tmp_path, monkeypatch):
+    processor.PROMPT_TEMPLATE = "Topic: {topic}\nTask: {task}"
+    input_csv, output_csv = tmp_path / "input.csv", tmp_path / "output.csv"
+    write_input(input_csv, 5)
+    runs = []
+    real_run = processor.asyncio.run
+    monkeypatch.setattr(processor.asyncio, "run", lambda coroutine: runs.append(coroutine) or real_run(coroutine))
+
+    processor.process_csv_streaming(str(input_csv), str(output_csv), "response", chunk_size=2, engine="async",
+                                    requests_per_minute=processor.CONFIG['REQUESTS_PER_MINUTE']['MAX'])
+    assert len(runs) == 1
+
+
+def test_response_cache_round_trip_and_read_only(processor, tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = processor.ResponseCache(path)
+    cache.put("prompt", "answer")
+    assert cache.get("prompt") == "answer"
+    assert cache.get("other") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    read_only = processor.ResponseCache(path, read_only=True)
+    read_only.put("new prompt", "new answer")
+    assert read_only.get("prompt") == "answer"
+    assert cache.get("new prompt") is None
+
+
+def test_response_cache_expires_and_evicts_least_recently_used(processor, tmp_path, monkeypatch):
+    monkeypatch.setattr(processor.ResponseCache, "EVICTION_INTERVAL", 1)
+    cache = processor.ResponseCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+    assert [cache.get(prompt) for prompt in ("a", "b", "c")] == ["1", None, "3"]
+
+    cache.ttl_seconds = -1
+    assert cache.get("c") is None
+
+
+def test_response_cache_write_error_is_logged_not_raised(processor, tmp_path, caplog):
+    cache = processor.ResponseCache(str(tmp_path / "cache.db"))
+    with cache._connection() as connection:
+        connection.execute("DROP TABLE responses")
+    cache.put("prompt", "answer")
+    assert "Response cache write failed" in caplog.text
+
+
+def test_cache_write_error_does_not_resend_the_request(processor, tmp_path, monkeypatch):
+    processor.PROMPT_TEMPLATE = "Topic: {topic}"
+    cache = processor.ResponseCache(str(tmp_path / "cache.db"))
+    with cache._connection() as connection:
+        connection.execute("DROP TABLE responses")
+    monkeypatch.setattr(processor, "get_response_cache", lambda: cache)
+    calls = []
+    completion = processor.litellm.completion
+    monkeypatch.setattr(processor.litellm, "completion", lambda **kwargs: calls.append(kwargs) or completion(**kwargs))
+
+    frame = pd.DataFrame({"topic": ["a", "b", "a"]})
+    result = processor.process_dataframe_parallel(frame, "response", max_workers=2,
+                                                  requests_per_minute=processor.CONFIG['REQUESTS_PER_MINUTE']['MAX'])
+    assert result["response"].notna().all()
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_empty_content_counts_as_failed(processor, monkeypatch, engine):
+    processor.PROMPT_TEMPLATE = "Topic: {topic}"
+
+    async def no_content_async(prompt, rate_limiter=None):
+        return None
+
+    monkeypatch.setattr(processor, "request_completion", lambda prompt, rate_limiter=None: None)
+    monkeypatch.setattr(processor, "request_completion_async", no_content_async)
+    metrics = processor.Metrics()
+    frame = pd.DataFrame({"topic": ["a", "b", "a"]})
+    if engine == "async":
+        processor.asyncio.run(processor.process_dataframe_async(frame, "response", metrics=metrics))
+    else:
+        processor.process_dataframe_parallel(frame, "response", metrics=metrics)
+    assert (metrics.processed_rows, metrics.failed_rows) == (3, 3)
+
+
+@pytest.fixture
+def clock(processor, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(processor.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_rate_limiter_allows_a_burst_then_waits_for_refill(processor, clock):
+    limiter = processor.RateLimiter(requests_per_minute=60, burst_seconds=3)
+    assert [limiter._take(0) for _ in range(3)] == [0, 0, 0]
+    assert limiter._take(0) == pytest.approx(1.0)
+    clock[0] += 1.0
+    assert limiter._take(0) == 0
+
+
+def test_rate_limiter_waits_for_tokens_and_settles_real_usage(processor, clock):
+    limiter = processor.RateLimiter(requests_per_minute=600, tokens_per_minute=600, burst_seconds=60)
+    assert limiter._take(500) == 0
+    assert limiter._take(200) == pytest.approx(10.0)
+    # The first request used 100 tokens, not 500: the difference goes back into the bucket
+    limiter.settle(500, 100)
+    assert limiter._take(200) == 0
+    # Underestimates put the bucket into debt
+    limiter.settle(200, 800)
+    assert limiter._take(1) == pytest.approx(301 / 10)
+
+
+def test_rate_limiter_rejects_non_positive_limits(processor):
+    with pytest.raises(processor.ConfigurationError):
+        processor.RateLimiter(requests_per_minute=0)
+    with pytest.raises(processor.ConfigurationError):
+        processor.RateLimiter(requests_per_minute=10, tokens_per_minute=-1)
+
+
+def test_async_acquire_waits_without_blocking_the_loop(processor):
+    limiter = processor.RateLimiter(requests_per_minute=600, burst_seconds=0.1)
+
+    async def run():
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(processor.time.monotonic())
+                await processor.asyncio.sleep(0.02)
+
+        await processor.asyncio.gather(ticker(), *(limiter.acquire_async() for _ in range(3)))
+        return ticks
+
+    start = processor.time.monotonic()
+    ticks = processor.asyncio.run(run())
+    assert processor.time.monotonic() - start >= 0.15
+    assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.15
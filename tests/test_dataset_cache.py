@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from prototype3.utils.dataset_cache import DatasetCache
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("region,value\nA,1\nB,2\n", encoding="utf-8")
+    return str(path)
+
+
+def test_second_get_is_a_hit(csv_path):
+    cache = DatasetCache()
+    cache.get(csv_path)
+    cache.get(csv_path)
+    assert (cache.loads, cache.hits) == (1, 1)
+
+
+def test_callers_cannot_change_the_cached_frame(csv_path):
+    cache = DatasetCache()
+    first = cache.get(csv_path)
+    first.loc[0, "value"] = 99
+    first["extra"] = 1
+    first.pop("region")
+
+    second = cache.get(csv_path)
+    pd.testing.assert_frame_equal(second, pd.DataFrame({"region": ["A", "B"], "value": [1, 2]}))
+    assert cache.loads == 1
+
+
+def test_changed_file_is_reloaded(csv_path):
+    cache = DatasetCache()
+    cache.get(csv_path)
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("C,3\n")
+    assert len(cache.get(csv_path)) == 3
+    assert cache.reloads == 1
+
+
+def test_invalidate_drops_entries_and_load_locks(csv_path, tmp_path):
+    other = tmp_path / "other.csv"
+    other.write_text("region,value\nC,3\n", encoding="utf-8")
+    cache = DatasetCache()
+    cache.get(csv_path)
+    cache.get(str(other))
+    reloaded = []
+    cache.add_reload_listener(reloaded.append)
+
+    cache.invalidate(csv_path)
+    assert [key[0] for key in cache._load_locks] == [str(other)]
+    assert cache.stats()["entries"] == 1
+    cache.invalidate()
+    assert cache._load_locks == {}
+    assert reloaded == [csv_path, str(other)]
+
+
+def test_least_recently_used_entry_is_evicted(csv_path, tmp_path):
+    other = tmp_path / "other.csv"
+    other.write_text("region,value\nC,3\n", encoding="utf-8")
+    cache = DatasetCache(max_entries=1)
+    cache.get(csv_path)
+    cache.get(str(other))
+    assert cache.evictions == 1
+    assert cache.version(csv_path) is None
+    assert len(cache._load_locks) == 1
+
+
+def test_hits_share_the_cached_data(csv_path):
+    cache = DatasetCache()
+    first, second = cache.get(csv_path), cache.get(csv_path)
+    assert first is not second
+    assert np.shares_memory(first["value"].to_numpy(), second["value"].to_numpy())
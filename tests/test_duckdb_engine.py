@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("duckdb")
+pytest.importorskip("pyarrow")
+
+from prototype3.utils.duckdb_engine import DuckDBEngine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    data = tmp_path / "data.csv"
+    data.write_text("region,value\nA,1\nB,2\n", encoding="utf-8")
+    (tmp_path / "secret.csv").write_text("token\nhunter2\n", encoding="utf-8")
+    engine = DuckDBEngine()
+    engine.register_dataset("data", str(data))
+    engine.lock_down()
+    return engine
+
+
+def test_locked_engine_still_queries_the_dataset(engine):
+    table = engine.query_arrow("SELECT SUM(value) AS total FROM data WHERE region IN ('A', 'B')")
+    assert table.column("total")[0].as_py() == 3
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM read_csv_auto('{dir}/secret.csv')",
+    "SELECT * FROM read_text('{dir}/secret.csv')",
+    "SELECT * FROM '{dir}/secret.csv'",
+])
+def test_locked_engine_cannot_read_other_files(engine, tmp_path, sql):
+    with pytest.raises(Exception, match="(?i)permission|disabled"):
+        engine.query_arrow(sql.format(dir=tmp_path))
+
+
+@pytest.mark.parametrize("sql", [
+    "COPY (SELECT 1) TO '{dir}/out.csv'",
+    "ATTACH '{dir}/other.db'",
+    "DROP VIEW data",
+    "SET enable_external_access = true",
+    "SELECT 1; DROP VIEW data",
+    "INSTALL httpfs",
+])
+def test_locked_engine_rejects_statements_other_than_select(engine, tmp_path, sql):
+    with pytest.raises(ValueError, match="single SELECT"):
+        engine.query_arrow(sql.format(dir=tmp_path))
+    assert not (tmp_path / "out.csv").exists()
+    assert engine.query_arrow("SELECT COUNT(*) FROM data").column(0)[0].as_py() == 2
+
+
+def test_no_datasets_can_be_registered_after_lock_down(engine, tmp_path):
+    with pytest.raises(RuntimeError):
+        engine.register_dataset("other", str(tmp_path / "secret.csv"))
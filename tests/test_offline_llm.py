@@ -0,0 +1,22 @@
+import pytest
+
+litellm = pytest.importorskip("litellm")
+
+from prototype3.utils.offline_llm import STUB_RESPONSE, install_offline_llm
+
+
+@pytest.mark.parametrize("alias", ["gpt-4o", "my-model"])
+def test_known_and_unknown_aliases_reach_the_stand_in(alias):
+    responder = install_offline_llm({alias: "azure/deployment"}, mode="stub")
+    calls = responder.stats.calls
+    response = litellm.completion(model=alias, messages=[{"role": "user", "content": "hello"}])
+    assert response.choices[0].message.content == STUB_RESPONSE
+    assert responder.stats.calls == calls + 1
+
+
+def test_async_completion_reaches_the_stand_in():
+    import asyncio
+
+    install_offline_llm({"gpt-4o": "azure/deployment"}, mode="stub")
+    response = asyncio.run(litellm.acompletion(model="gpt-4o", messages=[{"role": "user", "content": "hello"}]))
+    assert response.choices[0].message.content == STUB_RESPONSE
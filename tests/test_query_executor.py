@@ -0,0 +1,111 @@
+import os
+
+import pandas as pd
+import pytest
+
+from prototype3.utils.query_executor import QueryLimitError, QueryValidationError, execute_query
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "region": ["Praha", "Brno", "Praha", "Brno"],
+        "indicator": ["men", "men", "women", "women"],
+        "value": [10, 20, 30, 40],
+    })
+
+
+@pytest.mark.parametrize("query", [
+    'df.agg("to_csv", 0, "{path}")',
+    'df["value"].agg("to_pickle", 0, "{path}")',
+    'df.aggregate("to_csv", 0, "{path}")',
+    'df.groupby("region").agg("__class__")',
+    'df.agg("pop", 0, "value")',
+    'df.agg(["sum", "pop"])',
+    'df.agg({{"value": "pop"}})',
+    'df.groupby("region").agg(total=("value", "pop"))',
+    'df.pivot_table(values="value", index="region", aggfunc="pop")',
+    'df.pivot_table("value", "region", None, "pop")',
+    'df["value"].values.clip(0, 1, out=df["value"].values)',
+])
+def test_string_dispatch_is_rejected(df, tmp_path, query):
+    path = tmp_path / "leak.out"
+    with pytest.raises(QueryValidationError):
+        execute_query(query.format(path=path.as_posix()), df)
+    assert not os.path.exists(path)
+    assert list(df.columns) == ["region", "indicator", "value"]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ('df.agg("sum")["value"]', 100),
+    ('df.groupby("region")["value"].agg("max")["Brno"]', 40),
+    ('df.groupby("region").agg({"value": "mean"})["value"]["Praha"]', 20),
+    ('df.groupby("region").agg(total=("value", "sum"))["total"]["Praha"]', 40),
+    ('df.pivot_table(values="value", index="region", aggfunc="sum")["value"]["Brno"]', 60),
+])
+def test_allowed_aggregations(df, query, expected):
+    assert execute_query(query, df) == expected
+
+
+def test_query_cannot_change_the_callers_frame(df):
+    # Column changes through an allowed method only affect the query's own view
+    execute_query('df.rename(columns={"value": "renamed"})', df)
+    assert list(df.columns) == ["region", "indicator", "value"]
+
+
+@pytest.mark.parametrize("query", [
+    "df.to_csv('x.csv')",
+    "df.__class__",
+    "__import__('os')",
+    "df.apply(len)",
+])
+def test_disallowed_attributes_and_names(df, query):
+    with pytest.raises(QueryValidationError):
+        execute_query(query, df)
+
+
+@pytest.mark.parametrize("query", [
+    '"a" * 10000000000',
+    '[0] * 10000000000',
+    '"a" * 100000 * 100000',
+    '("ab" + "c") * 1000000',
+    '"a" * len(df) * 1000',
+    '"a" * 10 ** 10',
+    '[[0] * 1000000] * 1000000',
+    '[("a" * 1000, 1)] * 1000000',
+    'pd.concat([df] * 1000000)',
+    '([df] + [df]) * 3',
+    'list(df.index) * 1000000',
+    'df.columns.tolist() * 2',
+])
+def test_large_literal_repetition_is_rejected(df, query):
+    with pytest.raises(QueryValidationError):
+        execute_query(query, df)
+
+
+def test_small_literal_repetition_is_allowed(df):
+    assert execute_query('"ab" * 3', df) == "ababab"
+    assert execute_query('[[0] * 3] * 2', df) == [[0, 0, 0], [0, 0, 0]]
+    assert execute_query('[-1] * 2 + [1]', df) == [-1, -1, 1]
+
+
+def test_numeric_multiplication_is_not_repetition(df):
+    assert execute_query('(df["value"] * 1000000000).sum()', df) == df["value"].sum() * 1000000000
+    assert execute_query('2 * 3', df) == 6
+
+
+def test_timed_out_queries_do_not_block_the_pool(df, monkeypatch):
+    import threading
+
+    from prototype3.utils import query_executor
+
+    release = threading.Event()
+    # Stands in for a query the allowlist cannot recognise as slow
+    monkeypatch.setitem(query_executor.SAFE_BUILTINS, "sorted", lambda value: release.wait(30) and value)
+    try:
+        for _ in range(query_executor.QUERY_WORKERS):
+            with pytest.raises(QueryLimitError):
+                execute_query('sorted(df)', df, timeout=0.05)
+        assert execute_query('df["value"].sum()', df, timeout=5) == 100
+    finally:
+        release.set()
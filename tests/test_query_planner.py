@@ -0,0 +1,71 @@
+import pytest
+
+from prototype3.utils.query_planner import get_query_planner, split_periods
+
+PRAGUE_MEN_END = 676069
+
+
+@pytest.fixture(scope="module")
+def planner():
+    return get_query_planner()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Q1-Q3 2024", {"q1-q3", "2024"}),
+    ("1.-3. čtvrtletí 2024", {"q1-q3", "2024"}),
+    ("Q1 to Q3 2024", {"q1-q3", "2024"}),
+    ("at the end of Q1 2024", {"q1", "2024"}),
+    ("second quarter of 2024", {"q2", "2024"}),
+    ("at the end of 2024", {"2024"}),
+    ("men in Prague", set()),
+])
+def test_split_periods(text, expected):
+    assert split_periods(text)[0] == expected
+
+
+@pytest.mark.parametrize("prompt", [
+    "men in Prague at the end of Q1-Q3 2024",
+    "Kolik mužů bylo v Praze na konci 1.-3. čtvrtletí 2024?",
+    "men in Prague at the end of the period",
+])
+def test_answers_with_the_matching_period(planner, prompt):
+    answer = planner.answer(prompt)
+    assert answer is not None
+    assert f"value: {PRAGUE_MEN_END}" in answer[0]
+
+
+@pytest.mark.parametrize("prompt", [
+    "men in Prague at the end of Q1 2024",
+    "men in Prague at the end of Q3 2024",
+    "men in Prague at the end of 2024",
+    "men in Prague at the end of Q1-Q3 2023",
+])
+def test_declines_a_different_period(planner, prompt):
+    assert planner.plan(prompt) is None
+
+
+@pytest.mark.parametrize("prompt", [
+    "men outside Prague at the end of Q1-Q3 2024",
+    "men in all regions except Prague at the end of the period",
+    "men not living in Prague",
+    "počet mužů mimo Prahu na konci období",
+    "počet mužů kromě Prahy na konci období",
+    "which region had the second most women",
+    "which region had the third highest number of men",
+    "top 3 regions by number of women",
+    "the 3 largest regions by women at the end of the period",
+    "men in Prague at the end of the period in thousands",
+    "počet mužů v Praze na konci období v tisících",
+])
+def test_falls_back_on_negation_ranks_and_units(planner, prompt):
+    assert planner.plan(prompt) is None
+
+
+@pytest.mark.parametrize("prompt, operation", [
+    ("which region had the most women at the end of the period", "max"),
+    ("which region had the fewest men at the end of Q1-Q3 2024", "min"),
+    ("total population of all regions at the end of the period", "sum"),
+])
+def test_plans_region_aggregations(planner, prompt, operation):
+    plan = planner.plan(prompt)
+    assert plan is not None and plan.operation == operation
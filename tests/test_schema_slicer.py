@@ -0,0 +1,58 @@
+import pytest
+
+from prototype3.utils.schema_slicer import get_schema_slicer
+
+REGIONS = "ČR, kraje"
+INDICATORS = "Ukazatel"
+
+
+@pytest.fixture(scope="module")
+def slicer():
+    return get_schema_slicer()
+
+
+def test_real_schema_shrinks_to_the_named_region(slicer):
+    sliced, report = slicer.slice("What is the amount of men in Prague at the end of Q1-Q3 2024?")
+    regions = sliced["dimensions"][REGIONS]
+    assert regions["values"] == ["Hlavní město Praha"]
+    assert regions["values_partial"] is True
+    assert regions["values_total"] == 15
+    assert report["sliced_tokens"] < report["full_tokens"]
+
+
+@pytest.mark.parametrize("prompt, region, indicator", [
+    ("men in Prague at the end of Q3 2024", "Hlavní město Praha", "Počet obyvatel na konci období - muži"),
+    ("women in the Zlin region at end of period", "Zlínský kraj", "Počet obyvatel na konci období - ženy"),
+])
+def test_generic_words_keep_the_top_scoring_values(slicer, prompt, region, indicator):
+    sliced, _ = slicer.slice(prompt)
+    assert sliced["dimensions"][REGIONS]["values"] == [region]
+    assert sliced["dimensions"][INDICATORS]["values"] == [indicator]
+
+
+def test_named_region_survives_generic_region_word(slicer):
+    sliced, _ = slicer.slice("population of South Moravian region")
+    assert sliced["dimensions"][REGIONS]["values"] == ["Jihomoravský kraj"]
+
+
+def test_indicators_shrink_to_the_named_sex(slicer):
+    sliced, _ = slicer.slice("Which region had the highest number of women?")
+    assert all(value.endswith("ženy") for value in sliced["dimensions"][INDICATORS]["values"])
+
+
+@pytest.mark.parametrize("prompt", [
+    "Which region had the highest number of women?",
+    "Total population of all regions at the end",
+])
+def test_generic_region_word_keeps_every_region(slicer, prompt):
+    # 'region' matches every 'kraj' but says nothing about which one is meant
+    sliced, report = slicer.slice(prompt)
+    assert report["dimensions"][REGIONS] == "full"
+    assert len(sliced["dimensions"][REGIONS]["values"]) == 15
+    assert "values_partial" not in sliced["dimensions"][REGIONS]
+
+
+def test_unsliced_metadata_is_left_untouched(slicer):
+    before = list(slicer.metadata["dimensions"][REGIONS]["values"])
+    slicer.slice("men in Prague")
+    assert slicer.metadata["dimensions"][REGIONS]["values"] == before
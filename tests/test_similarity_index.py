@@ -0,0 +1,45 @@
+import pytest
+
+from prototype3.utils.similarity_index import NEAR_DUPLICATE_THRESHOLD, SimilarityIndex, canonical_words
+
+
+def best_score(stored: str, query: str) -> float:
+    index = SimilarityIndex()
+    index.add(stored, None)
+    results = index.search(query)
+    return results[0][0] if results else 0.0
+
+
+@pytest.mark.parametrize("stored, query", [
+    ("men in Prague end of Q3 2024", "number of males in Praha at the end of Q3 2024"),
+    ("What is the amount of men in Prague at the end of Q3 2024?", "Kolik mužů bylo v Praze na konci Q3 2024?"),
+])
+def test_paraphrases_reach_the_threshold(stored, query):
+    assert best_score(stored, query) >= NEAR_DUPLICATE_THRESHOLD
+
+
+@pytest.mark.parametrize("stored, query", [
+    ("men in Prague at the end of Q3 2024", "women in Prague at the end of Q3 2024"),
+    ("men in Prague at the end of Q3 2024", "men in Brno at the beginning of Q3 2024"),
+])
+def test_different_questions_stay_below_the_threshold(stored, query):
+    assert best_score(stored, query) < NEAR_DUPLICATE_THRESHOLD
+
+
+def test_prague_is_one_canonical_word():
+    assert canonical_words("men in Prague") == ["muzi", "praha"]
+
+
+def test_same_key_replaces_the_document_and_remove_drops_it():
+    index = SimilarityIndex()
+    index.add("men in Prague", "old", key="a")
+    index.add("women in Brno", "new", key="a")
+    index.add("men in Zlin", "other", key="b")
+    assert len(index) == 2
+    assert "old" not in [payload for _, _, payload in index.search("men in Prague")]
+
+    assert index.remove("a") and not index.remove("a")
+    assert "a" not in index and len(index) == 1
+    index.remove("b")
+    assert index.search("men in Zlin") == []
+    assert not index.postings and not index.document_frequency
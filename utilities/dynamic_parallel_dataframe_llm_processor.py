@@ -5,11 +5,17 @@ This module provides functionality to process pandas DataFrames in parallel usin
 Key Features:
 -------------
 1. Fully Dynamic Column Handling: All DataFrame columns are passed as parameters to the prompt template.
-2. Parallel Processing: Uses ThreadPoolExecutor for concurrent API calls.
-3. Rate Limiting: Implements request rate limiting to respect API constraints.
+2. Parallel Processing: Uses ThreadPoolExecutor for concurrent API calls, or asyncio
+   (process_dataframe_async) to keep thousands of requests in flight on one thread.
+3. Rate Limiting: A token bucket shared by all workers enforces requests and tokens per minute.
 4. Error Handling: Retries failed requests and captures errors.
 5. Metrics Collection: Tracks processing time and success/failure rates.
 6. External Template Loading: Loads prompt templates from external text files with UTF-8 support.
+7. Streaming: process_csv_streaming reads the input in chunks, appends finished rows to the output
+   and checkpoints them, so memory stays flat and a rerun resumes where the last one stopped.
+8. Deduplication: Rows whose rendered prompts are identical share a single API call.
+9. Response Cache: Responses are kept in SQLite, so reruns on overlapping inputs skip
+   prompts already answered with the same model, deployment and temperature.
 
 How it works:
 ------------
@@ -52,14 +58,21 @@ result_df = process_dataframe_parallel(
 # IMPORTS
 #===============================================================================
 import pandas as pd
+import numpy as np
 import os
+import asyncio
 from dotenv import load_dotenv
 import litellm
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tenacity import retry, stop_after_attempt, wait_exponential
 import time
 import logging
-from typing import Dict, Any
+import threading
+import json
+import bisect
+import hashlib
+import sqlite3
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 from functools import wraps
@@ -87,8 +100,10 @@ logger = logging.getLogger(__name__)
 
 # Load and validate environment in one step
 load_dotenv()
+# LLM_OFFLINE_MODE (stub | replay | record) answers from the local stand-in in prototype3.utils.offline_llm
+OFFLINE_MODE = os.getenv('LLM_OFFLINE_MODE', 'off').lower()
 for var in ['AZURE_OPENAI_ENDPOINT', 'AZURE_OPENAI_API_KEY']:
-    if not os.getenv(var):
+    if not os.getenv(var) and OFFLINE_MODE in ('off', 'record'):
         raise EnvironmentError(f"Missing required environment variable: {var}")
 
 # Configure litellm for Azure OpenAI
@@ -100,16 +115,41 @@ litellm.api_key = os.getenv('AZURE_OPENAI_API_KEY')
 litellm.model_alias_map = {
     "gpt-4o": "azure/gpt-4o__test1"
 }
+if OFFLINE_MODE != 'off':
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+    from prototype3.utils.offline_llm import install_offline_llm
+    install_offline_llm(dict(litellm.model_alias_map), mode=OFFLINE_MODE)
 
 # Consolidated constants
 CONFIG = {
     'MODEL': "gpt-4o",
     'TEMPERATURE': 0.7,
     'MAX_WORKERS': 5,
+    # Requests in flight at once with the asyncio engine
+    'MAX_CONCURRENCY': int(os.getenv('PROCESSOR_MAX_CONCURRENCY', '100')),
+    # 'threads' (process_dataframe_parallel) or 'async' (process_dataframe_async) for the execution block
+    'ENGINE': os.getenv('PROCESSOR_ENGINE', 'threads'),
+    # PROCESSOR_STREAMING=1 makes the execution block use process_csv_streaming
+    'STREAMING': os.getenv('PROCESSOR_STREAMING', '0') == '1',
+    # Rows read, processed and written at a time in streaming mode
+    'CHUNK_SIZE': int(os.getenv('PROCESSOR_CHUNK_SIZE', '1000')),
     'REQUESTS_PER_MINUTE': {
         'DEFAULT': 60,
         'MIN': 1,
         'MAX': 100
+    },
+    # Tokens per minute of the deployment's quota; None leaves tokens unlimited
+    'TOKENS_PER_MINUTE': int(os.getenv('TOKENS_PER_MINUTE')) if os.getenv('TOKENS_PER_MINUTE') else None,
+    # Completion tokens reserved per request until the response reports its real usage
+    'EXPECTED_COMPLETION_TOKENS': 500,
+    # Seconds of quota that may be spent at once
+    'BURST_SECONDS': 10,
+    # Persistent response cache: PROCESSOR_CACHE is 'on', 'read-only' (no writes, for reproducible reruns) or 'off'
+    'CACHE': {
+        'MODE': os.getenv('PROCESSOR_CACHE', 'on').lower(),
+        'PATH': os.getenv('PROCESSOR_CACHE_DB', 'llm_response_cache.db'),
+        'MAX_ENTRIES': int(os.getenv('PROCESSOR_CACHE_MAX_ENTRIES', '100000')),
+        'TTL_SECONDS': float(os.getenv('PROCESSOR_CACHE_TTL_SECONDS', str(30 * 24 * 3600)))
     }
 }
 
@@ -175,6 +215,36 @@ def load_dataframe_from_csv(csv_path: str) -> pd.DataFrame:
     except Exception as e:
         raise ConfigurationError(f"Failed to load DataFrame from CSV: {e}")
 
+def iter_csv_chunks(csv_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Read a CSV file as DataFrames of at most `chunk_size` rows, handling commas in cells.
+
+    Args:
+        csv_path (str): Path to the CSV file.
+        chunk_size (int): The maximum number of rows per chunk.
+
+    Yields:
+        pd.DataFrame: The next rows, indexed by their row number in the file (0 is the first data row).
+
+    Raises:
+        ConfigurationError: If the file cannot be read or has no header.
+    """
+    if chunk_size < 1:
+        raise ConfigurationError(f"Invalid chunk_size: {chunk_size}")
+    try:
+        with open(get_absolute_path(csv_path), 'r', encoding='utf-8', newline='') as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader)
+            row_number, rows = 0, []
+            for row in reader:
+                rows.append(row)
+                if len(rows) == chunk_size:
+                    yield pd.DataFrame(rows, columns=header, index=range(row_number, row_number + len(rows)))
+                    row_number, rows = row_number + len(rows), []
+            if rows:
+                yield pd.DataFrame(rows, columns=header, index=range(row_number, row_number + len(rows)))
+    except (OSError, StopIteration, csv.Error) as e:
+        raise ConfigurationError(f"Failed to read CSV in chunks: {e}")
+
 def validate_model_config():
     """Validate model configuration at startup.
 
@@ -239,6 +309,104 @@ def save_to_csv(df: pd.DataFrame, filename: str):
         logger.error(f"Error saving DataFrame to CSV: {e}")
         raise
 
+#===============================================================================
+# CHECKPOINTING
+#===============================================================================
+class RowRanges:
+    """Set of row numbers stored as sorted, disjoint half-open ranges.
+
+    Streaming writes rows in input order, so the completed rows form a few long
+    runs broken only by failed rows: memory grows with the number of gaps, not
+    with the number of rows, and a chunk is checked against the ranges it
+    overlaps instead of against every completed row.
+    """
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.count = 0
+
+    @staticmethod
+    def runs(rows: List[int]) -> List[Tuple[int, int]]:
+        """Collapse ascending row numbers into [start, end) runs."""
+        runs = []
+        for row in rows:
+            if runs and runs[-1][1] == row:
+                runs[-1][1] = row + 1
+            else:
+                runs.append([row, row + 1])
+        return [tuple(run) for run in runs]
+
+    def add(self, start: int, end: int):
+        """Add the rows in [start, end), merging with touching or overlapping ranges."""
+        first = bisect.bisect_left(self.ends, start)
+        last = bisect.bisect_right(self.starts, end)
+        if first < last:
+            start, end = min(start, self.starts[first]), max(end, self.ends[last - 1])
+            self.count -= sum(self.ends[i] - self.starts[i] for i in range(first, last))
+        self.starts[first:last] = [start]
+        self.ends[first:last] = [end]
+        self.count += end - start
+
+    def mask(self, index: pd.Index):
+        """Boolean array marking which integers of `index` are in the set."""
+        values = index.to_numpy()
+        covered = np.zeros(len(values), dtype=bool)
+        if len(values) == 0 or not self.starts:
+            return covered
+        low, high = values.min(), values.max() + 1
+        for i in range(bisect.bisect_right(self.ends, low), bisect.bisect_left(self.starts, high)):
+            covered |= (values >= self.starts[i]) & (values < self.ends[i])
+        return covered
+
+    def __len__(self) -> int:
+        return self.count
+
+class Checkpoint:
+    """Durable record of the rows a streaming run has written to its output.
+
+    An append-only JSON-lines file next to the output. Each line lists the row
+    ranges of one written chunk and the size of the output after it, and is
+    fsynced after the output itself. Output written after the last line
+    (a crash mid-chunk) is truncated on resume, so no row appears twice.
+    A torn last line of the checkpoint itself is truncated the same way, so
+    later entries are appended after the last valid one.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.completed = RowRanges()
+        self.output_size = 0
+        if os.path.exists(path):
+            valid_size = 0
+            with open(path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # Torn last line of an interrupted write
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    # Checkpoints written before ranges were introduced list single rows
+                    for start, end in entry.get('ranges') or RowRanges.runs(entry.get('rows', [])):
+                        self.completed.add(start, end)
+                    self.output_size = entry['output_size']
+                    valid_size += len(line)
+            if valid_size < os.path.getsize(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(valid_size)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def record(self, rows: list, output_size: int):
+        """Mark rows (in ascending order) as written once the output has reached `output_size` bytes on disk."""
+        ranges = RowRanges.runs(rows)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'ranges': ranges, 'output_size': output_size}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        for start, end in ranges:
+            self.completed.add(start, end)
+        self.output_size = output_size
+
 #===============================================================================
 # CONFIGURATION
 #===============================================================================
@@ -267,6 +435,217 @@ CONFIG_INSTANCE = Config(
     requests_per_minute=CONFIG['REQUESTS_PER_MINUTE']['DEFAULT']
 )
 
+#===============================================================================
+# RATE LIMITING
+#===============================================================================
+class TokenBucket:
+    """Bucket refilled continuously at a per-minute rate, holding at most `capacity`."""
+    def __init__(self, per_minute: float, capacity: float):
+        self.rate = per_minute / 60
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (amounts above capacity only wait for a full bucket)."""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+class RateLimiter:
+    """Thread-safe limiter of requests and tokens per minute, shared by all workers.
+
+    Every API attempt, retries included, takes one request and its estimated
+    tokens from the buckets and blocks only until both have enough. A full
+    bucket allows a burst of `burst_seconds` worth of quota. Once the response
+    reports its real usage, `settle` corrects the token bucket, which may go
+    into debt when the estimate was too low.
+    """
+    def __init__(self, requests_per_minute: float, tokens_per_minute: Optional[float] = None,
+                 burst_seconds: float = CONFIG['BURST_SECONDS']):
+        if requests_per_minute <= 0 or (tokens_per_minute is not None and tokens_per_minute <= 0):
+            raise ConfigurationError("Rate limits must be positive")
+        burst = burst_seconds / 60
+        self.requests = TokenBucket(requests_per_minute, max(1.0, requests_per_minute * burst))
+        self.tokens = (TokenBucket(tokens_per_minute, max(1.0, tokens_per_minute * burst))
+                       if tokens_per_minute else None)
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _take(self, tokens: int) -> float:
+        """Take one request and `tokens` tokens if available; otherwise return the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            buckets = [(self.requests, 1)] + ([(self.tokens, tokens)] if self.tokens else [])
+            for bucket, _ in buckets:
+                bucket.refill(now)
+            delay = max(bucket.wait_time(amount) for bucket, amount in buckets)
+            if delay == 0:
+                for bucket, amount in buckets:
+                    bucket.level -= amount
+            else:
+                self.waited_seconds += delay
+            return delay
+
+    def acquire(self, tokens: int = 0):
+        """Block until one request and `tokens` tokens are available, then take them."""
+        while (delay := self._take(tokens)) > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int = 0):
+        """Like `acquire`, but waits without blocking the event loop."""
+        while (delay := self._take(tokens)) > 0:
+            await asyncio.sleep(delay)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """Replace a request's estimated tokens with the usage the API reported."""
+        if self.tokens is None:
+            return
+        with self._lock:
+            self.tokens.refill(time.monotonic())
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated_tokens - actual_tokens)
+
+def estimate_request_tokens(prompt: str) -> int:
+    """Rough token count of a request: about four characters per prompt token plus the expected completion."""
+    return len(prompt) // 4 + CONFIG['EXPECTED_COMPLETION_TOKENS']
+
+#===============================================================================
+# RESPONSE CACHE
+#===============================================================================
+class ResponseCache:
+    """Persistent cache of LLM responses, stored in SQLite.
+
+    Keyed by model, deployment, temperature and the hash of the rendered
+    prompt, so changing any of them never serves an old response. Entries
+    expire after `ttl_seconds`; past `max_entries` the least recently used
+    are dropped. Eviction scans the table, so it runs on the first write and
+    then every `EVICTION_INTERVAL` writes, and the cache may briefly hold up to
+    that many extra entries. A read-only cache serves hits but never writes,
+    evicts or updates usage, so reruns see exactly the same contents.
+    """
+    EVICTION_INTERVAL = 100
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        response TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used_at);
+    CREATE INDEX IF NOT EXISTS idx_responses_created ON responses (created_at);
+    """
+
+    def __init__(self, path: str, max_entries: int = CONFIG['CACHE']['MAX_ENTRIES'],
+                 ttl_seconds: float = CONFIG['CACHE']['TTL_SECONDS'], read_only: bool = False):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.read_only = read_only
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        if not read_only:
+            with self._connection() as connection:
+                connection.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            if self.read_only:
+                connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=30)
+            else:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                connection = sqlite3.connect(self.path, timeout=30)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def key(prompt: str) -> str:
+        """Cache key of a prompt under the current model configuration."""
+        material = json.dumps([
+            CONFIG['MODEL'],
+            litellm.model_alias_map.get(CONFIG['MODEL']),
+            CONFIG['TEMPERATURE'],
+            hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        ])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Return the cached response, or None if missing or expired."""
+        key, now = self.key(prompt), time.time()
+        try:
+            with self._connection() as connection:
+                row = connection.execute(
+                    "SELECT response FROM responses WHERE key = ? AND created_at >= ?",
+                    (key, now - self.ttl_seconds)
+                ).fetchone()
+                if row is not None and not self.read_only:
+                    connection.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key))
+        except sqlite3.OperationalError:
+            row = None  # A read-only cache whose database does not exist yet
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return row[0] if row else None
+
+    def put(self, prompt: str, response: str):
+        """Store a response, evicting periodically. Does nothing when read-only.
+
+        The response has already been paid for, so a database error is logged
+        instead of raised: a failed write only costs a future cache hit.
+        """
+        if self.read_only:
+            return
+        now = time.time()
+        with self._lock:
+            evict = self._writes % self.EVICTION_INTERVAL == 0
+            self._writes += 1
+        try:
+            with self._connection() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+                    (self.key(prompt), response, now, now)
+                )
+                if evict:
+                    connection.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+                    connection.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,)
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, or None when PROCESSOR_CACHE is 'off'.
+
+    Raises:
+        ConfigurationError: If PROCESSOR_CACHE has an unknown value.
+    """
+    global _response_cache
+    mode = CONFIG['CACHE']['MODE']
+    if mode == 'off':
+        return None
+    if mode not in ('on', 'read-only'):
+        raise ConfigurationError(f"Invalid PROCESSOR_CACHE: {mode}")
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(get_absolute_path(CONFIG['CACHE']['PATH']), read_only=mode == 'read-only')
+        return _response_cache
+
 #===============================================================================
 # MONITORING AND METRICS
 #===============================================================================
@@ -278,6 +657,10 @@ class Metrics:
         self.processed_rows = 0
         self.failed_rows = 0
         self.total_processing_time = 0
+        self.rate_limit_wait_time = 0
+        self.unique_prompts = 0
+        self.deduplicated_rows = 0
+        self.cache_hits = 0
         
     def to_dict(self) -> Dict[str, Any]:
         """Convert metrics to a dictionary.
@@ -290,6 +673,11 @@ class Metrics:
             "processed_rows": self.processed_rows,
             "failed_rows": self.failed_rows,
             "total_processing_time": self.total_processing_time,
+            "rate_limit_wait_time": self.rate_limit_wait_time,
+            "unique_prompts": self.unique_prompts,
+            "deduplicated_rows": self.deduplicated_rows,
+            "dedup_ratio": self.deduplicated_rows / max(1, self.processed_rows),
+            "cache_hits": self.cache_hits,
             "average_time_per_row": self.total_processing_time / max(1, self.processed_rows)
         }
 
@@ -313,11 +701,14 @@ def log_execution_time(func):
 # CORE PROCESSING FUNCTIONS
 #===============================================================================
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-def get_azure_llm_response(**kwargs: Dict[str, Any]) -> str:
-    """Get response from Azure OpenAI using litellm.
+def request_completion(prompt: str, rate_limiter: Optional[RateLimiter] = None) -> str:
+    """Send a rendered prompt to Azure OpenAI using litellm.
+
+    Every attempt, retries included, waits for the rate limiter.
 
     Args:
-        **kwargs: Keyword arguments to pass to the prompt template.
+        prompt (str): The rendered prompt.
+        rate_limiter (Optional[RateLimiter]): Limiter shared by all workers; None sends immediately.
 
     Returns:
         str: The content of the response from Azure OpenAI.
@@ -328,86 +719,221 @@ def get_azure_llm_response(**kwargs: Dict[str, Any]) -> str:
     """
     if CONFIG['MODEL'] not in litellm.model_alias_map:
         raise ValueError(f"Model {CONFIG['MODEL']} not found in model_alias_map")
-    try:
-        formatted_prompt = format_system_prompt(**kwargs)
-        request_id = f"req_{int(time.time()*1000)}"  # Unique request ID
-        
-        response = litellm.completion(
-            model=CONFIG['MODEL'],
-            messages=[{"role": "user", "content": formatted_prompt}],
-            temperature=CONFIG['TEMPERATURE'],
-            metadata={"request_id": request_id}
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        # Silent error handling, just re-raise
-        raise
+    estimated_tokens = estimate_request_tokens(prompt)
+    if rate_limiter:
+        rate_limiter.acquire(estimated_tokens)
+    request_id = f"req_{int(time.time()*1000)}"  # Unique request ID
+
+    response = litellm.completion(
+        model=CONFIG['MODEL'],
+        messages=[{"role": "user", "content": prompt}],
+        temperature=CONFIG['TEMPERATURE'],
+        metadata={"request_id": request_id}
+    )
+    usage = getattr(response, 'usage', None)
+    if rate_limiter and usage and usage.total_tokens:
+        rate_limiter.settle(estimated_tokens, usage.total_tokens)
+    return response.choices[0].message.content
+
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+async def request_completion_async(prompt: str, rate_limiter: Optional[RateLimiter] = None) -> str:
+    """Async counterpart of `request_completion` using litellm.acompletion.
+
+    Args:
+        prompt (str): The rendered prompt.
+        rate_limiter (Optional[RateLimiter]): Limiter shared by all requests; None sends immediately.
+
+    Returns:
+        str: The content of the response from Azure OpenAI.
+
+    Raises:
+        ValueError: If the model is not found in the model alias map.
+        Exception: If there is an error during the API call.
+    """
+    if CONFIG['MODEL'] not in litellm.model_alias_map:
+        raise ValueError(f"Model {CONFIG['MODEL']} not found in model_alias_map")
+    estimated_tokens = estimate_request_tokens(prompt)
+    if rate_limiter:
+        await rate_limiter.acquire_async(estimated_tokens)
+    request_id = f"req_{int(time.time()*1000)}"  # Unique request ID
+
+    response = await litellm.acompletion(
+        model=CONFIG['MODEL'],
+        messages=[{"role": "user", "content": prompt}],
+        temperature=CONFIG['TEMPERATURE'],
+        metadata={"request_id": request_id}
+    )
+    usage = getattr(response, 'usage', None)
+    if rate_limiter and usage and usage.total_tokens:
+        rate_limiter.settle(estimated_tokens, usage.total_tokens)
+    return response.choices[0].message.content
+
+def plan_unique_prompts(df: pd.DataFrame, output_column: str) -> Tuple[Dict[str, Tuple[str, List[int]]], List[int]]:
+    """Render every row's prompt and group rows whose prompts are identical.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to process.
+        output_column (str): The name of the column the results go to; not passed to the template.
+
+    Returns:
+        Tuple[Dict[str, Tuple[str, List[int]]], List[int]]: Prompt hash -> (prompt, positions of the
+            rows rendering to it) in first-seen order, and the positions of rows that failed to render.
+    """
+    groups, unrenderable = {}, []
+    columns = [column for column in df.columns if column != output_column]
+    for position, values in enumerate(df[columns].itertuples(index=False, name=None)):
+        try:
+            prompt = format_system_prompt(**dict(zip(columns, values)))
+        except Exception:
+            unrenderable.append(position)
+            continue
+        key = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        if key in groups:
+            groups[key][1].append(position)
+        else:
+            groups[key] = (prompt, [position])
+    return groups, unrenderable
+
+def record_plan(metrics: Metrics, row_count: int, groups: dict, unrenderable: list):
+    """Count the rows of a plan that need no request of their own, and those that failed to render."""
+    metrics.unique_prompts += len(groups)
+    metrics.deduplicated_rows += row_count - len(unrenderable) - len(groups)
+    metrics.processed_rows += len(unrenderable)
+    metrics.failed_rows += len(unrenderable)
+
+def serve_from_cache(groups: dict, results: list, metrics: Metrics):
+    """Fill the rows of cached prompts and remove those prompts from `groups`."""
+    cache = get_response_cache()
+    if cache is None:
+        return
+    for key, (prompt, positions) in list(groups.items()):
+        response = cache.get(prompt)
+        if response is None:
+            continue
+        for position in positions:
+            results[position] = response
+        metrics.cache_hits += 1
+        metrics.processed_rows += len(positions)
+        del groups[key]
+
+def cache_response(prompt: str, response: Optional[str]):
+    """Store a response in the cache; called outside the retried request so a cache error never resends it."""
+    cache = get_response_cache()
+    if cache and response is not None:
+        cache.put(prompt, response)
+
+def report_metrics(metrics: Metrics):
+    """Print the summary of a finished run.
+
+    Args:
+        metrics (Metrics): The metrics of the run.
+    """
+    print(f"\nProcessing completed in {metrics.total_processing_time:.2f} seconds:")
+    print(f"- Rows processed: {metrics.processed_rows}")
+    print(f"- Rows failed: {metrics.failed_rows}")
+    print(f"- Average time per row: {metrics.total_processing_time/max(1,metrics.processed_rows):.2f} seconds")
+    print(f"- Time waited for rate limits (all workers): {metrics.rate_limit_wait_time:.2f} seconds")
+    print(f"- Unique prompts: {metrics.unique_prompts} "
+          f"({metrics.deduplicated_rows / max(1, metrics.processed_rows):.1%} of rows deduplicated)")
+    print(f"- Cache hits: {metrics.cache_hits}")
+
+def get_azure_llm_response(**kwargs: Dict[str, Any]) -> str:
+    """Get response from Azure OpenAI using litellm.
+
+    Args:
+        **kwargs: Keyword arguments to pass to the prompt template.
+
+    Returns:
+        str: The content of the response from Azure OpenAI.
+
+    Raises:
+        ValueError: If the prompt cannot be formatted or the model is not found in the model alias map.
+        Exception: If there is an error during the API call.
+    """
+    prompt = format_system_prompt(**kwargs)
+    cache = get_response_cache()
+    cached = cache.get(prompt) if cache else None
+    if cached is not None:
+        return cached
+    response = request_completion(prompt)
+    cache_response(prompt, response)
+    return response
 
 def process_dataframe_parallel(
     df: pd.DataFrame, 
     output_column: str, 
     max_workers: int = CONFIG_INSTANCE.max_workers, 
-    requests_per_minute: int = CONFIG_INSTANCE.requests_per_minute
+    requests_per_minute: int = CONFIG_INSTANCE.requests_per_minute,
+    tokens_per_minute: Optional[int] = CONFIG['TOKENS_PER_MINUTE'],
+    rate_limiter: Optional[RateLimiter] = None,
+    metrics: Optional[Metrics] = None
 ) -> pd.DataFrame:
     """Process a DataFrame in parallel using Azure OpenAI.
 
+    Rows whose rendered prompts are identical share one request, and prompts
+    found in the response cache are not sent at all.
+
     Args:
         df (pd.DataFrame): The DataFrame to process.
         output_column (str): The name of the column to store the results in.
         max_workers (int): The maximum number of workers to use for parallel processing.
         requests_per_minute (int): The maximum number of requests to make per minute.
+        tokens_per_minute (Optional[int]): The maximum number of tokens to use per minute; None for no limit.
+        rate_limiter (Optional[RateLimiter]): Limiter to share with other calls instead of the two limits above.
+        metrics (Optional[Metrics]): Metrics to add this call's counts to; without it a summary is printed.
 
     Returns:
         pd.DataFrame: The DataFrame with the results added to the specified output column.
     """
-    metrics = Metrics()
+    report = metrics is None
+    metrics = metrics or Metrics()
     start_time = time.time()
     
     try:
         results = [None] * len(df)
-        delay_between_requests = 60 / requests_per_minute
+        rate_limiter = rate_limiter or RateLimiter(requests_per_minute, tokens_per_minute)
+        groups, unrenderable = plan_unique_prompts(df, output_column)
+        record_plan(metrics, len(df), groups, unrenderable)
+        serve_from_cache(groups, results, metrics)
         
-        def process_row(index: int, row: pd.Series):
-            """Process a single row of the DataFrame.
+        def process_prompt(prompt: str) -> Optional[str]:
+            """Process a single unique prompt.
 
             Args:
-                index (int): The index of the row.
-                row (pd.Series): The row to process.
+                prompt (str): The rendered prompt.
 
             Returns:
-                Tuple[int, Optional[str]]: The index of the row and the result, or None if an error occurred.
+                Optional[str]: The result, or None if an error occurred.
             """
-            time.sleep(index * delay_between_requests)
             try:
-                row_dict = row.to_dict()
-                if output_column in row_dict:
-                    del row_dict[output_column]
-                return index, get_azure_llm_response(**row_dict)
+                result = request_completion(prompt, rate_limiter)
             except Exception:
-                return index, None
+                return None
+            cache_response(prompt, result)
+            return result
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = {
-                executor.submit(process_row, index, row): index
-                for index, row in df.iterrows()
+                executor.submit(process_prompt, prompt): positions
+                for prompt, positions in groups.values()
             }
             
-            with get_progress_bar(total=len(df), desc="Processing", iterable=as_completed(futures)) as pbar:
+            with get_progress_bar(total=len(futures), desc="Processing", iterable=as_completed(futures)) as pbar:
                 for future in pbar:
-                    index, result = future.result()
-                    results[index] = result
-                    metrics.processed_rows += 1
+                    result = future.result()
+                    positions = futures[future]
+                    for index in positions:
+                        results[index] = result
+                    metrics.processed_rows += len(positions)
                     if result is None:
-                        metrics.failed_rows += 1
+                        metrics.failed_rows += len(positions)
         
         df[output_column] = results
-        end_time = time.time()
-        metrics.total_processing_time = end_time - start_time
         
-        print(f"\nProcessing completed in {metrics.total_processing_time:.2f} seconds:")
-        print(f"- Rows processed: {metrics.processed_rows}")
-        print(f"- Rows failed: {metrics.failed_rows}")
-        print(f"- Average time per row: {metrics.total_processing_time/max(1,metrics.processed_rows):.2f} seconds")
+        if report:
+            metrics.total_processing_time = time.time() - start_time
+            metrics.rate_limit_wait_time = rate_limiter.waited_seconds
+            report_metrics(metrics)
         
         return df
         
@@ -415,6 +941,184 @@ def process_dataframe_parallel(
         print(f"\nError: {e}")
         raise
 
+async def process_dataframe_async(
+    df: pd.DataFrame,
+    output_column: str,
+    max_concurrency: int = CONFIG['MAX_CONCURRENCY'],
+    requests_per_minute: int = CONFIG_INSTANCE.requests_per_minute,
+    tokens_per_minute: Optional[int] = CONFIG['TOKENS_PER_MINUTE'],
+    rate_limiter: Optional[RateLimiter] = None,
+    metrics: Optional[Metrics] = None
+) -> pd.DataFrame:
+    """Process a DataFrame with concurrent asyncio requests on a single thread.
+
+    Prompts are rendered and deduplicated up front; a fixed set of
+    `max_concurrency` consumer coroutines then sends one request per unique
+    prompt, so only the requests in flight hold response state. Template,
+    retries, rate limiting and metrics behave as in `process_dataframe_parallel`.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to process.
+        output_column (str): The name of the column to store the results in.
+        max_concurrency (int): The maximum number of requests in flight at once.
+        requests_per_minute (int): The maximum number of requests to make per minute.
+        tokens_per_minute (Optional[int]): The maximum number of tokens to use per minute; None for no limit.
+        rate_limiter (Optional[RateLimiter]): Limiter to share with other calls instead of the two limits above.
+        metrics (Optional[Metrics]): Metrics to add this call's counts to; without it a summary is printed.
+
+    Returns:
+        pd.DataFrame: The DataFrame with the results added to the specified output column.
+    """
+    if max_concurrency < 1:
+        raise ConfigurationError(f"Invalid max_concurrency: {max_concurrency}")
+    report = metrics is None
+    metrics = metrics or Metrics()
+    start_time = time.time()
+    results = [None] * len(df)
+    rate_limiter = rate_limiter or RateLimiter(requests_per_minute, tokens_per_minute)
+    groups, unrenderable = plan_unique_prompts(df, output_column)
+    record_plan(metrics, len(df), groups, unrenderable)
+    # SQLite calls block, so they run in worker threads instead of on the event loop
+    await asyncio.to_thread(serve_from_cache, groups, results, metrics)
+    pending = iter(groups.values())
+
+    with get_progress_bar(iterable=None, total=len(groups), desc="Processing") as pbar:
+        async def consume():
+            # Prompts are pulled lazily; no other coroutine runs between next() calls
+            for prompt, positions in pending:
+                try:
+                    result = await request_completion_async(prompt, rate_limiter)
+                except Exception:
+                    result = None
+                if result is None:
+                    metrics.failed_rows += len(positions)
+                else:
+                    await asyncio.to_thread(cache_response, prompt, result)
+                for position in positions:
+                    results[position] = result
+                metrics.processed_rows += len(positions)
+                pbar.update(1)
+
+        await asyncio.gather(*(consume() for _ in range(min(max_concurrency, max(1, len(groups))))))
+
+    df[output_column] = results
+    if report:
+        metrics.total_processing_time = time.time() - start_time
+        metrics.rate_limit_wait_time = rate_limiter.waited_seconds
+        report_metrics(metrics)
+    return df
+
+def _pending_chunks(input_csv: str, chunk_size: int, checkpoint: Checkpoint) -> Iterator[pd.DataFrame]:
+    """Yield the rows of each input chunk that are not in the checkpoint yet."""
+    for chunk in iter_csv_chunks(input_csv, chunk_size):
+        pending = chunk[~checkpoint.completed.mask(chunk.index)]
+        if not pending.empty:
+            yield pending.copy()
+
+def _append_done_rows(output, checkpoint: Checkpoint, processed: pd.DataFrame, output_column: str):
+    """Append the rows that got a response to the output, then checkpoint them."""
+    done = processed[processed[output_column].notna()]
+    if done.empty:
+        return
+    output.write(done.to_csv(index=False, header=output.tell() == 0).encode('utf-8'))
+    output.flush()
+    os.fsync(output.fileno())
+    checkpoint.record([int(row) for row in done.index], output.tell())
+
+async def _stream_chunks_async(
+    chunks: Iterator[pd.DataFrame],
+    output,
+    checkpoint: Checkpoint,
+    output_column: str,
+    max_concurrency: int,
+    rate_limiter: RateLimiter,
+    metrics: Metrics
+):
+    """Process the chunks one after another with the async engine on a single event loop."""
+    for pending in chunks:
+        processed = await process_dataframe_async(
+            pending, output_column, max_concurrency=max_concurrency,
+            rate_limiter=rate_limiter, metrics=metrics
+        )
+        _append_done_rows(output, checkpoint, processed, output_column)
+
+def process_csv_streaming(
+    input_csv: str,
+    output_csv: str,
+    output_column: str,
+    chunk_size: int = CONFIG['CHUNK_SIZE'],
+    engine: str = CONFIG['ENGINE'],
+    max_workers: int = CONFIG_INSTANCE.max_workers,
+    max_concurrency: int = CONFIG['MAX_CONCURRENCY'],
+    requests_per_minute: int = CONFIG_INSTANCE.requests_per_minute,
+    tokens_per_minute: Optional[int] = CONFIG['TOKENS_PER_MINUTE'],
+    resume: bool = True
+) -> Metrics:
+    """Process a CSV file chunk by chunk, appending finished rows to the output as they complete.
+
+    Only one chunk is held in memory at a time. Rows that got a response are
+    written in input order and checkpointed in `<output_csv>.checkpoint`;
+    failed rows are left out and retried by the next run, which then appends
+    them. With `resume`, rows already in the checkpoint are skipped. Identical
+    prompts are deduplicated within each chunk.
+
+    Args:
+        input_csv (str): Path to the input CSV file.
+        output_csv (str): Path to the output CSV file.
+        output_column (str): The name of the column to store the results in.
+        chunk_size (int): The number of rows read and processed at a time.
+        engine (str): 'threads' (process_dataframe_parallel) or 'async' (process_dataframe_async).
+        max_workers (int): The maximum number of worker threads of the 'threads' engine.
+        max_concurrency (int): The maximum number of requests in flight of the 'async' engine.
+        requests_per_minute (int): The maximum number of requests to make per minute.
+        tokens_per_minute (Optional[int]): The maximum number of tokens to use per minute; None for no limit.
+        resume (bool): Whether to continue a previous run instead of starting over.
+
+    Returns:
+        Metrics: The metrics of this run.
+
+    Raises:
+        ConfigurationError: If the engine is unknown or the input cannot be read.
+    """
+    if engine not in ('threads', 'async'):
+        raise ConfigurationError(f"Invalid engine: {engine}")
+    output_path = get_absolute_path(output_csv)
+    checkpoint_path = output_path + '.checkpoint'
+    if not resume:
+        for path in (output_path, checkpoint_path):
+            if os.path.exists(path):
+                os.remove(path)
+    checkpoint = Checkpoint(checkpoint_path)
+    if checkpoint.completed:
+        print(f"Resuming: {len(checkpoint.completed)} rows already done")
+
+    metrics = Metrics()
+    rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    with open(output_path, 'a+b') as output:
+        # Drop rows written after the last checkpoint, or a partial file without one
+        output.truncate(checkpoint.output_size)
+        output.seek(0, os.SEEK_END)
+        chunks = _pending_chunks(input_csv, chunk_size, checkpoint)
+        if engine == 'async':
+            # One event loop for the whole run, so async clients are never reused across closed loops
+            asyncio.run(_stream_chunks_async(
+                chunks, output, checkpoint, output_column, max_concurrency, rate_limiter, metrics
+            ))
+        else:
+            for pending in chunks:
+                processed = process_dataframe_parallel(
+                    pending, output_column, max_workers=max_workers,
+                    rate_limiter=rate_limiter, metrics=metrics
+                )
+                _append_done_rows(output, checkpoint, processed, output_column)
+
+    metrics.total_processing_time = time.time() - metrics.start_time
+    metrics.rate_limit_wait_time = rate_limiter.waited_seconds
+    report_metrics(metrics)
+    if metrics.failed_rows:
+        print(f"- {metrics.failed_rows} failed rows will be retried by the next run")
+    return metrics
+
 #===============================================================================
 # EXECUTION BLOCK
 #===============================================================================
@@ -426,21 +1130,39 @@ if __name__ == "__main__":
         PROMPT_TEMPLATE = load_prompt_template_from_txt()
         print(f"Loaded prompt template: {PROMPT_TEMPLATE[:1000]}...")
         
-        # Load DataFrame from CSV
         input_csv_path = "input.csv"
-        test_df = load_dataframe_from_csv(input_csv_path)
-        
-        print("Starting parallel DataFrame processing...")
-        processed_df = process_dataframe_parallel(
-            test_df,
-            output_column="ai_response",
-            max_workers=3,
-            requests_per_minute=30
-        )
-        
-        # Save results to CSV
         csv_path = "output.csv"
-        save_to_csv(processed_df, csv_path)
+        if CONFIG['STREAMING']:
+            # Reads, processes and saves chunk by chunk; rerunning resumes
+            print("Starting streaming CSV processing...")
+            process_csv_streaming(
+                input_csv_path,
+                csv_path,
+                output_column="ai_response",
+                max_workers=3,
+                requests_per_minute=30
+            )
+        else:
+            # Load DataFrame from CSV
+            test_df = load_dataframe_from_csv(input_csv_path)
+            
+            print("Starting parallel DataFrame processing...")
+            if CONFIG['ENGINE'] == 'async':
+                processed_df = asyncio.run(process_dataframe_async(
+                    test_df,
+                    output_column="ai_response",
+                    requests_per_minute=30
+                ))
+            else:
+                processed_df = process_dataframe_parallel(
+                    test_df,
+                    output_column="ai_response",
+                    max_workers=3,
+                    requests_per_minute=30
+                )
+            
+            # Save results to CSV
+            save_to_csv(processed_df, csv_path)
         
         print("\nResults saved to:", get_absolute_path(csv_path))
         